@@ -0,0 +1,141 @@
+"""
+Регрессионная проверка сжатия текстов отчётов.
+
+Для каждой книги корпуса (каталог с .xlsx или синтетическая книга) извлекает отчёты,
+сжимает их и выводит оценку токенов до/после по листам. Поля, которые находят правила
+(rules.py), должны совпадать до и после сжатия — иначе сжатие теряет данные.
+
+С флагом --llm дополнительно отправляет --llm-sample листов в модель (нужны настройки
+REPORTABLE_SERVICE_APP_LLM__*) в исходном и сжатом виде и сравнивает задержку и поля ответа.
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/bench_compaction.py --corpus ./corpus --tsv
+"""
+import io
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from datetime import date, timedelta
+from openpyxl import Workbook
+from reportable_app.apps.analyzer.services.excel_parser import extract_reports
+from reportable_app.apps.analyzer.services.compaction import ReportCompactor
+from reportable_app.apps.analyzer.services.rules import extract_fields
+
+
+HEADER = "СУТОЧНЫЙ РАПОРТ О ХОДЕ РАБОТ ПО ТЕКУЩЕМУ И КАПИТАЛЬНОМУ РЕМОНТУ СКВАЖИН"
+TABLE_HEADER = ["Время", "Продолжительность", "Описание выполненных операций", "Примечание"]
+SIGNATURE = "Мастер бригады ____________________ / Представитель заказчика ____________________"
+
+
+def make_workbook(sheets: int) -> bytes:
+    """Книга в формате реальных рапортов: шапка, повторяющийся заголовок таблицы, подписи"""
+    workbook = Workbook(write_only=True)
+    start = date(2024, 3, 1)
+
+    workbook.create_sheet("Текущая").append(["Скважина 1234", "Куст 56"])
+    summary = workbook.create_sheet("Сводка")
+    for i in range(sheets):
+        day = start + timedelta(days=i)
+        summary.append([day.strftime("%d.%m.%Y"), None, None, f"Работы по плану, день {i + 1}. Глушение скважины."])
+
+    for i in range(sheets):
+        day = start + timedelta(days=i)
+        sheet = workbook.create_sheet(day.strftime("%d.%m.%Y"))
+        sheet.append([HEADER])
+        sheet.append(["Месторождение", "Самотлорское", "Организация", "ООО «Бригада КРС»"])
+        sheet.append(["Инв. № 1234-Р", "Способ эксплуатации", "ЭЦН"])
+        for block in range(3):
+            sheet.append(TABLE_HEADER)
+            for hour in range(6):
+                sheet.append([
+                    f"{8 + block * 4 + hour % 4:02d}:00",
+                    1,
+                    f"Операция {block}.{hour}: промывка,  проработка   колонны",
+                    "  без  замечаний ",
+                ])
+        sheet.append([f"Работы по плану, день {i + 1}. Глушение скважины."])
+        sheet.append([f"Заглушили скважину раствором уд.веса 1,{10 + i % 9} г/см3 в объеме {20 + i} м3."])
+        sheet.append([f"Опрессовка ЭК на {80 + i} атм - герметична. Глубина спуска насоса {1800 + i} м"])
+        sheet.append([SIGNATURE])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def load_corpus(corpus: str | None, sheets: int) -> dict[str, bytes]:
+    if corpus is None:
+        return {"synthetic": make_workbook(sheets)}
+    return {path.name: path.read_bytes() for path in sorted(Path(corpus).glob("*.xlsx"))}
+
+
+async def compare_with_llm(original: dict[str, str], compacted: dict[str, str], sample: int) -> None:
+    from reportable_app.apps.analyzer.depends import get_analyzer_service
+    from reportable_app.apps.analyzer.services.prompt_registry import get_prompt_registry
+    from reportable_app.core.clients.llm_client import get_llm_client
+    from reportable_app.settings import settings
+
+    analyzer = get_analyzer_service(
+        settings,
+        response_cache=None,
+        limiter=None,
+        request_policy=None,
+        excel_parser=None,
+        client=get_llm_client(),
+        prompt_registry=get_prompt_registry(),
+    )
+    model = analyzer.models[0]
+    for date_key in list(original)[:sample]:
+        timings, answers = [], []
+        for text in (original[date_key], compacted[date_key]):
+            started = time.perf_counter()
+            answers.append(json.loads(await analyzer._request_llm(model, analyzer._create_prompt(text), analyzer.json_schema)))
+            timings.append(time.perf_counter() - started)
+        lost = [k for k, v in answers[0].items() if v not in (None, "") and answers[1].get(k) in (None, "")]
+        print(f"  LLM {date_key}: {timings[0]:.1f} s -> {timings[1]:.1f} s, пропали поля: {lost or 'нет'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="Каталог с .xlsx; по умолчанию синтетическая книга")
+    parser.add_argument("--sheets", type=int, default=30)
+    parser.add_argument("--tsv", action="store_true", help="Строки листа целиком (ячейки через табуляцию)")
+    parser.add_argument("--llm", action="store_true", help="Сравнить задержку и ответы модели")
+    parser.add_argument("--llm-sample", type=int, default=3)
+    args = parser.parse_args()
+
+    compactor = ReportCompactor()
+    total_before = total_after = 0
+    failures = 0
+
+    for name, content in load_corpus(args.corpus, args.sheets).items():
+        original = extract_reports(content, tsv=args.tsv)
+        compacted, tokens = compactor.compact(original)
+        before = sum(b for b, _ in tokens.values())
+        after = sum(a for _, a in tokens.values())
+        total_before += before
+        total_after += after
+        print(f"{name}: {len(original)} листов, {before} -> {after} токенов ({1 - after / max(before, 1):.0%} меньше)")
+
+        for date_key, (sheet_before, sheet_after) in tokens.items():
+            lost = {
+                field: value for field, value in extract_fields(original[date_key]).items()
+                if extract_fields(compacted[date_key]).get(field) != value
+            }
+            if lost:
+                failures += 1
+                print(f"  ! {date_key}: после сжатия не найдены поля {lost}")
+            print(f"  {date_key}: {sheet_before} -> {sheet_after}")
+
+        if args.llm:
+            asyncio.run(compare_with_llm(original, compacted, args.llm_sample))
+
+    print(f"Итого: {total_before} -> {total_after} токенов, листов с потерей полей: {failures}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
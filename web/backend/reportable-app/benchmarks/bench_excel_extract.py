@@ -0,0 +1,95 @@
+"""
+Сравнение извлечения отчётов из Excel: прежний путь через pandas и потоковый openpyxl (read_only).
+
+Генерирует синтетическую книгу (workbook_generator.py: листы с широкой сеткой и большим числом
+пустых ячеек, плюс листы без даты в названии), проверяет, что результаты совпадают, и выводит
+время и пиковую память (tracemalloc) для каждого способа.
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/bench_excel_extract.py --sheets 120 --rows 400 --cols 30 --density 0.2
+"""
+import io
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+from reportable_app.apps.analyzer.services.excel_parser import extract_reports
+from workbook_generator import generate_workbook
+
+
+def extract_reports_pandas(content: bytes) -> dict[str, str]:
+    """Прежняя реализация AnalyzerService._extract_reports"""
+    excel = pd.ExcelFile(io.BytesIO(content))
+    sheets = excel.sheet_names
+
+    summary_df = pd.read_excel(excel, sheet_name=sheets[1], header=None)
+    summary_data = {}
+    for _, row in summary_df.iterrows():
+        if pd.notna(row[0]) and pd.notna(row[3]):
+            try:
+                day = pd.to_datetime(row[0], dayfirst=True).strftime("%d.%m.%Y")
+                summary_data[day] = str(row[3]).strip()
+            except Exception:
+                continue
+
+    reports = {}
+    for sheet in sheets[2:]:
+        df = pd.read_excel(excel, sheet_name=sheet, header=None)
+        text = "\n".join(
+            str(v).strip()
+            for v in df.fillna("").values.flatten()
+            if isinstance(v, str) and v.strip()
+        )
+        try:
+            day = pd.to_datetime(sheet, dayfirst=True).strftime("%d.%m.%Y")
+        except Exception:
+            continue
+        reports[day] = (summary_data.get(day, "") + "\n" + text).strip()
+
+    return reports
+
+
+def measure(fn, content: bytes, repeat: int) -> tuple[float, float, dict]:
+    """Лучшее время из repeat запусков и пиковая память одного запуска (МБ)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(content)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak / 1024 / 1024, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sheets", type=int, default=120)
+    parser.add_argument("--rows", type=int, default=400)
+    parser.add_argument("--cols", type=int, default=30)
+    parser.add_argument("--density", type=float, default=0.2, help="Доля заполненных дополнительных ячеек")
+    parser.add_argument("--extra-sheets", type=int, default=5, help="Листы без даты в названии")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = generate_workbook(
+        args.sheets, args.rows, args.cols, density=args.density, extra_sheets=args.extra_sheets
+    )
+    print(f"Книга: {args.sheets} листов x {args.rows} строк x {args.cols} колонок, {len(content) / 1024 / 1024:.1f} МБ")
+
+    pandas_time, pandas_peak, pandas_result = measure(extract_reports_pandas, content, args.repeat)
+    stream_time, stream_peak, stream_result = measure(extract_reports, content, args.repeat)
+
+    assert pandas_result == stream_result, "Результаты извлечения не совпадают"
+
+    print(f"{'способ':<10} {'время, с':>10} {'пик памяти, МБ':>16}")
+    print(f"{'pandas':<10} {pandas_time:>10.2f} {pandas_peak:>16.1f}")
+    print(f"{'openpyxl':<10} {stream_time:>10.2f} {stream_peak:>16.1f}")
+    print(f"Ускорение: x{pandas_time / stream_time:.1f}, память: x{pandas_peak / stream_peak:.1f} меньше")
+
+
+if __name__ == "__main__":
+    main()
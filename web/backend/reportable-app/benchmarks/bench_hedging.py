@@ -0,0 +1,83 @@
+"""
+Хеджирование медленных запросов к LLM: время анализа и цена дублей.
+
+Mock LLM (mock_llm_server.py) работает в том же процессе, задержка до первого байта
+логнормальная с тяжёлым хвостом (--ttfb-sigma). Одни и те же книги анализируются
+последовательно без хеджирования и с ним; первые --warmup книг только набирают историю
+задержек и в сравнение не входят.
+
+Печатаются перцентили времени анализа книги, доля продублированных попыток
+(дополнительные запросы к LLM) и оценка сэкономленного времени.
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/bench_hedging.py --files 40 --ttfb-sigma 1.0
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import httpx
+from openai import AsyncOpenAI
+
+
+async def run_mode(args: argparse.Namespace, hedging: bool, workbooks: list[bytes]) -> tuple[list[float], dict]:
+    from mock_llm_server import app
+    from reportable_app.apps.analyzer.services.analyzer import AnalyzerService
+    from reportable_app.apps.analyzer.services.hedging import LLMRequestPolicy
+    from reportable_app.apps.analyzer.services.prompt_registry import get_prompt_registry
+
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), timeout=600)
+    client = AsyncOpenAI(api_key="mock", base_url="http://mock/v1", max_retries=0, http_client=http_client)
+    policy = LLMRequestPolicy(
+        hedging_enabled=hedging, hedge_quantile=args.quantile, hedge_min_samples=args.min_samples,
+        hedge_max_ratio=args.max_ratio,
+    )
+    service = AnalyzerService(client, "mock", get_prompt_registry().current(), request_policy=policy)
+
+    timings = []
+    for i, content in enumerate(workbooks):
+        started = time.perf_counter()
+        await service.analyze(content)
+        if i >= args.warmup:
+            timings.append(time.perf_counter() - started)
+    await http_client.aclose()
+    return timings, policy.stats()
+
+
+def percentiles(values: list[float]) -> dict:
+    values = sorted(values)
+    return {f"p{int(q * 100)}": round(values[min(len(values) - 1, int(q * len(values)))], 2) for q in (0.5, 0.9, 0.99)}
+
+
+def main() -> None:
+    from workbook_generator import generate_workbook
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--warmup", type=int, default=5, help="Книг для накопления истории задержек")
+    parser.add_argument("--sheets", type=int, default=10)
+    parser.add_argument("--ttfb-median", type=float, default=0.2)
+    parser.add_argument("--ttfb-sigma", type=float, default=1.0)
+    parser.add_argument("--quantile", type=float, default=0.9)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--max-ratio", type=float, default=0.15)
+    args = parser.parse_args()
+
+    os.environ.update({
+        "MOCK_LLM_TTFB_MEDIAN": str(args.ttfb_median),
+        "MOCK_LLM_TTFB_SIGMA": str(args.ttfb_sigma),
+        "MOCK_LLM_TOKENS_PER_SECOND": "2000",
+        "MOCK_LLM_SEED": "1",
+    })
+
+    workbooks = [generate_workbook(args.sheets, seed=i) for i in range(args.files)]
+    for hedging in (False, True):
+        timings, stats = asyncio.run(run_mode(args, hedging, workbooks))
+        stats.pop("buckets")
+        print(f"Хеджирование {'вкл ' if hedging else 'выкл'}: время книги {percentiles(timings)}")
+        print(f"    {json.dumps(stats, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
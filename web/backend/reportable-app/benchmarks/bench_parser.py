@@ -0,0 +1,114 @@
+"""
+Микробенчмарк разбора книг (excel_parser.extract_reports) на синтетических книгах 10/100/1000 листов.
+
+Для каждого размера и режима (обычный текст и --tsv) измеряет:
+- время разбора (лучшее и медиана из --repeat запусков)
+- пиковую память по tracemalloc (отдельный запуск, чтобы трассировка не искажала время)
+- размер результата: число отчётов, символы и оценку токенов
+
+Результаты выводятся таблицей и сохраняются в JSON (--output). С --baseline сравнивает
+с прошлым JSON: если время или память выросли больше чем на --tolerance, печатает
+регрессии и завершается с кодом 1 — так регрессию видно в CI.
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/bench_parser.py --sizes 10 100 1000 --output parser.json
+    PYTHONPATH=. python benchmarks/bench_parser.py --baseline parser.json
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+from reportable_app.apps.analyzer.services.excel_parser import extract_reports, warm_up
+from reportable_app.apps.analyzer.services.tokens import estimate_tokens
+from workbook_generator import generate_workbook
+
+
+def run_case(content: bytes, tsv: bool, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        reports = extract_reports(content, tsv=tsv)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    extract_reports(content, tsv=tsv)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "best_seconds": round(min(timings), 4),
+        "median_seconds": round(statistics.median(timings), 4),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "reports": len(reports),
+        "chars": sum(len(text) for text in reports.values()),
+        "tokens": sum(estimate_tokens(text) for text in reports.values()),
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    previous = {(case["sheets"], case["mode"]): case for case in baseline}
+    regressions = []
+    for case in results:
+        old = previous.get((case["sheets"], case["mode"]))
+        if old is None:
+            continue
+        for metric in ("best_seconds", "peak_mb"):
+            if old[metric] and case[metric] > old[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{case['sheets']} листов ({case['mode']}): {metric} {old[metric]} -> {case[metric]}"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Числа суточных листов")
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--cols", type=int, default=12)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--words", type=int, default=12)
+    parser.add_argument("--latin", dest="cyrillic", action="store_false")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON прошлого запуска для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост времени и памяти")
+    args = parser.parse_args()
+
+    warm_up()
+    results = []
+    print(f"{'листов':>7} {'режим':>6} {'файл, КБ':>9} {'лучшее, с':>10} {'медиана, с':>11} "
+          f"{'пик, МБ':>8} {'символов':>10} {'токенов':>9}")
+    for sheets in args.sizes:
+        content = generate_workbook(
+            sheets, rows=args.rows, cols=args.cols, density=args.density, words=args.words, cyrillic=args.cyrillic
+        )
+        for mode, tsv in (("text", False), ("tsv", True)):
+            case = {"sheets": sheets, "mode": mode, "file_kb": round(len(content) / 1024, 1),
+                    **run_case(content, tsv, args.repeat)}
+            results.append(case)
+            print(f"{sheets:>7} {mode:>6} {case['file_kb']:>9} {case['best_seconds']:>10} "
+                  f"{case['median_seconds']:>11} {case['peak_mb']:>8} {case['chars']:>10} {case['tokens']:>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+                "python": platform.python_version(),
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ: {line}")
+        if regressions:
+            sys.exit(1)
+        print("Регрессий нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Подпись presigned-ссылок на скачивание: клиент S3 против локальной подписи (core/clients/s3_signer.py).
+
+Режимы (для каждого печатается время на N ссылок и на одну ссылку):
+- per-call client — aioboto3.Session и клиент создаются на каждую ссылку (как get_url до общего клиента)
+- shared client — generate_presigned_url общего клиента S3ClientFactory
+- local sign — S3UrlSigner.sign на каждую ссылку
+- local sign_many — S3UrlSigner.sign_many одной пачкой (как get_by_ids)
+
+Подпись не обращается к сети, MinIO для запуска не нужен:
+    PYTHONPATH=. python benchmarks/bench_presign.py --urls 1000
+"""
+import time
+import uuid
+import asyncio
+import argparse
+import aioboto3
+from aiobotocore.config import AioConfig
+from reportable_app.core.clients.s3_client import S3ClientFactory
+from reportable_app.core.clients.s3_signer import S3UrlSigner
+
+
+async def run(args: argparse.Namespace) -> None:
+    credentials = dict(
+        endpoint_url=args.endpoint,
+        aws_access_key_id=args.access_key,
+        aws_secret_access_key=args.secret_key,
+        region_name="us-east-1",
+    )
+    keys = [f"files/default/{uuid.uuid4()}.xlsx" for _ in range(args.urls)]
+    params = lambda key: {"Bucket": args.bucket, "Key": key}
+    results: dict[str, float] = {}
+
+    started = time.perf_counter()
+    for key in keys[:args.per_call_urls]:
+        async with aioboto3.Session().client("s3", **credentials, config=AioConfig(signature_version="s3v4")) as s3:
+            await s3.generate_presigned_url("get_object", Params=params(key), ExpiresIn=1800)
+    # Режим медленный, поэтому меряется на части ссылок и пересчитывается на все
+    results["per-call client"] = (time.perf_counter() - started) * len(keys) / min(len(keys), args.per_call_urls)
+
+    factory = S3ClientFactory(**credentials)
+    async with factory.get_client() as s3:
+        started = time.perf_counter()
+        for key in keys:
+            await s3.generate_presigned_url("get_object", Params=params(key), ExpiresIn=1800)
+        results["shared client"] = time.perf_counter() - started
+    await factory.close()
+
+    signer = S3UrlSigner(args.endpoint, args.access_key, args.secret_key, time_bucket=300)
+    started = time.perf_counter()
+    for key in keys:
+        signer.sign(args.bucket, key, 1800)
+    results["local sign"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    signer.sign_many(args.bucket, keys, 1800)
+    results["local sign_many"] = time.perf_counter() - started
+
+    baseline = results["per-call client"]
+    for mode, elapsed in results.items():
+        print(f"{mode:<18} {elapsed * 1000:9.2f} мс на {len(keys)}  {elapsed / len(keys) * 1e6:9.1f} мкс/ссылка  "
+              f"x{baseline / elapsed:,.0f}")
+
+    # Две «реплики» в одном окне времени выдают одинаковую ссылку
+    replica = S3UrlSigner(args.endpoint, args.access_key, args.secret_key, time_bucket=300)
+    print("одинаковые ссылки у реплик:", replica.sign(args.bucket, keys[0], 1800) == signer.sign(args.bucket, keys[0], 1800))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoint", default="http://localhost:9003")
+    parser.add_argument("--access-key", default="minioadmin")
+    parser.add_argument("--secret-key", default="minioadmin")
+    parser.add_argument("--bucket", default="bench")
+    parser.add_argument("--urls", type=int, default=1000)
+    parser.add_argument("--per-call-urls", type=int, default=200, help="Сколько ссылок подписать в режиме per-call client")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
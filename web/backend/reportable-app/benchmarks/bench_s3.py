@@ -0,0 +1,110 @@
+"""
+Задержка операций с S3 (MinIO): новый клиент на каждую операцию против общего клиента с пулом соединений.
+
+Для каждой операции (put_object, generate_presigned_url, head_object, delete_object)
+печатаются перцентили задержки в двух режимах:
+- per-op — aioboto3.Session и клиент создаются и закрываются на каждую операцию (как было раньше)
+- shared — один S3ClientFactory из core/clients/s3_client.py на весь прогон
+
+Стенд (из web/backend):
+    docker compose -f docker/docker-compose.yml up -d minio
+    cd reportable-app
+    PYTHONPATH=. python benchmarks/bench_s3.py --endpoint http://localhost:9003 --ops 200 --concurrency 8
+"""
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+from contextlib import asynccontextmanager
+import aioboto3
+from reportable_app.core.clients.s3_client import S3ClientFactory
+
+
+OPERATIONS = ("put_object", "generate_presigned_url", "head_object", "delete_object")
+
+
+def percentiles(values: list[float]) -> str:
+    values = sorted(values)
+
+    def q(p: float) -> float:
+        return values[min(len(values) - 1, int(p * len(values)))] * 1000
+
+    return (f"p50 {q(0.5):7.2f} мс  p90 {q(0.9):7.2f} мс  p99 {q(0.99):7.2f} мс  "
+            f"среднее {statistics.fmean(values) * 1000:7.2f} мс")
+
+
+async def run_mode(args: argparse.Namespace, shared: bool, payload: bytes) -> dict[str, list[float]]:
+    credentials = dict(
+        endpoint_url=args.endpoint,
+        aws_access_key_id=args.access_key,
+        aws_secret_access_key=args.secret_key,
+        region_name="us-east-1",
+    )
+    factory = S3ClientFactory(**credentials, max_pool_connections=args.concurrency * 2) if shared else None
+
+    @asynccontextmanager
+    async def client():
+        if factory is not None:
+            async with factory.get_client() as s3:
+                yield s3
+            return
+        async with aioboto3.Session().client("s3", **credentials) as s3:
+            yield s3
+
+    async with client() as s3:
+        try:
+            await s3.head_bucket(Bucket=args.bucket)
+        except Exception:
+            await s3.create_bucket(Bucket=args.bucket)
+
+    timings: dict[str, list[float]] = {operation: [] for operation in OPERATIONS}
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def timed(operation: str, call):
+        started = time.perf_counter()
+        async with client() as s3:
+            result = call(s3)
+            if asyncio.iscoroutine(result):
+                await result
+        timings[operation].append(time.perf_counter() - started)
+
+    async def one(i: int) -> None:
+        key = f"bench/{uuid.uuid4().hex}"
+        async with slots:
+            await timed("put_object", lambda s3: s3.put_object(Bucket=args.bucket, Key=key, Body=payload))
+            await timed("generate_presigned_url", lambda s3: s3.generate_presigned_url(
+                "get_object", Params={"Bucket": args.bucket, "Key": key}, ExpiresIn=1800
+            ))
+            await timed("head_object", lambda s3: s3.head_object(Bucket=args.bucket, Key=key))
+            await timed("delete_object", lambda s3: s3.delete_object(Bucket=args.bucket, Key=key))
+
+    await asyncio.gather(*[one(i) for i in range(args.ops)])
+    if factory is not None:
+        await factory.close()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoint", default="http://localhost:9003")
+    parser.add_argument("--access-key", default="minioadmin")
+    parser.add_argument("--secret-key", default="minioadmin")
+    parser.add_argument("--bucket", default="bench")
+    parser.add_argument("--ops", type=int, default=200, help="Сколько объектов пройдут put/presign/head/delete")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size-kb", type=int, default=64, help="Размер загружаемого объекта")
+    args = parser.parse_args()
+
+    payload = b"x" * args.size_kb * 1024
+    for shared in (False, True):
+        started = time.perf_counter()
+        timings = asyncio.run(run_mode(args, shared, payload))
+        elapsed = time.perf_counter() - started
+        print(f"{'shared' if shared else 'per-op'}: {args.ops} объектов за {elapsed:.2f} с")
+        for operation, values in timings.items():
+            print(f"    {operation:<24} {percentiles(values)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Влияние порядка запросов к LLM на время анализа (LPT — самые длинные первыми).
+
+Книга со «скошенными» листами: много коротких суточных листов и несколько длинных в конце
+(в исходном порядке они запускаются последними и становятся хвостом). Mock LLM
+(mock_llm_server.py) работает в том же процессе, задержка растёт с длиной промпта и ответа,
+параллельность ограничена фиксированным лимитом.
+
+Сравниваются порядок листов в книге и LPT — для одной книги и для нескольких книг,
+которые анализируются одновременно через общий ограничитель.
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/bench_scheduling.py --concurrency 4 --files 3
+"""
+import os
+import time
+import asyncio
+import argparse
+import httpx
+from openai import AsyncOpenAI
+
+
+def make_skewed_workbook(short_sheets: int, long_sheets: int, long_rows: int, seed: int) -> bytes:
+    from workbook_generator import generate_workbook
+
+    rows = [4] * short_sheets + [long_rows] * long_sheets
+    return generate_workbook(len(rows), rows=rows, words=12, seed=seed)
+
+
+async def run_mode(args: argparse.Namespace, longest_first: bool, workbooks: list[bytes]) -> float:
+    from mock_llm_server import app
+    from reportable_app.apps.analyzer.services.analyzer import AnalyzerService
+    from reportable_app.apps.analyzer.services.limiter import AdaptiveLLMLimiter
+    from reportable_app.apps.analyzer.services.prompt_registry import get_prompt_registry
+
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), timeout=600)
+    client = AsyncOpenAI(api_key="mock", base_url="http://mock/v1", max_retries=0, http_client=http_client)
+    limiter = AdaptiveLLMLimiter(
+        initial_limit=args.concurrency, min_limit=args.concurrency, max_limit=args.concurrency
+    )
+    service = AnalyzerService(
+        client, "mock", get_prompt_registry().current(), limiter=limiter,
+        batch_enabled=True, longest_first=longest_first,
+    )
+
+    started = time.perf_counter()
+    await asyncio.gather(*[service.analyze(content) for content in workbooks])
+    elapsed = time.perf_counter() - started
+    await http_client.aclose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--short-sheets", type=int, default=24)
+    parser.add_argument("--long-sheets", type=int, default=4)
+    parser.add_argument("--long-rows", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=4, help="Фиксированный лимит параллельных запросов")
+    parser.add_argument("--files", type=int, default=1, help="Сколько книг анализировать одновременно")
+    parser.add_argument("--prompt-tps", type=float, default=4000, help="Скорость чтения промпта mock LLM")
+    parser.add_argument("--completion-tps", type=float, default=400, help="Скорость генерации mock LLM")
+    args = parser.parse_args()
+
+    # Задержка mock зависит от длины запроса; разброс убран, чтобы сравнение было детерминированным
+    os.environ.update({
+        "MOCK_LLM_TTFB_MEDIAN": "0.05",
+        "MOCK_LLM_TTFB_SIGMA": "0",
+        "MOCK_LLM_PROMPT_TOKENS_PER_SECOND": str(args.prompt_tps),
+        "MOCK_LLM_TOKENS_PER_SECOND": str(args.completion_tps),
+        "MOCK_LLM_SEED": "1",
+    })
+
+    for files in sorted({1, args.files}):
+        workbooks = [
+            make_skewed_workbook(args.short_sheets, args.long_sheets, args.long_rows, seed=i) for i in range(files)
+        ]
+        in_order = asyncio.run(run_mode(args, False, workbooks))
+        lpt = asyncio.run(run_mode(args, True, workbooks))
+        print(f"Книг: {files}, лимит {args.concurrency}: порядок книги {in_order:.2f} с, "
+              f"LPT {lpt:.2f} с ({1 - lpt / in_order:.0%} быстрее)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Нагрузочный тест анализа файлов: POST /api/analyzer/analyze/ с заданной частотой (открытая
+модель нагрузки — запросы отправляются по расписанию, не дожидаясь предыдущих) и опрос
+GET /api/analyzer/{task_id} до завершения каждой задачи.
+
+Отчёт: сколько задач принято, отклонено и выполнено, пропускная способность и перцентили
+времени ответа на загрузку и полного времени анализа. --output сохраняет отчёт в JSON.
+
+Стенд (из web/backend):
+    docker compose -f docker/docker-compose.yml up -d          # Postgres, Redis, MinIO
+    cd reportable-app
+    PYTHONPATH=. python benchmarks/mock_llm_server.py --port 8090 &
+    REPORTABLE_SERVICE_APP_LLM__BASE_URL=http://localhost:8090/v1 ./run.sh &
+    PYTHONPATH=. python benchmarks/load_test.py --rps 2 --duration 60 --sheets 30 --output results.json
+"""
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from dataclasses import dataclass, field
+from typing import Optional
+import httpx
+from workbook_generator import generate_workbook
+
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@dataclass
+class RequestResult:
+    submit_status: Optional[int] = None
+    submit_seconds: Optional[float] = None
+    final_status: Optional[str] = None
+    total_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadTestReport:
+    results: list[RequestResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    def summary(self) -> dict:
+        submitted = [r for r in self.results if r.submit_status is not None]
+        accepted = [r for r in submitted if r.submit_status == 202]
+        done = [r for r in accepted if r.final_status == "done"]
+        return {
+            "sent": len(self.results),
+            "accepted": len(accepted),
+            "rejected": {str(code): sum(1 for r in submitted if r.submit_status == code)
+                         for code in sorted({r.submit_status for r in submitted} - {202})},
+            "errors": sum(1 for r in self.results if r.error),
+            "done": len(done),
+            "failed": sum(1 for r in accepted if r.final_status == "failed"),
+            "timed_out": sum(1 for r in accepted if r.final_status is None),
+            "wall_seconds": round(self.wall_seconds, 2),
+            "throughput_per_minute": round(len(done) / self.wall_seconds * 60, 2) if self.wall_seconds else 0.0,
+            "submit_latency": percentiles([r.submit_seconds for r in submitted if r.submit_seconds is not None]),
+            "analysis_latency": percentiles([r.total_seconds for r in done if r.total_seconds is not None]),
+        }
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def q(p: float) -> float:
+        return round(values[min(len(values) - 1, int(p * len(values)))], 3)
+
+    return {"p50": q(0.5), "p90": q(0.9), "p99": q(0.99), "max": round(values[-1], 3),
+            "mean": round(statistics.fmean(values), 3)}
+
+
+async def run_one(client: httpx.AsyncClient, content: bytes, args: argparse.Namespace) -> RequestResult:
+    result = RequestResult()
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            "/api/analyzer/analyze/",
+            params={"force": str(args.force).lower()},
+            files={"file": ("report.xlsx", content, XLSX_CONTENT_TYPE)},
+        )
+        result.submit_seconds = time.perf_counter() - started
+        result.submit_status = response.status_code
+        if response.status_code != 202:
+            return result
+
+        task_id = response.json()["id"]
+        deadline = started + args.timeout
+        while time.perf_counter() < deadline:
+            status = (await client.get(f"/api/analyzer/{task_id}")).json()["status"]
+            if status in ("done", "failed"):
+                result.final_status = status
+                result.total_seconds = time.perf_counter() - started
+                break
+            await asyncio.sleep(args.poll_interval)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run(args: argparse.Namespace) -> LoadTestReport:
+    total = max(1, int(args.rps * args.duration))
+    # Книги генерируются заранее, чтобы генерация не влияла на темп нагрузки
+    workbooks = await asyncio.to_thread(
+        lambda: [generate_workbook(args.sheets, seed=args.seed + i) for i in range(min(total, args.distinct))]
+    )
+    print(f"Отправка {total} файлов ({args.sheets} листов) с частотой {args.rps}/с на {args.base_url}")
+
+    report = LoadTestReport()
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            delay = started + i / args.rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(run_one(client, workbooks[i % len(workbooks)], args)))
+        report.results = await asyncio.gather(*tasks)
+        report.wall_seconds = time.perf_counter() - started
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--rps", type=float, default=1.0, help="Загрузок в секунду")
+    parser.add_argument("--duration", type=float, default=30.0, help="Сколько секунд отправлять запросы")
+    parser.add_argument("--sheets", type=int, default=30, help="Суточных листов в книге")
+    parser.add_argument("--distinct", type=int, default=1000, help="Сколько разных книг (остальные повторяются)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-force", dest="force", action="store_false",
+                        help="Разрешить переиспользование готовых результатов для одинаковых файлов")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="Предельное время одной задачи")
+    parser.add_argument("--output", help="Файл для отчёта в JSON")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args)).summary()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "summary": summary}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
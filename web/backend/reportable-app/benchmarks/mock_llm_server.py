@@ -0,0 +1,226 @@
+"""
+Локальный OpenAI-совместимый mock LLM для нагрузочных тестов.
+
+Отвечает на POST /v1/chat/completions JSON-ом, соответствующим переданной JSON Schema
+(response_format.json_schema), в том числе пакетной схеме с массивом reports.
+Время ответа: логнормальная задержка до первого байта + чтение промпта и генерация
+completion-токенов с заданными скоростями. 429 отдаются случайно (--error-rate) и при превышении --max-concurrency.
+Для проверки каскада моделей часть ответов можно испортить (--invalid-rate, в том числе по модели):
+даты в них не разбираются.
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/mock_llm_server.py --port 8090 --ttfb-median 1.5 --tokens-per-second 60
+
+Приложение направляется на mock через
+    REPORTABLE_SERVICE_APP_LLM__BASE_URL=http://localhost:8090/v1
+"""
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass
+from datetime import date, timedelta
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from reportable_app.apps.analyzer.services.batching import REPORT_DATE_FIELD
+from reportable_app.apps.analyzer.services.tokens import estimate_tokens
+
+
+@dataclass(frozen=True)
+class MockConfig:
+    ttfb_median: float
+    ttfb_sigma: float
+    tokens_per_second: float
+    prompt_tokens_per_second: float
+    error_rate: float
+    retry_after: float
+    max_concurrency: int
+    invalid_rate: str
+    seed: int
+
+    def invalid_rate_for(self, model: str) -> float:
+        """--invalid-rate 0.2 — для всех моделей; lite=0.3,pro=0 — по подстроке имени модели"""
+        for item in self.invalid_rate.split(","):
+            name, _, rate = item.rpartition("=")
+            if rate.strip() and (not name or name.strip() in model):
+                return float(rate)
+        return 0.0
+
+    @classmethod
+    def from_env(cls) -> "MockConfig":
+        # Настройки передаются через окружение: воркер granian импортирует модуль заново
+        env = os.environ.get
+        return cls(
+            ttfb_median=float(env("MOCK_LLM_TTFB_MEDIAN", "1.0")),
+            ttfb_sigma=float(env("MOCK_LLM_TTFB_SIGMA", "0.5")),
+            tokens_per_second=float(env("MOCK_LLM_TOKENS_PER_SECOND", "50")),
+            prompt_tokens_per_second=float(env("MOCK_LLM_PROMPT_TOKENS_PER_SECOND", "0")),
+            error_rate=float(env("MOCK_LLM_ERROR_RATE", "0")),
+            retry_after=float(env("MOCK_LLM_RETRY_AFTER", "1")),
+            max_concurrency=int(env("MOCK_LLM_MAX_CONCURRENCY", "0")),
+            invalid_rate=env("MOCK_LLM_INVALID_RATE", "0"),
+            seed=int(env("MOCK_LLM_SEED", "0")),
+        )
+
+
+_REPORT_HEADER = re.compile(r"=== Отчёт за (.+?) ===")
+
+
+class CannedResponder:
+    """Строит ответ, валидный по JSON Schema: строки, числа и даты-заглушки"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.invalid = False
+
+    def build(self, schema: dict, prompt: str, invalid: bool = False) -> dict:
+        self.invalid = invalid
+        return self._value(schema, name="", report_dates=_REPORT_HEADER.findall(prompt))
+
+    def _value(self, schema: dict, name: str, report_dates: list[str]):
+        types = schema.get("type", "string")
+        if isinstance(types, list):
+            types = next((t for t in types if t != "null"), "null")
+
+        if types == "object":
+            return {
+                key: self._value(sub, key, report_dates) for key, sub in schema.get("properties", {}).items()
+            }
+        if types == "array":
+            items = schema.get("items", {})
+            # Пакетный ответ: по элементу на каждый отчёт из промпта
+            if REPORT_DATE_FIELD in items.get("properties", {}):
+                return [
+                    {**self._value(items, "", []), REPORT_DATE_FIELD: report_date}
+                    for report_date in report_dates
+                ]
+            return [self._value(items, name, report_dates)]
+        if types in ("number", "integer"):
+            return self.rng.randint(1, 3000)
+        if types == "boolean":
+            return False
+        if types == "null":
+            return None
+        if "дата" in name.lower() or "начало" in name.lower() or "окончание" in name.lower():
+            if self.invalid:
+                return "вчера"
+            return str(date(2024, 1, 1) + timedelta(days=self.rng.randint(0, 365)))
+        return f"{name or 'значение'} {self.rng.randint(1, 999)}"
+
+
+config = MockConfig.from_env()
+rng = random.Random(config.seed or None)
+responder = CannedResponder(rng)
+app = FastAPI(title="Mock LLM")
+
+_in_flight = 0
+_stats = {"requests": 0, "throttled": 0}
+
+
+def _rate_limited() -> JSONResponse:
+    _stats["throttled"] += 1
+    return JSONResponse(
+        status_code=429,
+        headers={"retry-after": str(config.retry_after)},
+        content={"error": {"message": "Rate limit exceeded", "type": "rate_limit_error", "code": "rate_limit"}},
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    global _in_flight
+    body = await request.json()
+    _stats["requests"] += 1
+
+    if rng.random() < config.error_rate:
+        return _rate_limited()
+    if config.max_concurrency and _in_flight >= config.max_concurrency:
+        return _rate_limited()
+
+    messages = body.get("messages", [])
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    json_schema = body.get("response_format", {}).get("json_schema", {}).get("schema", {"type": "object"})
+
+    invalid = rng.random() < config.invalid_rate_for(str(body.get("model", "")))
+    content = json.dumps(responder.build(json_schema, prompt, invalid), ensure_ascii=False)
+    prompt_tokens = estimate_tokens(prompt)
+    completion_tokens = estimate_tokens(content)
+
+    _in_flight += 1
+    try:
+        ttfb = rng.lognormvariate(0, config.ttfb_sigma) * config.ttfb_median
+        generation = completion_tokens / config.tokens_per_second if config.tokens_per_second > 0 else 0
+        if config.prompt_tokens_per_second > 0:
+            generation += prompt_tokens / config.prompt_tokens_per_second
+        await asyncio.sleep(ttfb + generation)
+    finally:
+        _in_flight -= 1
+
+    return {
+        "id": f"chatcmpl-mock-{_stats['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+
+@app.get("/stats")
+async def stats():
+    return {**_stats, "in_flight": _in_flight, "config": config.__dict__}
+
+
+def main() -> None:
+    import granian
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ttfb-median", type=float, default=1.0, help="Медиана задержки до первого байта, с")
+    parser.add_argument("--ttfb-sigma", type=float, default=0.5, help="Разброс (sigma логнормального распределения)")
+    parser.add_argument("--tokens-per-second", type=float, default=50, help="Скорость генерации ответа")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=0,
+                        help="Скорость чтения промпта; 0 — длина промпта не влияет на задержку")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля запросов, получающих 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Заголовок Retry-After у 429, с")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Сверх этого числа запросов — 429; 0 без лимита")
+    parser.add_argument("--invalid-rate", default="0",
+                        help="Доля ответов с неразбираемыми датами: 0.2 или по моделям lite=0.3,pro=0")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for key in (
+        "ttfb_median", "ttfb_sigma", "tokens_per_second", "prompt_tokens_per_second",
+        "error_rate", "retry_after", "max_concurrency", "invalid_rate", "seed",
+    ):
+        os.environ[f"MOCK_LLM_{key.upper()}"] = str(getattr(args, key))
+
+    # Один воркер: лимит параллельности и статистика — состояние процесса
+    granian.Granian(
+        "benchmarks.mock_llm_server:app",
+        address=args.host,
+        port=args.port,
+        interface="asgi",
+        workers=1,
+    ).serve()
+
+
+if __name__ == "__main__":
+    main()
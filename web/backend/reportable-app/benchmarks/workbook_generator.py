@@ -0,0 +1,132 @@
+"""
+Синтетические книги суточных рапортов по скважине для бенчмарков.
+
+Структура как у реальных файлов: лист «Текущая», лист «Сводка» (дата в столбце 0,
+текст в столбце 3) и по листу на каждый день с именем-датой ДД.ММ.ГГГГ.
+Разные seed дают разный текст, поэтому ответы LLM для таких книг не берутся из кэша.
+
+Размер и плотность задаются параметрами:
+- sheets — число суточных листов
+- rows — строк операций на листе (число или список по листам — для книг с листами разной длины)
+- cols — ширина таблицы операций (первые 4 колонки — время, часы, описание, примечание)
+- density — доля заполненных ячеек в дополнительных колонках (остальные пустые)
+- words — число слов в описании операции
+- cyrillic — русский текст или тот же текст латиницей (другой размер в байтах и токенах)
+- extra_sheets — листы-справочники без даты в названии после суточных (rows x cols, все ячейки заполнены)
+
+Запуск из web/backend/reportable-app:
+    PYTHONPATH=. python benchmarks/workbook_generator.py --sheets 100 --rows 40 --output book.xlsx
+"""
+import io
+import random
+import argparse
+from datetime import date, timedelta
+from openpyxl import Workbook
+
+
+HEADER = "СУТОЧНЫЙ РАПОРТ О ХОДЕ РАБОТ ПО ТЕКУЩЕМУ И КАПИТАЛЬНОМУ РЕМОНТУ СКВАЖИН"
+TABLE_HEADER = ["Время", "Продолжительность", "Описание выполненных операций", "Примечание"]
+OPERATIONS = (
+    "Промывка скважины", "Проработка колонны", "Спуск НКТ", "Подъём НКТ", "Глушение скважины",
+    "Опрессовка колонны", "Монтаж ПА", "Демонтаж ПА", "Ожидание спецтехники", "Шаблонирование",
+)
+WORDS = (
+    "бригада", "произвела", "спуск", "подъём", "насосно-компрессорных", "труб", "до", "глубины",
+    "интервал", "промывка", "раствором", "циркуляция", "восстановлена", "давление", "на", "устье",
+    "герметично", "проведена", "замена", "задвижки", "ожидание", "технологической", "техники",
+    "выполнен", "монтаж", "превентора", "по", "плану", "работ", "заказчика",
+)
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "",
+    "э": "e", "ю": "yu", "я": "ya",
+    "А": "A", "Б": "B", "В": "V", "Г": "G", "Д": "D", "Е": "E", "Ё": "E", "Ж": "Zh", "З": "Z", "И": "I",
+    "Й": "Y", "К": "K", "Л": "L", "М": "M", "Н": "N", "О": "O", "П": "P", "Р": "R", "С": "S", "Т": "T",
+    "У": "U", "Ф": "F", "Х": "H", "Ц": "Ts", "Ч": "Ch", "Ш": "Sh", "Щ": "Sch", "Ъ": "", "Ы": "Y", "Ь": "",
+    "Э": "E", "Ю": "Yu", "Я": "Ya",
+})
+
+
+def generate_workbook(
+    sheets: int = 30,
+    rows: int | list[int] = 8,
+    cols: int = 4,
+    density: float = 1.0,
+    words: int = 8,
+    cyrillic: bool = True,
+    seed: int = 0,
+    start: date = date(2024, 3, 1),
+    extra_sheets: int = 0,
+) -> bytes:
+    """Книга из sheets суточных листов; одинаковые параметры и seed дают одинаковый текст"""
+    rng = random.Random(seed)
+    text = (lambda value: value) if cyrillic else (lambda value: value.translate(_TRANSLIT))
+    well = rng.randint(1000, 9999)
+    workbook = Workbook(write_only=True)
+
+    workbook.create_sheet("Текущая").append([text(f"Скважина {well}"), text(f"Куст {rng.randint(1, 99)}")])
+    summary = workbook.create_sheet("Сводка")
+    days = [start + timedelta(days=i) for i in range(sheets)]
+    for day in days:
+        summary.append([day.strftime("%d.%m.%Y"), None, None, text(f"{rng.choice(OPERATIONS)}. Работы по плану.")])
+
+    rows_per_sheet = rows if isinstance(rows, list) else [rows] * sheets
+    for day, sheet_rows in zip(days, rows_per_sheet):
+        sheet = workbook.create_sheet(day.strftime("%d.%m.%Y"))
+        sheet.append([text(HEADER)])
+        sheet.append([text("Месторождение"), text("Самотлорское"), text("Инв. №"), text(f"{well}-Р")])
+        sheet.append([text(value) for value in TABLE_HEADER])
+        for hour in range(sheet_rows):
+            description = " ".join(rng.choice(WORDS) for _ in range(max(0, words - 2)))
+            row = [
+                f"{(8 + hour) % 24:02d}:00",
+                1,
+                text(f"{rng.choice(OPERATIONS)}, {description} {rng.randint(100, 2500)} м"),
+                "",
+            ]
+            # Дополнительные колонки: заполнены с вероятностью density
+            row.extend(
+                text(f"{rng.choice(WORDS)} {rng.randint(1, 99)}") if rng.random() < density else None
+                for _ in range(cols - len(row))
+            )
+            sheet.append(row)
+        sheet.append([text(
+            f"Заглушили скважину раствором уд.веса 1,{rng.randint(10, 30)} г/см3 в объеме {rng.randint(15, 60)} м3."
+        )])
+
+    for i in range(extra_sheets):
+        sheet = workbook.create_sheet(text(f"Справочник {i + 1}"))
+        for r in range(max(rows_per_sheet, default=0)):
+            sheet.append([text(f"Справка {r}.{c}: {rng.choice(WORDS)}") for c in range(cols)])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sheets", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--density", type=float, default=1.0)
+    parser.add_argument("--words", type=int, default=8)
+    parser.add_argument("--latin", dest="cyrillic", action="store_false", help="Текст латиницей")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--extra-sheets", type=int, default=0, help="Листы без даты в названии")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    content = generate_workbook(
+        args.sheets, args.rows, args.cols, args.density, args.words, args.cyrillic, args.seed,
+        extra_sheets=args.extra_sheets,
+    )
+    with open(args.output, "wb") as f:
+        f.write(content)
+    print(f"{args.output}: {args.sheets} листов, {len(content) / 1024:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()
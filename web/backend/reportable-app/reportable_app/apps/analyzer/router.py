@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends
+from .schemas import LLMCacheStatsSchema, LLMLimiterStatsSchema, LLMHedgingStatsSchema, CascadeStatsSchema, PromptVersionsSchema, RuleStatsSchema, CompactionStatsSchema
+from .repositories.llm_cache import LLMResponseRedisRepositoryProtocol
+from .services import cascade, compaction, rules
+from .services.limiter import AdaptiveLLMLimiter, get_llm_limiter
+from .services.hedging import LLMRequestPolicy, get_llm_request_policy
+from .services.prompt_registry import PromptRegistry, get_prompt_registry
+from .depends import get_llm_cache_repository
+
+router = APIRouter(prefix='/api/analyzer', tags=['Analyzer'])
+
+
+@router.get('/cache/stats', response_model=LLMCacheStatsSchema)
+async def get_cache_stats(
+    response_cache: LLMResponseRedisRepositoryProtocol = Depends(get_llm_cache_repository)
+) -> LLMCacheStatsSchema:
+    return LLMCacheStatsSchema(**await response_cache.stats())
+
+
+@router.get('/llm/limiter', response_model=LLMLimiterStatsSchema)
+async def get_limiter_stats(
+    limiter: AdaptiveLLMLimiter = Depends(get_llm_limiter)
+) -> LLMLimiterStatsSchema:
+    return LLMLimiterStatsSchema(**limiter.stats())
+
+
+@router.get('/llm/hedging', response_model=LLMHedgingStatsSchema)
+async def get_hedging_stats(
+    request_policy: LLMRequestPolicy = Depends(get_llm_request_policy)
+) -> LLMHedgingStatsSchema:
+    return LLMHedgingStatsSchema(**request_policy.stats())
+
+
+@router.get('/llm/cascade', response_model=CascadeStatsSchema)
+async def get_cascade_stats(
+    cascade_stats: cascade.CascadeStats = Depends(cascade.get_cascade_stats)
+) -> CascadeStatsSchema:
+    return CascadeStatsSchema(**cascade_stats.stats())
+
+
+@router.get('/prompts', response_model=PromptVersionsSchema)
+async def get_prompt_versions(
+    prompt_registry: PromptRegistry = Depends(get_prompt_registry)
+) -> PromptVersionsSchema:
+    return PromptVersionsSchema(**prompt_registry.stats())
+
+
+@router.get('/rules/stats', response_model=RuleStatsSchema)
+async def get_rule_stats(
+    rule_stats: rules.RuleAgreementStats = Depends(rules.get_rule_stats)
+) -> RuleStatsSchema:
+    return RuleStatsSchema(**rule_stats.stats())
+
+
+@router.get('/compaction/stats', response_model=CompactionStatsSchema)
+async def get_compaction_stats(
+    compaction_stats: compaction.CompactionStats = Depends(compaction.get_compaction_stats)
+) -> CompactionStatsSchema:
+    return CompactionStatsSchema(**compaction_stats.stats())
@@ -0,0 +1,88 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class LLMCacheStatsSchema(BaseModel):
+    hits: int = Field(..., description="Number of cache hits")
+    misses: int = Field(..., description="Number of cache misses")
+    hit_ratio: float = Field(..., description="Share of hits among all lookups")
+    entries: int = Field(..., description="Number of cached responses")
+    max_entries: int = Field(..., description="Cache size limit")
+    ttl: int = Field(..., description="Time to live of a cached response, seconds")
+
+
+class LLMLimiterStatsSchema(BaseModel):
+    limit: float = Field(..., description="Current adaptive concurrency limit")
+    min_limit: int = Field(..., description="Lower bound of the limit")
+    max_limit: int = Field(..., description="Upper bound of the limit")
+    in_flight: int = Field(..., description="Requests currently sent to the LLM")
+    queued: int = Field(..., description="Requests waiting for a free slot")
+    backing_off: int = Field(..., description="Requests waiting before a retry")
+    latency_ewma: Optional[float] = Field(None, description="Smoothed request latency, seconds")
+    requests: int = Field(..., description="Requests sent since process start")
+    errors: int = Field(..., description="Failed requests since process start")
+    throttled: int = Field(..., description="Rate-limited, 5xx or timed out requests")
+    retries: int = Field(..., description="Retries performed")
+
+
+class LLMLatencyBucketSchema(BaseModel):
+    model: str = Field(..., description="Model the latencies were measured for")
+    max_tokens: int = Field(..., description="Upper bound of the request size bucket, tokens")
+    samples: int = Field(..., description="Latencies kept for the bucket")
+    p50: Optional[float] = Field(None, description="Median latency, seconds")
+    p90: Optional[float] = Field(None, description="90th percentile latency, seconds")
+    p99: Optional[float] = Field(None, description="99th percentile latency, seconds")
+    timeout: float = Field(..., description="Attempt timeout for the largest request of the bucket, seconds")
+
+
+class LLMHedgingStatsSchema(BaseModel):
+    hedging_enabled: bool = Field(..., description="Whether slow attempts are duplicated")
+    requests: int = Field(..., description="Attempts sent since process start")
+    hedged: int = Field(..., description="Attempts duplicated after the bucket's hedge quantile")
+    hedge_rate: float = Field(..., description="Share of duplicated attempts (extra spend)")
+    hedge_wins: int = Field(..., description="Duplicates that answered before the original attempt")
+    saved_seconds: float = Field(..., description="Estimated latency saved by duplicates, seconds")
+    buckets: list[LLMLatencyBucketSchema] = Field(default_factory=list)
+
+
+class CascadeModelStatsSchema(BaseModel):
+    model: str = Field(..., description="Model of the cascade")
+    requests: int = Field(..., description="Requests answered or failed by the model")
+    accepted: int = Field(..., description="Answers that passed validation")
+    escalated: int = Field(..., description="Requests passed to the next model")
+    invalid: int = Field(..., description="Invalid answers of the last model, returned as is")
+    failed: int = Field(..., description="Errors of the last model")
+    reasons: dict[str, int] = Field(default_factory=dict, description="Escalation reasons: json, schema, sanity, error")
+    acceptance: Optional[float] = Field(None, description="Share of accepted answers")
+
+
+class CascadeStatsSchema(BaseModel):
+    routed_long: int = Field(..., description="Requests over the length threshold sent straight to the last model")
+    models: list[CascadeModelStatsSchema] = Field(default_factory=list)
+
+
+class PromptVersionsSchema(BaseModel):
+    prompt_version: str = Field(..., description="Version of the loaded system prompt")
+    schema_version: str = Field(..., description="Version of the loaded JSON schema")
+    reloads: int = Field(..., description="Reloads after file changes since process start")
+
+
+class CompactionStatsSchema(BaseModel):
+    reports: int = Field(..., description="Compacted reports since process start")
+    tokens_before: int = Field(..., description="Estimated input tokens before compaction")
+    tokens_after: int = Field(..., description="Estimated input tokens after compaction")
+    saved_ratio: Optional[float] = Field(None, description="Share of tokens removed by compaction")
+
+
+class RuleFieldStatsSchema(BaseModel):
+    field: str = Field(..., description="Schema field filled by the rules")
+    compared: int = Field(..., description="Reports where both the rules and the LLM returned a value")
+    agreed: int = Field(..., description="Reports where the values matched")
+    llm_empty: int = Field(..., description="Reports where only the rules found a value")
+    agreement: Optional[float] = Field(None, description="Share of matches among compared reports")
+
+
+class RuleStatsSchema(BaseModel):
+    skipped_reports: int = Field(..., description="Empty or trivially short reports filled without the LLM")
+    reduced_reports: int = Field(..., description="Reports sent to the LLM with a reduced schema")
+    fields: list[RuleFieldStatsSchema] = Field(..., description="Per-field agreement between the rules and the LLM")
@@ -1,17 +1,47 @@
 import os
-import pandas as pd
 import json
-import io
+import math
+import hashlib
 import asyncio
+import logging
 from openai import AsyncOpenAI
 from fastapi import UploadFile
-from datetime import datetime, timezone
-from typing import Protocol
+from typing import Awaitable, Callable, Iterable, Optional, Protocol
 from typing_extensions import Self
+from ....core.utils.single_flight import SingleFlight
+from ....core.metrics import LLM_ERRORS, LLM_REQUEST_DURATION, LLM_TOKENS, observe_duration
+from ....core.utils.telemetry import current_llm_call, current_trace, trace_llm_attempt, trace_llm_call, trace_stage
+from ..repositories.llm_cache import LLMResponseRedisRepositoryProtocol
+from .limiter import AdaptiveLLMLimiter
+from .hedging import LLMRequestPolicy
+from .cascade import CascadeStats
+from .chunking import merge_partials, split_report
+from .well_header import apply_header, create_header_prompt, create_header_text, header_fields, make_header_schema
+from .validation import ValidationIssue, validate_response
+from .excel_parser import ExcelParserProtocol, extract_header_text, extract_reports
+from .batching import plan_batches, create_batch_prompt, make_batch_schema, split_batch_response
+from .prompt_registry import PromptConfig
+from .rules import RuleAgreementStats, extract_fields, make_sub_schema, empty_result, merge_fields
+from .tokens import estimate_tokens
+from .compaction import CompactionStats, ReportCompactor
+
+logger = logging.getLogger(__name__)
+
+
+# Колбэк прогресса: (обработано отчётов, всего отчётов)
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+# Одинаковые запросы к LLM внутри процесса выполняются один раз
+_llm_single_flight: SingleFlight[str] = SingleFlight()
 
 
 class AnalyzerServiceProtocol(Protocol):
-    async def analyze(self: Self, content: bytes) -> dict:
+    # Отпечаток конфигурации анализа: при смене любого из полей старые результаты не переиспользуются
+    model_url: str
+    prompt_version: str
+    schema_version: str
+
+    async def analyze(self: Self, content: bytes, on_progress: Optional[ProgressCallback] = None) -> dict:
         """
         Передаётся файл как UploadFile, прочитать можно как await file.read(), если нужно именно такое, 
         то давайте поменяем входные данные и будет не UploadFile, а bytes, потому что такая же операция проводится в другом сервисе.
@@ -23,6 +53,8 @@ class AnalyzerServiceProtocol(Protocol):
         } 
 
         колонка1 должна иметь название такое же, как в выводящей таблице 
+
+        on_progress вызывается после извлечения отчётов и после обработки каждого из них
         """
         ...
 
@@ -30,7 +62,11 @@ class ExampleAnalyzerService(AnalyzerServiceProtocol):
     """
     Если __init__ будешь менять, то в depends.py тоже нужно будет поменять
     """
-    async def analyze(self: Self, content: bytes) -> dict:
+    model_url = "example"
+    prompt_version = "example"
+    schema_version = "example"
+
+    async def analyze(self: Self, content: bytes, on_progress: Optional[ProgressCallback] = None) -> dict:
         return {
             "column1": ["value1", "value2"],
             "column2": ["value3", "value4"]
@@ -42,42 +78,177 @@ class AnalyzerService(AnalyzerServiceProtocol):
     Реализует интерфейс AnalyzerServiceProtocol.
     """
 
-    def __init__(self, api_key: str, model_url: str, prompts_path: str, schema_path: str):
-        # Используем AsyncOpenAI для параллельных запросов
-        self.client = AsyncOpenAI(api_key=api_key, base_url="https://llm.api.cloud.yandex.net/v1")
-        self.model_url = model_url
+    def __init__(self, client: AsyncOpenAI, model_url: str, prompt_config: PromptConfig,
+                 response_cache: Optional[LLMResponseRedisRepositoryProtocol] = None,
+                 limiter: Optional[AdaptiveLLMLimiter] = None,
+                 excel_parser: Optional[ExcelParserProtocol] = None,
+                 batch_enabled: bool = False,
+                 batch_short_report_tokens: int = 1500,
+                 batch_token_budget: int = 6000,
+                 batch_max_reports: int = 6,
+                 rules_enabled: bool = False,
+                 rules_verify_ratio: float = 0.1,
+                 rules_min_tokens: int = 30,
+                 rule_stats: Optional[RuleAgreementStats] = None,
+                 compactor: Optional[ReportCompactor] = None,
+                 compaction_stats: Optional[CompactionStats] = None,
+                 tsv: bool = False,
+                 longest_first: bool = False,
+                 request_policy: Optional[LLMRequestPolicy] = None,
+                 models: Optional[list[str]] = None,
+                 cascade_max_tokens: int = 4000,
+                 cascade_stats: Optional[CascadeStats] = None,
+                 chunking_enabled: bool = False,
+                 chunk_max_tokens: int = 8000,
+                 header_enabled: bool = False,
+                 header_max_tokens: int = 3000,
+                 answer_tokens_min: int = 1024,
+                 answer_tokens_max: int = 16384):
+        # Общий на процесс AsyncOpenAI (пул соединений), повторы выполняет limiter
+        self.client = client
+        # Каскад моделей от дешёвой к крупной: ответ, не прошедший проверку, уходит следующей модели.
+        # Запросы длиннее cascade_max_tokens сразу идут последней. model_url — отпечаток всего каскада
+        self.models = models or [model_url]
+        self.model_url = self.models[0] if len(self.models) == 1 else " > ".join(self.models)
+        self.cascade_max_tokens = cascade_max_tokens
+        self.cascade_stats = cascade_stats or CascadeStats()
 
-        # Загружаем системный промпт и JSON Schema
-        with open(prompts_path, "r", encoding="utf-8") as f:
-            self.prompts = json.load(f)
-        self.system_prompt = self.prompts["system_prompt"]
+        # Отчёты длиннее chunk_max_tokens делятся по строкам на части, которые разбираются
+        # параллельно и объединяются по правилам полей (map-reduce)
+        self.chunking_enabled = chunking_enabled
+        self.chunk_max_tokens = chunk_max_tokens
+        self.response_cache = response_cache
+        self.limiter = limiter
+        # Таймауты по размеру запроса и дублирование медленных попыток (None — таймаут клиента)
+        self.request_policy = request_policy
+        self.excel_parser = excel_parser
 
-        with open(schema_path, "r", encoding="utf-8") as f:
-            self.json_schema = json.load(f)
+        # Короткие отчёты объединяются в один запрос, чтобы не пересылать промпт и схему для каждого
+        self.batch_enabled = batch_enabled
+        self.batch_short_report_tokens = batch_short_report_tokens
+        self.batch_token_budget = batch_token_budget
+        self.batch_max_reports = batch_max_reports
 
+        # Поля, найденные правилами, не запрашиваются у модели; часть отчётов всё же идёт
+        # с полной схемой, чтобы считать согласованность правил с LLM
+        self.rules_enabled = rules_enabled
+        self.rules_verify_ratio = rules_verify_ratio
+        self.rules_min_tokens = rules_min_tokens
+        self.rule_stats = rule_stats or RuleAgreementStats()
+        self._sub_schemas: dict[frozenset, dict] = {}
 
-    async def analyze(self: Self, content: bytes) -> dict:
+        # Сжатие текстов перед промптом (None — отправлять как есть)
+        self.compactor = compactor
+        self.compaction_stats = compaction_stats or CompactionStats()
+        self.tsv = tsv
+
+        # Системный промпт и JSON Schema из реестра: весь анализ идёт с одной версией
+        self.system_prompt = prompt_config.system_prompt
+        self.json_schema = prompt_config.json_schema
+        self.batch_json_schema = prompt_config.batch_json_schema
+        self.prompt_version = prompt_config.prompt_version
+        self.schema_version = prompt_config.schema_version
+
+        # Общие для книги поля (шапка скважины) извлекаются одним запросом на книгу,
+        # запросы по листам идут со схемой без них
+        self._header_fields = header_fields(self.json_schema) if header_enabled else ()
+        self.header_max_tokens = header_max_tokens
+        self._header_schema = make_header_schema(self.json_schema)
+        if self._header_fields:
+            self._sheet_schema = self._get_sub_schema(set(self._header_fields))
+            self._sheet_batch_schema = make_batch_schema(self._sheet_schema)
+        else:
+            self._sheet_schema = self.json_schema
+            self._sheet_batch_schema = self.batch_json_schema
+
+        # Самые длинные запросы запускаются первыми, чтобы не стать хвостом анализа (LPT).
+        # Длительность оценивается в токенах: вход плюс ожидаемый ответ на каждый отчёт
+        self.longest_first = longest_first
+        # Лимит ответа по размеру запроса: модель только переносит данные из текста в поля схемы
+        self.answer_tokens_min = answer_tokens_min
+        self.answer_tokens_max = answer_tokens_max
+        self._answer_tokens = estimate_tokens(json.dumps(empty_result(self._sheet_schema), ensure_ascii=False))
+
+
+    async def analyze(self: Self, content: bytes, on_progress: Optional[ProgressCallback] = None) -> dict:
         """
         Анализирует Excel-файл с отчётами.
         Возвращает таблицу в виде dict для вывода в интерфейсе.
         """
-        # Читаем файл в байтах и создаём ExcelFile из потока
-        excel = pd.ExcelFile(io.BytesIO(content))
+        # --- 1️⃣ Извлекаем отчёты по датам (вне event loop) ---
+        with trace_stage("parse"):
+            if self._header_fields:
+                reports, workbook_text = await asyncio.gather(
+                    self._extract_reports(content), self._extract_header_text(content)
+                )
+            else:
+                reports, workbook_text = await self._extract_reports(content), ""
+        # Начало первого листа для шапки берётся до сжатия: сжатие убирает повторяющиеся строки
+        first_report = next(iter(reports.values()), "")
 
-        # --- 1️⃣ Извлекаем отчёты по датам ---
-        reports = self._extract_reports(excel)
+        if self.compactor is not None:
+            with trace_stage("compaction"):
+                reports, tokens = await asyncio.to_thread(self.compactor.compact, reports)
+            self.compaction_stats.record(tokens)
+            for date, (before, after) in tokens.items():
+                logger.debug(f"Sheet {date} compacted: {before} -> {after} tokens")
+        dates_list = list(reports.keys())
+        total = len(dates_list)
+
+        # Пустые и почти пустые листы заполняются без LLM
+        results_by_date = self._skip_trivial_reports(reports)
+        pending = [(date, text) for date, text in reports.items() if date not in results_by_date]
+        processed = len(results_by_date)
+
+        if on_progress:
+            await on_progress(processed, total)
 
         # --- 2️⃣ Анализируем все отчёты ПАРАЛЛЕЛЬНО через LLM ---
-        tasks = []
-        dates_list = list(reports.keys())
-        
-        for date, text in reports.items():
-            task = self._process_single_report(date, text)
-            tasks.append(task)
-        
-        # Запускаем все задачи параллельно
-        print(f"[INFO] Запуск параллельной обработки {len(tasks)} отчётов...")
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if self.batch_enabled:
+            groups = plan_batches(
+                pending,
+                short_report_tokens=self.batch_short_report_tokens,
+                token_budget=self.batch_token_budget,
+                max_reports=self.batch_max_reports,
+            )
+        else:
+            groups = [[item] for item in pending]
+
+        if self.longest_first:
+            groups.sort(key=lambda group: self._estimate_tokens(text for _, text in group), reverse=True)
+
+        tasks = [asyncio.create_task(self._process_group(group)) for group in groups]
+        # Шапка скважины извлекается параллельно с запросами по листам
+        header_task = None
+        if self._header_fields and pending:
+            header_task = asyncio.create_task(
+                self._extract_header(create_header_text(workbook_text, first_report, self.header_max_tokens))
+            )
+
+        # Собираем результаты по мере готовности, чтобы сообщать о прогрессе
+        print(f"[INFO] Запуск параллельной обработки {len(pending)} отчётов в {len(tasks)} запросах...")
+        try:
+            with trace_stage("llm"):
+                for future in asyncio.as_completed(tasks):
+                    group_results = await future
+                    results_by_date.update(group_results)
+                    processed += len(group_results)
+                    if on_progress:
+                        await on_progress(processed, total)
+                header = await header_task if header_task is not None else {}
+        finally:
+            for task in tasks:
+                task.cancel()
+            if header_task is not None:
+                header_task.cancel()
+
+        if header:
+            for date, result in results_by_date.items():
+                if isinstance(result, dict):
+                    results_by_date[date] = apply_header(self.json_schema, result, header)
+
+        # Сохраняем исходный порядок листов
+        results = [results_by_date.get(date) for date in dates_list]
         
         # --- 3️⃣ Собираем результаты в словарь {дата: данные} ---
         result_data = {}
@@ -90,10 +261,11 @@ class AnalyzerService(AnalyzerServiceProtocol):
                 continue
             
             if result is not None:
-                # Получаем дату начала мероприятия из результата или используем текущую
+                # Ключ — дата начала мероприятия из результата или дата листа: листы без даты
+                # (например, заполненные только правилами) не затирают друг друга
                 start_event = result.get("Начало мероприятия")
                 if not start_event:
-                    start_event = str(datetime.now(timezone.utc).date())
+                    start_event = date
                 
                 result_data[start_event] = result
                 print(f"[SUCCESS] Отчёт для даты {date} обработан успешно")
@@ -109,16 +281,141 @@ class AnalyzerService(AnalyzerServiceProtocol):
     # Вспомогательные методы
     # -------------------------------
 
+    async def _extract_reports(self, content: bytes) -> dict[str, str]:
+        if self.excel_parser is not None:
+            return await self.excel_parser.extract_reports(content, tsv=self.tsv)
+        return await asyncio.to_thread(extract_reports, content, self.tsv)
+
+    async def _extract_header_text(self, content: bytes) -> str:
+        if self.excel_parser is not None:
+            return await self.excel_parser.extract_header(content)
+        return await asyncio.to_thread(extract_header_text, content)
+
+    async def _extract_header(self, text: str) -> dict:
+        """Общие сведения о скважине одним запросом на книгу; при ошибке — пустая шапка"""
+        try:
+            llm_response = await self._get_llm_response(create_header_prompt(text), self._header_schema)
+            return json.loads(llm_response)
+        except Exception as e:
+            logger.warning(f"Failed to extract well header: {e}")
+            return {}
+
+    def _skip_trivial_reports(self, reports: dict[str, str]) -> dict[str, dict | None]:
+        if not self.rules_enabled:
+            return {}
+
+        results = {}
+        for date, text in reports.items():
+            if estimate_tokens(text) >= self.rules_min_tokens:
+                continue
+            # Модель по такому тексту ничего не добавит: берём то, что нашли правила.
+            # Если правила ничего не нашли, листа в результате нет
+            rule_values = extract_fields(text)
+            if rule_values:
+                results[date] = merge_fields(self.json_schema, empty_result(self.json_schema), rule_values)
+            else:
+                results[date] = None
+            self.rule_stats.record_skipped()
+        return results
+
+    def _apply_rules(self, rule_values: dict, data: dict, full_schema: bool) -> dict:
+        """Дополняет ответ модели полями, найденными правилами"""
+        if not rule_values:
+            return data
+        if full_schema:
+            # Поля шапки в ответе по листу не запрашиваются, сравнивать не с чем
+            self.rule_stats.record({k: v for k, v in rule_values.items() if k not in self._header_fields}, data)
+        return merge_fields(self.json_schema, data, rule_values)
+
+    def _estimate_tokens(self, texts: Iterable[str]) -> int:
+        """Оценка объёма запроса к LLM в токенах: тексты отчётов и ответ на каждый из них"""
+        return sum(estimate_tokens(text) + self._answer_tokens for text in texts)
+
+    def _get_sub_schema(self, exclude: set[str]) -> dict:
+        key = frozenset(exclude)
+        if key not in self._sub_schemas:
+            self._sub_schemas[key] = make_sub_schema(self.json_schema, exclude)
+        return self._sub_schemas[key]
+
+    async def _process_group(self, group: list[tuple[str, str]]) -> dict[str, dict | None]:
+        if len(group) == 1:
+            date, text = group[0]
+            return {date: await self._process_single_report(date, text)}
+        return await self._process_batch(group)
+
+    async def _process_batch(self, group: list[tuple[str, str]]) -> dict[str, dict | None]:
+        """
+        Обрабатывает несколько коротких отчётов одним запросом.
+        Отчёты, уже лежащие в кэше, в запрос не попадают; отчёты, которых нет в ответе
+        модели, обрабатываются по одному.
+        """
+        results: dict[str, dict | None] = {}
+        pending: list[tuple[str, str]] = []
+
+        for date, text in group:
+            cached = await self._get_cached_response(self._make_cache_key(self._create_prompt(text), self._sheet_schema))
+            if cached is not None:
+                results[date] = json.loads(cached)
+            else:
+                pending.append((date, text))
+
+        if len(pending) > 1:
+            try:
+                llm_response = await self._analyze_with_llm(
+                    create_batch_prompt(pending), self._sheet_batch_schema, reports=[date for date, _ in pending]
+                )
+                answers = split_batch_response(json.loads(llm_response))
+            except Exception as e:
+                logger.warning(f"Batch request for {len(pending)} reports failed: {e}")
+                answers = {}
+
+            for date, text in pending:
+                if date in answers:
+                    response = json.dumps(answers[date], ensure_ascii=False)
+                    await self._store_response(self._make_cache_key(self._create_prompt(text), self._sheet_schema), response)
+                    results[date] = answers[date]
+            pending = [(date, text) for date, text in pending if date not in answers]
+
+        if pending:
+            logger.info(f"{len(pending)} reports from the batch are processed one by one")
+            singles = await asyncio.gather(*[self._process_single_report(date, text) for date, text in pending])
+            results.update({date: result for (date, _), result in zip(pending, singles)})
+            single_dates = {date for date, _ in pending}
+        else:
+            single_dates = set()
+
+        # Пакет всегда идёт с полной схемой, поэтому служит и проверкой правил
+        if self.rules_enabled:
+            for date, text in group:
+                if date not in single_dates and results.get(date) is not None:
+                    results[date] = self._apply_rules(extract_fields(text), results[date], full_schema=True)
+
+        return results
+
     async def _process_single_report(self, date: str, text: str) -> dict | None:
         """
         Обрабатывает один отчёт. Возвращает dict или None в случае ошибки.
         """
         try:
+            rule_values = extract_fields(text) if self.rules_enabled else {}
+            full_schema = not rule_values or self._in_verify_sample(text)
+            json_schema = (
+                self._sheet_schema if full_schema else self._get_sub_schema(set(rule_values) | set(self._header_fields))
+            )
+            if not full_schema:
+                self.rule_stats.record_reduced()
+
+            chunks = split_report(text, self.chunk_max_tokens) if self.chunking_enabled else [text]
+            if len(chunks) > 1:
+                data = await self._process_chunks(date, chunks, json_schema)
+                return self._apply_rules(rule_values, data, full_schema) if data is not None else None
+
             user_prompt = self._create_prompt(text)
-            llm_response = await self._analyze_with_llm(user_prompt)
+            llm_response = await self._get_llm_response(user_prompt, json_schema, reports=[date])
             
             try:
                 data = json.loads(llm_response)
+                data = self._apply_rules(rule_values, data, full_schema)
                 return data
             except json.JSONDecodeError as e:
                 print(f"[WARNING] Ошибка парсинга JSON для даты {date}: {e}")
@@ -128,41 +425,91 @@ class AnalyzerService(AnalyzerServiceProtocol):
             print(f"[ERROR] Ошибка обработки отчёта для даты {date}: {e}")
             return None
 
-    def _extract_reports(self, excel: pd.ExcelFile) -> dict[str, str]:
-        sheets = excel.sheet_names
-        if len(sheets) < 3:
-            raise ValueError("Файл должен содержать минимум 3 листа: текущая, сводка и отчёты по датам")
-
-        summary_df = pd.read_excel(excel, sheet_name=sheets[1], header=None)
-        summary_data = {}
-
-        # Сводка
-        for _, row in summary_df.iterrows():
-            if pd.notna(row[0]) and pd.notna(row[3]):
-                try:
-                    date = pd.to_datetime(row[0], dayfirst=True).strftime("%d.%m.%Y")
-                    summary_data[date] = str(row[3]).strip()
-                except Exception:
-                    continue
-
-        # Отчёты по датам
-        reports = {}
-        for sheet in sheets[2:]:
-            df = pd.read_excel(excel, sheet_name=sheet, header=None)
-            text = "\n".join(
-                str(v).strip()
-                for v in df.fillna("").values.flatten()
-                if isinstance(v, str) and v.strip()
-            )
+    def _in_verify_sample(self, text: str) -> bool:
+        """
+        Попадает ли отчёт в долю rules_verify_ratio, которая идёт с полной схемой для проверки правил.
+        Выбор зависит только от текста отчёта: промпт и ключ кэша ответа не меняются от запуска к запуску.
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64 < self.rules_verify_ratio
+
+    async def _process_chunks(self, date: str, chunks: list[str], json_schema: dict) -> dict | None:
+        """Разбирает части длинного отчёта параллельно и объединяет ответы; части с ошибкой пропускаются"""
+        logger.info(f"Report {date} split into {len(chunks)} parts")
+        responses = await asyncio.gather(
+            *[
+                self._get_llm_response(self._create_chunk_prompt(chunk, i, len(chunks)), json_schema, reports=[date])
+                for i, chunk in enumerate(chunks, start=1)
+            ],
+            return_exceptions=True,
+        )
+
+        partials = []
+        for i, response in enumerate(responses, start=1):
             try:
-                date = pd.to_datetime(sheet, dayfirst=True).strftime("%d.%m.%Y")
-            except Exception:
-                continue
+                if isinstance(response, Exception):
+                    raise response
+                partials.append(json.loads(response))
+            except Exception as e:
+                logger.warning(f"Part {i}/{len(chunks)} of report {date} failed: {e}")
+        if not partials:
+            return None
+        return merge_partials(json_schema, partials)
 
-            combined_text = (summary_data.get(date, "") + "\n" + text).strip()
-            reports[date] = combined_text
+    async def _get_llm_response(self, prompt: str, json_schema: Optional[dict] = None,
+                                reports: Optional[list[str]] = None) -> str:
+        """
+        Ответ LLM с учётом кэша. Одновременные одинаковые запросы разделяют один вызов.
+        """
+        cache_key = self._make_cache_key(prompt, json_schema)
+        return await _llm_single_flight.do(
+            cache_key, lambda: self._fetch_llm_response(cache_key, prompt, json_schema, reports)
+        )
+
+    async def _fetch_llm_response(self, cache_key: str, prompt: str, json_schema: Optional[dict] = None,
+                                  reports: Optional[list[str]] = None) -> str:
+        cached = await self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        llm_response = await self._analyze_with_llm(prompt, json_schema, reports)
+        await self._store_response(cache_key, llm_response)
+        return llm_response
+
+    async def _get_cached_response(self, cache_key: str) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        try:
+            cached = await self.response_cache.get_response(cache_key)
+        except Exception as e:
+            logger.warning(f"LLM response cache is unavailable: {e}")
+            return None
 
-        return reports
+        trace = current_trace()
+        if cached is not None and trace is not None:
+            trace.cache_hits += 1
+        return cached
+
+    async def _store_response(self, cache_key: str, llm_response: str) -> None:
+        if self.response_cache is None:
+            return
+        try:
+            # Кэшируем только корректный JSON, чтобы не закрепить ошибку модели
+            json.loads(llm_response)
+            await self.response_cache.set_response(cache_key, llm_response)
+        except json.JSONDecodeError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to store LLM response in cache: {e}")
+
+    def _make_cache_key(self, prompt: str, json_schema: Optional[dict] = None) -> str:
+        """Ключ зависит от модели, промпта и схемы, поэтому их смена сама инвалидирует кэш"""
+        payload = json.dumps(
+            [self.model_url, self.system_prompt, json_schema or self.json_schema, prompt],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
     def _create_prompt(self, text: str) -> str:
         return f"""
@@ -175,16 +522,114 @@ class AnalyzerService(AnalyzerServiceProtocol):
         {text}
         """
 
-    async def _analyze_with_llm(self, prompt: str) -> str:
-        response = await self.client.chat.completions.create(
-            model=self.model_url,
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.0,
-            max_tokens=16384,
-            stream=False,
-            response_format={"type": "json_schema", "json_schema": self.json_schema}
-        )
+    def _create_chunk_prompt(self, text: str, index: int, total: int) -> str:
+        return f"""
+        Ниже приведена часть {index} из {total} длинного текстового отчёта о скважине.
+        Проанализируй её и заполни поля JSON-схемы данными, найденными в этой части.
+        Если каких-то данных в этой части нет — ставь пустую строку "".
+        Помни: вывод должен строго соответствовать JSON Schema и быть корректным JSON-объектом.
+
+        Текст части отчёта:
+        {text}
+        """
+
+    async def _analyze_with_llm(self, prompt: str, json_schema: Optional[dict] = None,
+                                reports: Optional[list[str]] = None) -> str:
+        json_schema = json_schema or self.json_schema
+        # Оценка размера запроса: приоритет в очереди ограничителя, корзина для таймаута и выбор моделей
+        size = estimate_tokens(prompt) + len(reports or [prompt]) * self._answer_tokens
+        if len(self.models) == 1:
+            return await self._request_model(self.models[0], prompt, json_schema, reports, size)
+
+        label = ", ".join(reports or []) or "request"
+        models = self.models
+        # Порог длины — на отчёт: пакет коротких отчётов проходит каскад как обычно
+        report_size = size // len(reports or [prompt])
+        if report_size > self.cascade_max_tokens:
+            models = self.models[-1:]
+            self.cascade_stats.record_long()
+            logger.info(f"Route {label}: {report_size} tokens > {self.cascade_max_tokens}, straight to {models[0]}")
+
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            try:
+                llm_response = await self._request_model(model, prompt, json_schema, reports, size)
+            except Exception as e:
+                if last:
+                    self.cascade_stats.record(model, "failed")
+                    raise
+                issues = [ValidationIssue("error", "$", f"{type(e).__name__}: {e}")]
+            else:
+                issues = validate_response(llm_response, json_schema)
+                if not issues or last:
+                    self.cascade_stats.record(model, "invalid" if issues else "accepted", issues)
+                    if issues:
+                        logger.warning(f"Route {label}: answer of {model} {self._describe_issues(issues)}")
+                    else:
+                        logger.debug(f"Route {label}: answer of {model} accepted")
+                    return llm_response
+
+            self.cascade_stats.record(model, "escalated", issues)
+            logger.info(f"Route {label}: {model} -> {models[i + 1]}, {self._describe_issues(issues)}")
+
+    @staticmethod
+    def _describe_issues(issues: list[ValidationIssue]) -> str:
+        more = f" (and {len(issues) - 1} more)" if len(issues) > 1 else ""
+        return f"failed validation: {issues[0]}{more}"
+
+    async def _request_model(self, model: str, prompt: str, json_schema: dict,
+                             reports: Optional[list[str]], size: int) -> str:
+        max_tokens = self._max_tokens_for(size)
+        # Телеметрия запроса: модель, ожидание слота, повторы, TTFB и токены по листам reports
+        with trace_llm_call(reports or [], model=model), observe_duration(LLM_REQUEST_DURATION, model=model):
+            try:
+                async def attempt() -> str:
+                    if self.request_policy is None:
+                        return await self._request_llm(model, prompt, json_schema, max_tokens=max_tokens)
+                    return await self.request_policy.run(
+                        lambda timeout: self._request_llm(model, prompt, json_schema, timeout, max_tokens),
+                        size,
+                        model=model,
+                    )
+
+                if self.limiter is None:
+                    return await attempt()
+                # Без longest_first слоты ограничителя выдаются в порядке прихода
+                return await self.limiter.run(attempt, priority=size if self.longest_first else 0.0)
+            except Exception as e:
+                LLM_ERRORS.labels(model=model, error=type(e).__name__).inc()
+                raise
+
+    def _max_tokens_for(self, size: int) -> int:
+        """
+        Лимит токенов ответа для запроса размером size (текст промпта и пустые ответы по каждому отчёту).
+        Ответ не длиннее текста, из которого он собран; запас в полтора раза — на погрешность оценки токенов.
+        """
+        return min(self.answer_tokens_max, max(self.answer_tokens_min, math.ceil(size * 1.5)))
+
+    async def _request_llm(self, model: str, prompt: str, json_schema: dict, timeout: Optional[float] = None,
+                           max_tokens: Optional[int] = None) -> str:
+        call = current_llm_call()
+        with trace_llm_attempt() as attempt:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.0,
+                max_tokens=max_tokens or self.answer_tokens_max,
+                stream=False,
+                response_format={"type": "json_schema", "json_schema": json_schema},
+                **({"timeout": timeout} if timeout is not None else {}),
+            )
+        # В телеметрию запроса идёт TTFB попытки, чей ответ использован
+        if call is not None and attempt is not None:
+            call.ttfb = attempt.ttfb
+        if response.usage is not None:
+            LLM_TOKENS.labels(model=model, kind="prompt").inc(response.usage.prompt_tokens)
+            LLM_TOKENS.labels(model=model, kind="completion").inc(response.usage.completion_tokens)
+            if call is not None:
+                call.prompt_tokens += response.usage.prompt_tokens
+                call.completion_tokens += response.usage.completion_tokens
         return response.choices[0].message.content
\ No newline at end of file
@@ -0,0 +1,96 @@
+import copy
+from typing import Iterable
+from .tokens import estimate_tokens
+
+
+# Поле, по которому ответ на пакетный запрос сопоставляется с отчётом
+REPORT_DATE_FIELD = "Дата отчёта"
+
+
+def plan_batches(
+    reports: Iterable[tuple[str, str]],
+    short_report_tokens: int,
+    token_budget: int,
+    max_reports: int,
+) -> list[list[tuple[str, str]]]:
+    """
+    Разбивает отчёты на группы для запросов к LLM.
+    Короткие отчёты укладываются в пакеты по бюджету токенов, длинные идут по одному.
+    Порядок отчётов внутри групп сохраняется.
+    """
+    groups: list[list[tuple[str, str]]] = []
+    batch: list[tuple[str, str]] = []
+    batch_tokens = 0
+
+    for date, text in reports:
+        tokens = estimate_tokens(text)
+        if tokens > short_report_tokens:
+            groups.append([(date, text)])
+            continue
+
+        if batch and (batch_tokens + tokens > token_budget or len(batch) >= max_reports):
+            groups.append(batch)
+            batch, batch_tokens = [], 0
+
+        batch.append((date, text))
+        batch_tokens += tokens
+
+    if batch:
+        groups.append(batch)
+
+    return groups
+
+
+def make_batch_schema(json_schema: dict) -> dict:
+    """
+    Строит JSON Schema пакетного ответа: объект с массивом reports,
+    каждый элемент — исходная схема отчёта, помеченная датой листа.
+    """
+    item_schema = copy.deepcopy(json_schema["schema"])
+    item_schema["properties"] = {
+        REPORT_DATE_FIELD: {
+            "type": "string",
+            "description": "Дата отчёта в точности как в заголовке отчёта (ДД.ММ.ГГГГ)"
+        },
+        **item_schema.get("properties", {}),
+    }
+    item_schema["required"] = [REPORT_DATE_FIELD, *item_schema.get("required", [])]
+
+    return {
+        "name": f"{json_schema.get('name', 'report')}_batch",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "reports": {"type": "array", "items": item_schema},
+            },
+            "required": ["reports"],
+            "additionalProperties": False,
+        },
+        "strict": json_schema.get("strict", True),
+    }
+
+
+def create_batch_prompt(reports: list[tuple[str, str]]) -> str:
+    sections = "\n\n".join(f"=== Отчёт за {date} ===\n{text}" for date, text in reports)
+    return f"""
+        Ниже приведены {len(reports)} текстовых отчётов о скважине, каждый начинается с заголовка с датой.  
+        Проанализируй каждый отчёт отдельно и заполни для него все поля JSON-схемы по данным только этого отчёта.  
+        Верни массив reports: по одному объекту на отчёт, в поле "{REPORT_DATE_FIELD}" укажи дату из заголовка отчёта.  
+        Если какие-то данные отсутствуют — ставь пустую строку "".  
+        Помни: вывод должен строго соответствовать JSON Schema и быть корректным JSON-объектом.
+
+        Отчёты:
+        {sections}
+        """
+
+
+def split_batch_response(data: dict) -> dict[str, dict]:
+    """Раскладывает пакетный ответ по датам отчётов"""
+    results = {}
+    for item in data.get("reports") or []:
+        if not isinstance(item, dict):
+            continue
+        date = str(item.pop(REPORT_DATE_FIELD, "") or "").strip()
+        if date and date not in results:
+            results[date] = item
+    return results
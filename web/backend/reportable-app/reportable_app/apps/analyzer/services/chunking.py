@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Any, Optional
+from .tokens import estimate_tokens
+
+
+# --- Разбиение (map) ---
+
+def split_report(text: str, max_tokens: int, header_lines: int = 5) -> list[str]:
+    """
+    Делит текст отчёта на части по границам строк, каждая часть — не длиннее max_tokens
+    (кроме отдельных строк, которые длиннее сами по себе).
+    Первые header_lines строк (сводка за день и шапка листа) повторяются в каждой части,
+    чтобы модель видела, о какой скважине и дне идёт речь.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    lines = text.split("\n")
+    header, body = lines[:header_lines], lines[header_lines:]
+    header_tokens = estimate_tokens("\n".join(header))
+    budget = max(max_tokens - header_tokens, max_tokens // 2)
+
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for line in body:
+        # +1 — перевод строки
+        line_tokens = estimate_tokens(line) + 1
+        if current and current_tokens + line_tokens > budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        chunks.append(current)
+
+    return ["\n".join(header + chunk) for chunk in chunks]
+
+
+# --- Объединение частичных ответов (reduce) ---
+
+# Правила объединения полей схемы senat; для остальных полей — первое непустое значение,
+# для дат — самая поздняя
+FIRST = "first"
+LAST = "last"
+CONCAT = "concat"
+MIN_DATE = "min_date"
+MAX_DATE = "max_date"
+
+MERGE_RULES: dict[str, str] = {
+    "Описание работ": CONCAT,
+    "Перерывы в работе": CONCAT,
+    "Геофизические операции": CONCAT,
+    "Результат работ": LAST,
+    # Начало работ и остановка скважины — самые ранние даты из частей
+    "Дата остановки": MIN_DATE,
+    "Начало мероприятия": MIN_DATE,
+    "Окончание мероприятия": MAX_DATE,
+    "Дата запуска после ремонта": MAX_DATE,
+}
+
+
+def merge_partials(json_schema: dict, partials: list[dict], rules: Optional[dict[str, str]] = None) -> dict:
+    """
+    Объединяет ответы по частям одного отчёта в один объект схемы.
+    Результат не зависит от порядка завершения запросов: partials идут в порядке частей.
+    """
+    rules = MERGE_RULES if rules is None else rules
+    result = {}
+    for field, field_schema in json_schema["schema"].get("properties", {}).items():
+        values = [partial.get(field) for partial in partials]
+        result[field] = _merge_values(values, field_schema, _rule_for(field, field_schema, rules))
+    return result
+
+
+def _rule_for(field: str, field_schema: dict, rules: dict[str, str]) -> str:
+    if field in rules:
+        return rules[field]
+    description = str(field_schema.get("description", "")).lower()
+    return MAX_DATE if "дата" in field.lower() or "дата" in description else FIRST
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip()) or value == {}
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    try:
+        return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _merge_values(values: list[Any], field_schema: dict, rule: str) -> Any:
+    present = [value for value in values if not _is_empty(value)]
+    if not present:
+        return values[0] if values else None
+
+    if rule == CONCAT:
+        if all(isinstance(value, dict) for value in present):
+            # Описание работ по категориям: каждая категория склеивается отдельно
+            return {
+                key: _merge_values([value.get(key) for value in present], sub_schema, CONCAT)
+                for key, sub_schema in field_schema.get("properties", {}).items()
+            }
+        unique = list(dict.fromkeys(str(value).strip() for value in present))
+        return " ".join(unique)
+
+    if rule in (MIN_DATE, MAX_DATE):
+        dated = [(date, value) for value in present if (date := _parse_date(value)) is not None]
+        if dated:
+            pick = min if rule == MIN_DATE else max
+            return pick(dated, key=lambda item: item[0])[1]
+
+    return present[-1] if rule == LAST else present[0]
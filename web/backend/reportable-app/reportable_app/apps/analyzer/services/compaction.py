@@ -0,0 +1,123 @@
+import re
+from collections import Counter
+from typing import Optional
+from typing_extensions import Self
+from .tokens import estimate_tokens
+
+
+_SPACES = re.compile(r"[ \u00a0\u2007\u202f]+")
+_DIGIT = re.compile(r"\d")
+
+
+def normalize_line(line: str) -> str:
+    """Схлопывает пробелы внутри строки; табуляции (разделители TSV) сохраняются"""
+    return "\t".join(_SPACES.sub(" ", cell).strip() for cell in line.split("\t")).strip("\t ")
+
+
+def _line_key(line: str) -> str:
+    return line.casefold()
+
+
+class ReportCompactor:
+    """
+    Сжатие текстов отчётов перед отправкой в LLM.
+
+    - нормализация пробелов и удаление пустых строк
+    - удаление повторов строк внутри отчёта (в том числе сводки, продублированной на листе)
+    - удаление шаблонных строк, которые встречаются почти на всех листах книги
+
+    Шаблонной считается только длинная строка без цифр: заголовки, легенды и подписи.
+    Короткие повторяющиеся значения (месторождение, организация) и строки с числами и датами
+    остаются, иначе модель потеряет поля, общие для всех дней.
+    """
+
+    def __init__(
+        self: Self,
+        dedupe: bool = True,
+        strip_boilerplate: bool = True,
+        boilerplate_share: float = 0.8,
+        boilerplate_min_sheets: int = 3,
+        boilerplate_min_chars: int = 40,
+    ):
+        self.dedupe = dedupe
+        self.strip_boilerplate = strip_boilerplate
+        self.boilerplate_share = boilerplate_share
+        self.boilerplate_min_sheets = boilerplate_min_sheets
+        self.boilerplate_min_chars = boilerplate_min_chars
+
+    def compact(self: Self, reports: dict[str, str]) -> tuple[dict[str, str], dict[str, tuple[int, int]]]:
+        """Возвращает сжатые тексты и число токенов (до, после) по каждому листу"""
+        lines_by_date = {
+            date: [line for line in map(normalize_line, text.splitlines()) if line]
+            for date, text in reports.items()
+        }
+        boilerplate = self._find_boilerplate(lines_by_date) if self.strip_boilerplate else set()
+
+        compacted = {}
+        tokens = {}
+        for date, lines in lines_by_date.items():
+            seen = set()
+            kept = []
+            for line in lines:
+                key = _line_key(line)
+                if key in boilerplate or (self.dedupe and key in seen):
+                    continue
+                seen.add(key)
+                kept.append(line)
+
+            compacted[date] = "\n".join(kept)
+            tokens[date] = (estimate_tokens(reports[date]), estimate_tokens(compacted[date]))
+
+        return compacted, tokens
+
+    def _find_boilerplate(self: Self, lines_by_date: dict[str, list[str]]) -> set[str]:
+        sheets = len(lines_by_date)
+        if sheets < self.boilerplate_min_sheets:
+            return set()
+
+        # В скольких листах встречается строка (повторы внутри листа не считаются)
+        frequency = Counter()
+        for lines in lines_by_date.values():
+            frequency.update({_line_key(line) for line in lines})
+
+        threshold = max(self.boilerplate_min_sheets, self.boilerplate_share * sheets)
+        return {
+            key for key, count in frequency.items()
+            if count >= threshold and len(key) >= self.boilerplate_min_chars and not _DIGIT.search(key)
+        }
+
+
+class CompactionStats:
+    """Сколько токенов сэкономило сжатие (оценка), накопительно за процесс"""
+
+    def __init__(self: Self):
+        self._reports = 0
+        self._tokens_before = 0
+        self._tokens_after = 0
+
+    def record(self: Self, tokens: dict[str, tuple[int, int]]) -> None:
+        for before, after in tokens.values():
+            self._reports += 1
+            self._tokens_before += before
+            self._tokens_after += after
+
+    def stats(self: Self) -> dict:
+        return {
+            "reports": self._reports,
+            "tokens_before": self._tokens_before,
+            "tokens_after": self._tokens_after,
+            "saved_ratio": 1 - self._tokens_after / self._tokens_before if self._tokens_before else None,
+        }
+
+
+# Глобальная статистика сжатия (одна на процесс)
+_compaction_stats: Optional[CompactionStats] = None
+
+
+def get_compaction_stats() -> CompactionStats:
+    """Возвращает статистику сжатия текстов отчётов"""
+    global _compaction_stats
+
+    if _compaction_stats is None:
+        _compaction_stats = CompactionStats()
+    return _compaction_stats
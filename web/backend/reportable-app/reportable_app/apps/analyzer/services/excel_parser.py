@@ -0,0 +1,377 @@
+import io
+import os
+import asyncio
+import tempfile
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from itertools import islice
+from datetime import date, datetime
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Protocol, TypeVar
+from typing_extensions import Self
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from ..exceptions import ExcelParserBusyError
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+# Содержимое книги или путь к её файлу
+WorkbookSource = bytes | str
+
+
+# Форматы дат, которые разбираются без pandas; всё остальное — через pd.to_datetime(dayfirst=True)
+_DATE_FORMATS = ("%d.%m.%Y", "%d.%m.%y", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d.%m.%Y %H:%M:%S")
+
+
+def parse_date(value) -> Optional[str]:
+    """Приводит дату из ячейки или названия листа к виду ДД.ММ.ГГГГ, None — если это не дата"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%d.%m.%Y")
+    if not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    if not value:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%d.%m.%Y")
+        except ValueError:
+            continue
+    try:
+        return pd.to_datetime(value, dayfirst=True).strftime("%d.%m.%Y")
+    except Exception:
+        return None
+
+
+# --- Функции разбора книги ---
+# Выполняются в дочерних процессах, поэтому объявлены на уровне модуля (должны сериализоваться pickle).
+# Книга читается потоково (openpyxl read_only): в памяти не держится сетка листа, пустые ячейки не копируются.
+
+@contextmanager
+def open_workbook(source: WorkbookSource) -> Iterator[Workbook]:
+    file = io.BytesIO(source) if isinstance(source, bytes) else source
+    workbook = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        yield workbook
+    finally:
+        workbook.close()
+
+
+def _iter_rows(workbook: Workbook, sheet: str) -> Iterator[tuple]:
+    worksheet = workbook[sheet]
+    # Размеры листа в файле бывают записаны неверно, в read_only они определяют, какие строки читать
+    worksheet.reset_dimensions()
+    return worksheet.iter_rows(values_only=True)
+
+
+def _read_summary(workbook: Workbook, sheet: str) -> dict[str, str]:
+    summary_data = {}
+    for row in _iter_rows(workbook, sheet):
+        if len(row) < 4 or row[0] is None or row[3] is None:
+            continue
+        date = parse_date(row[0])
+        if date is not None:
+            summary_data[date] = str(row[3]).strip()
+    return summary_data
+
+
+def _format_cell(value) -> str:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%d.%m.%Y")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return "" if value is None or isinstance(value, bool) else str(value)
+
+
+def _iter_row_lines(workbook: Workbook, sheet: str) -> Iterator[str]:
+    """Непустые строки листа, ячейки через табуляцию"""
+    rows = ("\t".join(cell for cell in map(_format_cell, row) if cell) for row in _iter_rows(workbook, sheet))
+    return (row for row in rows if row)
+
+
+def _iter_sheet_texts(workbook: Workbook, sheets: list[str], tsv: bool = False) -> Iterator[tuple[str, str]]:
+    for sheet in sheets:
+        # Листы без даты в названии пропускаем, не читая их содержимое
+        report_date = parse_date(sheet)
+        if report_date is None:
+            continue
+
+        if tsv:
+            # Строка листа — строка текста, ячейки через табуляцию (вместе с числами и датами)
+            yield report_date, "\n".join(_iter_row_lines(workbook, sheet))
+            continue
+
+        yield report_date, "\n".join(
+            value.strip()
+            for row in _iter_rows(workbook, sheet)
+            for value in row
+            if isinstance(value, str) and value.strip()
+        )
+
+
+def read_sheet_names(content: bytes) -> list[str]:
+    with open_workbook(content) as workbook:
+        return workbook.sheetnames
+
+
+def extract_summary(source: WorkbookSource, sheet: str) -> dict[str, str]:
+    """Сводка: дата -> текст сводки за день"""
+    with open_workbook(source) as workbook:
+        return _read_summary(workbook, sheet)
+
+
+def extract_sheet_texts(source: WorkbookSource, sheets: list[str], tsv: bool = False) -> dict[str, str]:
+    """Отчёты по датам: дата листа -> текст листа. Книга открывается один раз на вызов"""
+    with open_workbook(source) as workbook:
+        return dict(_iter_sheet_texts(workbook, sheets, tsv))
+
+
+def write_temp_workbook(content: bytes) -> str:
+    """Сохраняет книгу во временный файл и возвращает путь к нему; удаляет файл вызывающий"""
+    with tempfile.NamedTemporaryFile(prefix="workbook-", suffix=".xlsx", delete=False) as file:
+        file.write(content)
+        return file.name
+
+
+def extract_header_text(content: bytes, max_lines: int = 100) -> str:
+    """
+    Текст листов «Текущая» и «Сводка» (первые max_lines строк каждого) для извлечения
+    общих сведений о скважине. Остальные листы не читаются.
+    """
+    with open_workbook(content) as workbook:
+        sheet_names = workbook.sheetnames
+        check_sheets(sheet_names)
+        return "\n".join(
+            line for sheet in sheet_names[:2] for line in islice(_iter_row_lines(workbook, sheet), max_lines)
+        )
+
+
+def combine_reports(summary: dict[str, str], texts: Iterable[tuple[str, str]]) -> dict[str, str]:
+    """Добавляет к тексту каждого листа сводку за тот же день"""
+    reports = {}
+    for date, text in texts:
+        reports[date] = (summary.get(date, "") + "\n" + text).strip()
+    return reports
+
+
+def warm_up() -> None:
+    """Пустая задача: при распаковке дочерний процесс импортирует модуль вместе с openpyxl и pandas"""
+
+
+def check_sheets(sheet_names: list[str]) -> None:
+    if len(sheet_names) < 3:
+        raise ValueError("Файл должен содержать минимум 3 листа: текущая, сводка и отчёты по датам")
+
+
+def extract_reports(content: bytes, tsv: bool = False) -> dict[str, str]:
+    """
+    Извлекает отчёты по датам из книги целиком в текущем процессе.
+    tsv=True сохраняет строки листа (ячейки через табуляцию), иначе каждая текстовая ячейка — отдельная строка.
+    """
+    with open_workbook(content) as workbook:
+        sheet_names = workbook.sheetnames
+        check_sheets(sheet_names)
+        summary = _read_summary(workbook, sheet_names[1])
+        # Тексты листов склеиваются со сводкой по мере чтения, без промежуточной копии
+        return combine_reports(summary, _iter_sheet_texts(workbook, sheet_names[2:], tsv))
+
+
+class ExcelParserProtocol(Protocol):
+    async def extract_reports(self: Self, content: bytes, tsv: bool = False) -> dict[str, str]:
+        ...
+
+    async def extract_header(self: Self, content: bytes) -> str:
+        """Текст листов «Текущая» и «Сводка» для шапки скважины"""
+        ...
+
+    def stats(self: Self) -> dict:
+        ...
+
+
+class ExcelParserPool(ExcelParserProtocol):
+    """
+    Разбор Excel-книг вне event loop.
+
+    Работа выполняется в пуле процессов (или потоков, если процессы недоступны).
+    Число одновременно отправленных в пул задач ограничено max_pending, остальные ждут своей очереди.
+    Очередь ожидания ограничена: если в ней уже max_waiting задач, новая книга не принимается
+    (ExcelParserBusyError, 503). Проверка — на входе книги, поэтому её части уже не отклоняются.
+    Большие книги (от parallel_sheets_min листов) разбираются частями по sheets_per_chunk листов параллельно.
+    """
+
+    def __init__(
+        self: Self,
+        executor: str = "process",
+        workers: int = 2,
+        max_pending: int = 8,
+        parallel_sheets_min: int = 20,
+        sheets_per_chunk: int = 10,
+        max_waiting: int = 32,
+    ):
+        self.executor_type = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_waiting = max_waiting
+        self.parallel_sheets_min = parallel_sheets_min
+        self.sheets_per_chunk = sheets_per_chunk
+
+        self._executor: Optional[Executor] = None
+        self._restart_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def start(self: Self) -> None:
+        if self.executor_type == "process":
+            try:
+                # spawn: форк процесса с запущенным event loop и потоками небезопасен
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                # Поднимаем процессы заранее, чтобы первый файл не ждал импорта pandas
+                for _ in range(self.workers):
+                    self._executor.submit(warm_up)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool is unavailable, falling back to threads: {e}")
+                self.executor_type = "thread"
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="excel-parser")
+
+        logger.info(f"Excel parser started: {self.executor_type} pool, {self.workers} workers")
+
+    def stop(self: Self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Excel parser stopped")
+
+    async def extract_reports(self: Self, content: bytes, tsv: bool = False) -> dict[str, str]:
+        self._admit()
+        sheet_names = await self._run(read_sheet_names, content)
+        check_sheets(sheet_names)
+
+        report_sheets = sheet_names[2:]
+        if len(report_sheets) < self.parallel_sheets_min:
+            return await self._run(extract_reports, content, tsv)
+
+        # Большая книга: сводка и части листов разбираются параллельно. Аргументы задач пула процессов
+        # передаются через pickle, поэтому книга один раз пишется во временный файл и задачи получают путь
+        chunks = [
+            report_sheets[i:i + self.sheets_per_chunk]
+            for i in range(0, len(report_sheets), self.sheets_per_chunk)
+        ]
+        path = await asyncio.to_thread(write_temp_workbook, content)
+        try:
+            summary, *chunk_texts = await asyncio.gather(
+                self._run(extract_summary, path, sheet_names[1]),
+                *[self._run(extract_sheet_texts, path, chunk, tsv) for chunk in chunks],
+            )
+        finally:
+            await asyncio.to_thread(os.unlink, path)
+
+        return combine_reports(summary, (item for chunk in chunk_texts for item in chunk.items()))
+
+    async def extract_header(self: Self, content: bytes) -> str:
+        self._admit()
+        return await self._run(extract_header_text, content)
+
+    def stats(self: Self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "running": self._running,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "max_waiting": self.max_waiting,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def _admit(self: Self) -> None:
+        if self._pending >= self.max_waiting:
+            self._rejected += 1
+            raise ExcelParserBusyError(self.max_waiting)
+
+    async def _run(self: Self, fn: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            raise RuntimeError("Excel parser is not started")
+
+        self._pending += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._pending -= 1
+
+        self._running += 1
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenExecutor:
+            # Дочерний процесс упал (например, OOM на огромной книге) — пересоздаём пул для следующих задач
+            self._restart(executor)
+            raise
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._slots.release()
+
+    def _restart(self: Self, broken: Executor) -> None:
+        """
+        Пересоздаёт сломанный пул. Упавший процесс роняет все задачи пула сразу, и каждая из них
+        приходит сюда: пересоздаёт пул только первая, остальные видят, что он уже заменён.
+        """
+        with self._restart_lock:
+            if self._executor is not broken:
+                return
+            logger.error("Excel parser pool is broken, restarting")
+            self.stop()
+            self.start()
+
+
+# Глобальный экземпляр парсера (один на процесс приложения)
+_excel_parser: Optional[ExcelParserPool] = None
+
+
+def get_excel_parser() -> ExcelParserPool:
+    """Возвращает парсер, запущенный в lifespan приложения"""
+    if _excel_parser is None:
+        raise RuntimeError("Excel parser is not started")
+    return _excel_parser
+
+
+def start_excel_parser(
+    executor: str,
+    workers: int,
+    max_pending: int,
+    parallel_sheets_min: int,
+    sheets_per_chunk: int,
+    max_waiting: int,
+) -> ExcelParserPool:
+    """Создаёт пул для разбора Excel-книг"""
+    global _excel_parser
+    if _excel_parser is None:
+        _excel_parser = ExcelParserPool(
+            executor, workers, max_pending, parallel_sheets_min, sheets_per_chunk, max_waiting
+        )
+        _excel_parser.start()
+    return _excel_parser
+
+
+def stop_excel_parser() -> None:
+    """Останавливает пул для разбора Excel-книг"""
+    global _excel_parser
+    if _excel_parser is not None:
+        _excel_parser.stop()
+        _excel_parser = None
@@ -0,0 +1,195 @@
+import math
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+from typing_extensions import Self
+from ....settings import settings
+from ....core.metrics import LLM_HEDGE_SAVED_SECONDS, LLM_HEDGES
+
+
+T = TypeVar('T')
+
+
+class LLMRequestPolicy:
+    """
+    Таймауты и хеджирование запросов к LLM по истории задержек.
+
+    Запросы делятся на корзины по модели и размеру (оценка в токенах: вход плюс ожидаемый ответ,
+    корзины растут вдвое: до bucket_tokens, до 2 * bucket_tokens, ...). Для каждой корзины
+    хранятся последние history_size задержек успешных запросов.
+
+    - таймаут попытки: не меньше timeout_min + timeout_per_1k_tokens на каждую 1000 токенов
+      и не меньше timeout_history_factor * p99 корзины, но не больше timeout_max
+    - хеджирование (если включено): попытка, не завершившаяся за hedge_quantile корзины,
+      дублируется; берётся ответ, пришедший первым, второй запрос отменяется.
+      Доля продублированных запросов ограничена hedge_max_ratio.
+
+    Дубль идёт мимо ограничителя параллельности: он занимает слот исходной попытки.
+    """
+
+    def __init__(
+        self: Self,
+        hedging_enabled: bool = False,
+        hedge_quantile: float = 0.9,
+        hedge_min_samples: int = 20,
+        hedge_max_ratio: float = 0.1,
+        timeout_min: float = 30.0,
+        timeout_per_1k_tokens: float = 15.0,
+        timeout_history_factor: float = 3.0,
+        timeout_max: float = 300.0,
+        bucket_tokens: int = 1000,
+        history_size: int = 200,
+    ):
+        self.hedging_enabled = hedging_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_ratio = hedge_max_ratio
+        self.timeout_min = timeout_min
+        self.timeout_per_1k_tokens = timeout_per_1k_tokens
+        self.timeout_history_factor = timeout_history_factor
+        self.timeout_max = timeout_max
+        self.bucket_tokens = bucket_tokens
+        self.history_size = history_size
+
+        self._history: dict[tuple[str, int], deque[float]] = {}
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._saved_seconds = 0.0
+
+    def bucket(self: Self, tokens: int, model: str = "") -> tuple[str, int]:
+        return model, max(0, math.ceil(math.log2(max(tokens, 1) / self.bucket_tokens)))
+
+    def timeout_for(self: Self, tokens: int, model: str = "") -> float:
+        timeout = self.timeout_min + self.timeout_per_1k_tokens * tokens / 1000
+        p99 = self._quantile(self.bucket(tokens, model), 0.99)
+        if p99 is not None:
+            timeout = max(timeout, self.timeout_history_factor * p99)
+        return min(timeout, self.timeout_max)
+
+    def hedge_delay(self: Self, tokens: int, model: str = "") -> Optional[float]:
+        """Через сколько секунд дублировать запрос; None — не дублировать"""
+        if not self.hedging_enabled:
+            return None
+        return self._quantile(self.bucket(tokens, model), self.hedge_quantile)
+
+    async def run(self: Self, fn: Callable[[float], Awaitable[T]], tokens: int, model: str = "") -> T:
+        """
+        Выполняет одну попытку запроса: fn получает таймаут в секундах.
+        Ошибка до момента хеджирования пробрасывается сразу (повторы — дело ограничителя).
+        """
+        self._requests += 1
+        bucket = self.bucket(tokens, model)
+        timeout = self.timeout_for(tokens, model)
+        delay = self.hedge_delay(tokens, model)
+        started = time.monotonic()
+
+        primary = asyncio.ensure_future(fn(timeout))
+        pending = {primary}
+        hedge: Optional[asyncio.Future] = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and self._hedge_allowed():
+                    self._hedged += 1
+                    hedge = asyncio.ensure_future(fn(max(1.0, timeout - delay)))
+                    pending.add(hedge)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    elapsed = time.monotonic() - started
+                    if hedge is not None:
+                        self._on_hedge_finished(bucket, delay, elapsed, won=task is hedge, model=model)
+                    self._record(bucket, elapsed)
+                    return task.result()
+            raise error
+        finally:
+            # Проигравший запрос больше не нужен
+            losers = [task for task in (primary, hedge) if task is not None and not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def stats(self: Self) -> dict:
+        return {
+            "hedging_enabled": self.hedging_enabled,
+            "requests": self._requests,
+            "hedged": self._hedged,
+            "hedge_rate": round(self._hedged / self._requests, 4) if self._requests else 0.0,
+            "hedge_wins": self._hedge_wins,
+            "saved_seconds": round(self._saved_seconds, 3),
+            "buckets": [
+                {
+                    "model": model,
+                    "max_tokens": self.bucket_tokens * 2 ** size,
+                    "samples": len(history),
+                    "p50": self._quantile((model, size), 0.5, min_samples=1),
+                    "p90": self._quantile((model, size), 0.9, min_samples=1),
+                    "p99": self._quantile((model, size), 0.99, min_samples=1),
+                    "timeout": round(self.timeout_for(self.bucket_tokens * 2 ** size, model), 3),
+                }
+                for (model, size), history in sorted(self._history.items())
+            ],
+        }
+
+    def _hedge_allowed(self: Self) -> bool:
+        return self._hedged < self.hedge_max_ratio * self._requests
+
+    def _on_hedge_finished(self: Self, bucket: tuple[str, int], delay: float, elapsed: float, won: bool, model: str) -> None:
+        LLM_HEDGES.labels(model=model, winner="hedge" if won else "primary").inc()
+        if not won:
+            return
+        self._hedge_wins += 1
+        # Исходный запрос отменён, и его длительность неизвестна: берём среднее по корзине
+        # среди запросов, которые тоже не уложились в задержку хеджирования
+        expected = self._tail_mean(bucket, delay)
+        if expected is not None and expected > elapsed:
+            saved = expected - elapsed
+            self._saved_seconds += saved
+            LLM_HEDGE_SAVED_SECONDS.labels(model=model).inc(saved)
+
+    def _record(self: Self, bucket: tuple[str, int], latency: float) -> None:
+        history = self._history.get(bucket)
+        if history is None:
+            history = self._history[bucket] = deque(maxlen=self.history_size)
+        history.append(latency)
+
+    def _quantile(self: Self, bucket: tuple[str, int], q: float, min_samples: Optional[int] = None) -> Optional[float]:
+        history = self._history.get(bucket)
+        if not history or len(history) < (self.hedge_min_samples if min_samples is None else min_samples):
+            return None
+        values = sorted(history)
+        return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+    def _tail_mean(self: Self, bucket: tuple[str, int], threshold: float) -> Optional[float]:
+        tail = [latency for latency in self._history.get(bucket, ()) if latency > threshold]
+        return sum(tail) / len(tail) if tail else None
+
+
+# Глобальный экземпляр политики (история задержек общая для процесса)
+_llm_request_policy: Optional[LLMRequestPolicy] = None
+
+
+def get_llm_request_policy() -> LLMRequestPolicy:
+    """Возвращает общую для процесса политику таймаутов и хеджирования запросов к LLM"""
+    global _llm_request_policy
+
+    if _llm_request_policy is None:
+        _llm_request_policy = LLMRequestPolicy(
+            hedging_enabled=settings.llm.hedging_enabled,
+            hedge_quantile=settings.llm.hedge_quantile,
+            hedge_min_samples=settings.llm.hedge_min_samples,
+            hedge_max_ratio=settings.llm.hedge_max_ratio,
+            timeout_min=settings.llm.timeout_min,
+            timeout_per_1k_tokens=settings.llm.timeout_per_1k_tokens,
+            timeout_history_factor=settings.llm.timeout_history_factor,
+            timeout_max=settings.llm.request_timeout,
+        )
+    return _llm_request_policy
@@ -0,0 +1,220 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+from typing_extensions import Self
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from ....settings import settings
+from ....core.utils.telemetry import current_llm_call
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AdaptiveLLMLimiter:
+    """
+    Адаптивный ограничитель параллельных запросов к LLM (AIMD).
+
+    - успешный ответ быстрее latency_target: лимит растёт на 1 за «окно» (limit += 1 / limit)
+    - медленный ответ: лимит плавно уменьшается (limit *= slow_decrease)
+    - 429, 5xx, таймаут: лимит уменьшается вдвое (не чаще раза за cooldown секунд)
+
+    Повторяемые ошибки повторяются с экспоненциальной задержкой и полным джиттером,
+    во время ожидания слот освобождается для других запросов.
+
+    Очередь ожидающих общая для всех анализов процесса и упорядочена по приоритету:
+    первыми получают слот самые длинные запросы (LPT), при равном приоритете — в порядке прихода.
+    """
+
+    def __init__(
+        self: Self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_target: float = 60.0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        decrease_ratio: float = 0.5,
+        slow_decrease: float = 0.9,
+        cooldown: float = 2.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.decrease_ratio = decrease_ratio
+        self.slow_decrease = slow_decrease
+        self.cooldown = cooldown
+
+        # Куча (-приоритет, номер, future)
+        self._waiters: list[tuple[float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._backing_off = 0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+
+        self._requests = 0
+        self._errors = 0
+        self._throttled = 0
+        self._retries = 0
+
+    async def run(self: Self, fn: Callable[[], Awaitable[T]], priority: float = 0.0) -> T:
+        """
+        Выполняет запрос в пределах текущего лимита с повторами.
+        priority — оценка длительности запроса (например, в токенах): при очереди длинные идут первыми.
+        """
+        attempt = 0
+        call = current_llm_call()
+        while True:
+            waiting_since = time.monotonic()
+            await self._acquire(priority)
+            if call is not None:
+                call.queue_wait += time.monotonic() - waiting_since
+            self._requests += 1
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                self._release()
+                self._errors += 1
+                if not self._is_retryable(e):
+                    raise
+                self._on_overload()
+                if attempt >= self.max_retries:
+                    logger.warning(f"LLM request failed after {attempt} retries: {e}")
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                attempt += 1
+                self._retries += 1
+                if call is not None:
+                    call.retries += 1
+                logger.info(f"Retrying LLM request in {delay:.1f}s (attempt {attempt}): {e}")
+                self._backing_off += 1
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self._backing_off -= 1
+                continue
+            except BaseException:
+                self._release()
+                raise
+
+            self._release()
+            self._on_success(time.monotonic() - started)
+            return result
+
+    def stats(self: Self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "backing_off": self._backing_off,
+            "latency_ewma": self._latency_ewma,
+            "requests": self._requests,
+            "errors": self._errors,
+            "throttled": self._throttled,
+            "retries": self._retries,
+        }
+
+    async def _acquire(self: Self, priority: float = 0.0) -> None:
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            return
+
+        # Ждём в порядке приоритета, слот резервируется тем, кто нас будит
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._sequence), waiter)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self: Self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self: Self) -> None:
+        while self._waiters and self._in_flight < int(self.limit):
+            *_, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _on_success(self: Self, latency: float) -> None:
+        self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+        if latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake_waiters()
+        else:
+            self.limit = max(self.min_limit, self.limit * self.slow_decrease)
+
+    def _on_overload(self: Self) -> None:
+        self._throttled += 1
+        now = time.monotonic()
+        # Пачка ошибок от одного всплеска уменьшает лимит один раз
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_ratio)
+        logger.info(f"LLM concurrency limit decreased to {self.limit:.2f}")
+
+    def _backoff_delay(self: Self, attempt: int, error: Exception) -> float:
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        if not isinstance(error, APIStatusError):
+            return None
+        value = error.response.headers.get("retry-after")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+# Глобальный экземпляр ограничителя (один на процесс)
+_llm_limiter: Optional[AdaptiveLLMLimiter] = None
+
+
+def get_llm_limiter() -> AdaptiveLLMLimiter:
+    """Возвращает общий для процесса ограничитель запросов к LLM"""
+    global _llm_limiter
+
+    if _llm_limiter is None:
+        _llm_limiter = AdaptiveLLMLimiter(
+            initial_limit=settings.llm.initial_concurrency,
+            min_limit=settings.llm.min_concurrency,
+            max_limit=settings.llm.max_concurrency,
+            latency_target=settings.llm.latency_target,
+            max_retries=settings.llm.max_retries,
+            backoff_base=settings.llm.backoff_base,
+            backoff_max=settings.llm.backoff_max,
+        )
+    return _llm_limiter
@@ -0,0 +1,191 @@
+import re
+import copy
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+from typing_extensions import Self
+
+
+# --- Преобразование найденных значений к типам схемы ---
+
+def to_number(value: str) -> Optional[float | int]:
+    try:
+        number = float(value.replace(" ", "").replace(",", "."))
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def to_date(value: str) -> Optional[str]:
+    """Дата в формате YYYY-MM-DD, как требует системный промпт"""
+    value = value.replace("/", ".").replace("-", ".")
+    for fmt in ("%d.%m.%Y", "%d.%m.%y"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def to_text(value: str) -> Optional[str]:
+    value = value.strip(" .,;:")
+    return value or None
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """Правило извлечения поля схемы: первая группа первого совпадения, приведённая convert"""
+    field: str
+    pattern: re.Pattern
+    convert: Callable[[str], Any]
+
+    def extract(self: Self, text: str) -> Any:
+        for match in self.pattern.finditer(text):
+            value = self.convert(match.group(1))
+            if value is not None:
+                return value
+        return None
+
+
+_NUMBER = r"(\d+(?:[.,]\d+)?)"
+_DATE = r"(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})"
+# Любые символы в пределах предложения (точка внутри «уд.веса» или «1.18» предложение не завершает)
+_SENTENCE = r"(?:[^.\n]|\.(?!\s))"
+_FLAGS = re.IGNORECASE | re.UNICODE
+
+
+def _rule(field: str, pattern: str, convert: Callable[[str], Any]) -> FieldRule:
+    return FieldRule(field, re.compile(pattern, _FLAGS), convert)
+
+
+# Поля схемы senat, которые однозначно находятся в тексте суточного отчёта
+DEFAULT_RULES: tuple[FieldRule, ...] = (
+    _rule("Инвентарный номер", r"инв(?:ентарный|\.)?\s*(?:номер|№)\s*[:=]?\s*([\w\-/]*\d[\w\-/]*)", to_text),
+    _rule("Дата остановки", r"(?:дата\s+остановки|остановлена?)\s*[:=\-]?\s*(?:с\s+)?" + _DATE, to_date),
+    _rule("Начало мероприятия", r"начало\s+(?:ремонта|работ|мероприятия)\s*[:=\-]?\s*" + _DATE, to_date),
+    _rule("Окончание мероприятия", r"окончание\s+(?:ремонта|работ|мероприятия)\s*[:=\-]?\s*" + _DATE, to_date),
+    _rule("Дата запуска после ремонта", r"(?:дата\s+запуска|запущена?)\s*(?:после\s+ремонта)?\s*[:=\-]?\s*" + _DATE, to_date),
+    _rule(
+        "Глубина установки насоса",
+        r"(?:глубин\w*\s+(?:установки|спуска)\s+(?:насоса|[УЭ]*ЭЦН|ШГН)|н\s*сп\.?)\s*[:=\-]?\s*" + _NUMBER + r"\s*м\b",
+        to_number,
+    ),
+    _rule(
+        "Плотность глушащей жидкости",
+        r"(?:уд(?:ельн\w*|\.)?\s*вес\w*|плотност\w*)\s*(?:жидкости\s+)?(?:глушения\s+)?[:=\-]?\s*(\d[.,]\d{1,3})\s*(?:г/см|т/м)",
+        to_number,
+    ),
+    _rule(
+        "Объем глушащей жидкости",
+        r"глуш\w*" + _SENTENCE + r"{0,80}?объ[её]м\w*\s*[:=\-]?\s*" + _NUMBER + r"\s*м(?:3|³)",
+        to_number,
+    ),
+    _rule(
+        "Давление опрессовки",
+        r"опрессов\w*" + _SENTENCE + r"{0,60}?(?:р\s*=\s*|на\s+|давлением\s+)" + _NUMBER + r"\s*(?:атм|кгс|мпа|bar)",
+        to_number,
+    ),
+)
+
+
+def extract_fields(text: str, rules: tuple[FieldRule, ...] = DEFAULT_RULES) -> dict[str, Any]:
+    """Значения полей, найденные правилами; ненайденные поля в результат не попадают"""
+    values = {}
+    for rule in rules:
+        value = rule.extract(text)
+        if value is not None:
+            values[rule.field] = value
+    return values
+
+
+def make_sub_schema(json_schema: dict, exclude: set[str]) -> dict:
+    """JSON Schema без полей, уже заполненных правилами"""
+    sub_schema = copy.deepcopy(json_schema)
+    schema = sub_schema["schema"]
+    schema["properties"] = {k: v for k, v in schema.get("properties", {}).items() if k not in exclude}
+    if "required" in schema:
+        schema["required"] = [k for k in schema["required"] if k not in exclude]
+    return sub_schema
+
+
+def empty_result(json_schema: dict) -> dict:
+    """Результат без данных: все поля схемы пустые"""
+    return {field: None for field in json_schema["schema"].get("properties", {})}
+
+
+def merge_fields(json_schema: dict, llm_result: dict, rule_values: dict) -> dict:
+    """Объединяет ответ LLM и значения правил (приоритет у правил) в порядке полей схемы"""
+    merged = {**llm_result, **rule_values}
+    ordered = {field: merged.get(field) for field in json_schema["schema"].get("properties", {})}
+    ordered.update({k: v for k, v in merged.items() if k not in ordered})
+    return ordered
+
+
+def _normalize(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    value = str(value).replace("(?)", "").strip().lower()
+    if not value:
+        return None
+    number = to_number(value)
+    if number is not None:
+        return float(number)
+    return to_date(value) or value
+
+
+class RuleAgreementStats:
+    """
+    Согласованность правил с LLM по полям.
+    Считается на отчётах, где модель получила полную схему: правила при этом не подменяют ответ заранее.
+    """
+
+    def __init__(self: Self):
+        self._fields: dict[str, dict[str, int]] = {}
+        self._skipped_reports = 0
+        self._reduced_reports = 0
+
+    def record_skipped(self: Self) -> None:
+        self._skipped_reports += 1
+
+    def record_reduced(self: Self) -> None:
+        self._reduced_reports += 1
+
+    def record(self: Self, rule_values: dict, llm_result: dict) -> None:
+        for field, rule_value in rule_values.items():
+            counters = self._fields.setdefault(field, {"compared": 0, "agreed": 0, "llm_empty": 0})
+            llm_value = _normalize(llm_result.get(field))
+            if llm_value is None:
+                counters["llm_empty"] += 1
+                continue
+            counters["compared"] += 1
+            if llm_value == _normalize(rule_value):
+                counters["agreed"] += 1
+
+    def stats(self: Self) -> dict:
+        return {
+            "skipped_reports": self._skipped_reports,
+            "reduced_reports": self._reduced_reports,
+            "fields": [
+                {
+                    "field": field,
+                    **counters,
+                    "agreement": counters["agreed"] / counters["compared"] if counters["compared"] else None,
+                }
+                for field, counters in self._fields.items()
+            ],
+        }
+
+
+# Глобальная статистика правил (одна на процесс)
+_rule_stats: Optional[RuleAgreementStats] = None
+
+
+def get_rule_stats() -> RuleAgreementStats:
+    """Возвращает статистику согласованности правил с LLM"""
+    global _rule_stats
+
+    if _rule_stats is None:
+        _rule_stats = RuleAgreementStats()
+    return _rule_stats
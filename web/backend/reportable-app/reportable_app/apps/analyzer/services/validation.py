@@ -0,0 +1,103 @@
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from typing_extensions import Self
+from .batching import REPORT_DATE_FIELD
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """
+    Проблема ответа модели:
+    - json — ответ не разбирается как JSON
+    - schema — не соответствует JSON Schema (тип, обязательные поля)
+    - sanity — значение правильного типа, но бессмысленное (дата не разбирается, отрицательная глубина)
+    """
+    kind: str
+    path: str
+    message: str
+
+    def __str__(self: Self) -> str:
+        return f"{self.kind}: {self.path}: {self.message}"
+
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def validate_response(response: str, json_schema: dict) -> list[ValidationIssue]:
+    """
+    Проверка ответа LLM против JSON Schema (в обёртке {"name", "schema"}, как в schema.json)
+    и правил здравого смысла. Пустой список — ответ годен.
+
+    Поддерживается подмножество JSON Schema, которое используется в schema.json:
+    type (в том числе список типов), properties, required, items.
+    """
+    try:
+        data = json.loads(response)
+    except (TypeError, json.JSONDecodeError) as e:
+        return [ValidationIssue("json", "$", str(e))]
+
+    issues: list[ValidationIssue] = []
+    _validate(data, json_schema["schema"], "$", "", issues)
+    return issues
+
+
+def _types(schema: dict) -> list[str]:
+    types = schema.get("type")
+    if types is None:
+        return []
+    return types if isinstance(types, list) else [types]
+
+
+def _matches(value: Any, type_name: str) -> bool:
+    if type_name in ("number", "integer"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return type_name == "number" or float(value).is_integer()
+    expected = _JSON_TYPES.get(type_name)
+    return expected is None or isinstance(value, expected)
+
+
+def _is_date_field(name: str, schema: dict) -> bool:
+    # Поля-даты в schema.json узнаются по названию или описанию («Дата начала ремонтных работ»).
+    # Дата отчёта в пакетном ответе повторяет имя листа и проверяется при разборе пакета
+    if name == REPORT_DATE_FIELD:
+        return False
+    return "дата" in name.lower() or "дата" in str(schema.get("description", "")).lower()
+
+
+def _validate(value: Any, schema: dict, path: str, name: str, issues: list[ValidationIssue]) -> None:
+    types = _types(schema)
+    if types and not any(_matches(value, t) for t in types):
+        issues.append(ValidationIssue("schema", path, f"ожидается {' | '.join(types)}, получено {type(value).__name__}"))
+        return
+
+    if isinstance(value, dict):
+        for field in schema.get("required", []):
+            if field not in value:
+                issues.append(ValidationIssue("schema", f"{path}.{field}", "обязательное поле отсутствует"))
+        for field, sub_schema in schema.get("properties", {}).items():
+            if field in value:
+                _validate(value[field], sub_schema, f"{path}.{field}", field, issues)
+    elif isinstance(value, list):
+        items = schema.get("items")
+        if items:
+            for i, item in enumerate(value):
+                _validate(item, items, f"{path}[{i}]", name, issues)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if not math.isfinite(value) or value < 0:
+            issues.append(ValidationIssue("sanity", path, f"недопустимое число {value}"))
+    elif isinstance(value, str) and value.strip() and _is_date_field(name, schema):
+        # Системный промпт требует даты в формате YYYY-MM-DD
+        try:
+            datetime.strptime(value.strip()[:10], "%Y-%m-%d")
+        except ValueError:
+            issues.append(ValidationIssue("sanity", path, f"дата не разбирается: {value!r}"))
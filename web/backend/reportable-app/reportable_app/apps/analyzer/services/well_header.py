@@ -0,0 +1,64 @@
+from .rules import make_sub_schema, merge_fields
+from .tokens import estimate_tokens
+
+
+# Поля схемы senat, общие для всех суточных листов книги: извлекаются один раз на книгу,
+# а из запросов по листам исключаются
+HEADER_FIELDS = (
+    "Инвентарный номер",
+    "Месторождение",
+    "Организация",
+    "Категория скважины",
+    "Способ эксплуатации",
+)
+
+
+def header_fields(json_schema: dict) -> tuple[str, ...]:
+    """Поля шапки, которые есть в схеме"""
+    properties = json_schema["schema"].get("properties", {})
+    return tuple(field for field in HEADER_FIELDS if field in properties)
+
+
+def make_header_schema(json_schema: dict) -> dict:
+    """JSON Schema только с полями шапки"""
+    fields = set(header_fields(json_schema))
+    return make_sub_schema(json_schema, set(json_schema["schema"].get("properties", {})) - fields)
+
+
+def create_header_text(workbook_text: str, first_report: str, max_tokens: int, report_lines: int = 5) -> str:
+    """
+    Текст для шапки: листы «Текущая» и «Сводка» и начало первого суточного листа
+    (там обычно месторождение и инвентарный номер). Обрезается по строкам до max_tokens.
+    """
+    lines = [*first_report.split("\n")[:report_lines], *workbook_text.split("\n")]
+    kept, tokens = [], 0
+    for line in lines:
+        tokens += estimate_tokens(line) + 1
+        if tokens > max_tokens:
+            break
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def create_header_prompt(text: str) -> str:
+    return f"""
+        Ниже приведены общие сведения о скважине: начало суточного рапорта, лист «Текущая» и сводка по дням.
+        Заполни поля JSON-схемы, общие для всей скважины, по данным из текста.
+        Если какие-то данные отсутствуют — ставь пустую строку "".
+        Помни: вывод должен строго соответствовать JSON Schema и быть корректным JSON-объектом.
+
+        Текст:
+        {text}
+        """
+
+
+def apply_header(json_schema: dict, result: dict, header: dict) -> dict:
+    """
+    Дополняет результат по листу полями шапки. Непустые значения листа (например, найденные
+    правилами в тексте листа) не перезаписываются.
+    """
+    filled = {
+        field: value for field, value in header.items()
+        if value not in (None, "") and result.get(field) in (None, "")
+    }
+    return merge_fields(json_schema, result, filled)
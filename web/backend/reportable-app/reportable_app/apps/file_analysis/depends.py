@@ -1,28 +1,67 @@
+import redis.asyncio as redis
 from fastapi import Depends
-from ...core.db import AsyncSession, get_async_session
+from ...core.db import AsyncSession, AsyncSessionFactory, get_async_session
+from ...core.redis import get_redis_client
+from ...settings import Settings, get_settings
 from ..files.services.file_managment_service import FileManagmentServiceProtocol
-from ..files.depends import get_file_managment_service
+from ..files.depends import (
+    get_file_managment_service, get_file_cache_repository, get_file_service, get_s3_client, get_direct_upload_service
+)
+from ..files.services.direct_upload import DirectUploadServiceProtocol
+from ..files.repositories.files import FileRepository
 from ..analyzer.services.analyzer import AnalyzerServiceProtocol
-from ..analyzer.depends import get_analyzer_service
+from ..analyzer.depends import get_analyzer_service, get_llm_cache_repository
+from ..analyzer.services.limiter import get_llm_limiter
+from ..analyzer.services.hedging import get_llm_request_policy
+from ..analyzer.services.excel_parser import get_excel_parser
+from ..analyzer.services.prompt_registry import get_prompt_registry
+from ...core.clients.llm_client import get_llm_client
 from .repositories.file_processing import FileProcessingRepositoryProtocol, FileProcessingRepository
+from .repositories.jobs_cache import AnalysisJobLeaseRedisRepositoryProtocol, AnalysisJobLeaseRedisRepository
+from .repositories.telemetry import AnalysisTelemetryRepositoryProtocol, AnalysisTelemetryRepository
 from .services.file_analizator import FileAnalizatorServiceProtocol, FileAnalizatorService
+from .services.job_queue import AnalysisJob, AnalysisJobQueueProtocol, get_analysis_worker_pool
 from .use_case.create import CreateFileAnalysisUseCaseProtocol, CreateFileAnalysisUseCase
+from .use_case.create_by_file import CreateFileAnalysisByFileUseCaseProtocol, CreateFileAnalysisByFileUseCase
+from .use_case.confirm_direct_upload import (
+    ConfirmDirectUploadAndAnalyzeUseCaseProtocol, ConfirmDirectUploadAndAnalyzeUseCase
+)
 from .use_case.get import GetFileAnalysisUseCaseProtocol, GetFileAnalysisUseCase
+from .use_case.telemetry import GetTelemetryPercentilesUseCaseProtocol, GetTelemetryPercentilesUseCase
 
 def __get_file_processing_repository(
     session: AsyncSession = Depends(get_async_session),
 ) -> FileProcessingRepositoryProtocol:
     return FileProcessingRepository(session=session)
 
+def __get_analysis_telemetry_repository(
+    session: AsyncSession = Depends(get_async_session),
+) -> AnalysisTelemetryRepositoryProtocol:
+    return AnalysisTelemetryRepository(session=session)
+
+def get_analysis_job_lease_repository(
+    redis_client: redis.Redis = Depends(get_redis_client),
+) -> AnalysisJobLeaseRedisRepositoryProtocol:
+    return AnalysisJobLeaseRedisRepository(redis_client=redis_client)
+
+def get_analysis_job_queue() -> AnalysisJobQueueProtocol:
+    return get_analysis_worker_pool()
+
 def get_file_analizator_service(
     file_processing_repository: FileProcessingRepositoryProtocol = Depends(__get_file_processing_repository),
     file_service: FileManagmentServiceProtocol = Depends(get_file_managment_service),
     analyzer_service: AnalyzerServiceProtocol = Depends(get_analyzer_service),
+    job_queue: AnalysisJobQueueProtocol = Depends(get_analysis_job_queue),
+    settings: Settings = Depends(get_settings),
+    telemetry_repository: AnalysisTelemetryRepositoryProtocol = Depends(__get_analysis_telemetry_repository),
 ) -> FileAnalizatorServiceProtocol:
     return FileAnalizatorService(
         file_processing_repository=file_processing_repository,
         file_service=file_service,
         analyzer_service=analyzer_service,
+        job_queue=job_queue,
+        progress_interval=settings.analysis.progress_interval,
+        telemetry_repository=telemetry_repository,
     )
 
 def get_create_file_analysis_use_case(
@@ -30,7 +69,76 @@ def get_create_file_analysis_use_case(
 ) -> CreateFileAnalysisUseCaseProtocol:
     return CreateFileAnalysisUseCase(file_service=file_analizator_service)
 
+def get_create_file_analysis_by_file_use_case(
+    file_analizator_service: FileAnalizatorServiceProtocol = Depends(get_file_analizator_service),
+) -> CreateFileAnalysisByFileUseCaseProtocol:
+    return CreateFileAnalysisByFileUseCase(file_service=file_analizator_service)
+
+def get_confirm_direct_upload_and_analyze_use_case(
+    direct_upload_service: DirectUploadServiceProtocol = Depends(get_direct_upload_service),
+    file_analizator_service: FileAnalizatorServiceProtocol = Depends(get_file_analizator_service),
+) -> ConfirmDirectUploadAndAnalyzeUseCaseProtocol:
+    return ConfirmDirectUploadAndAnalyzeUseCase(
+        direct_upload_service=direct_upload_service, file_service=file_analizator_service
+    )
+
 def get_get_file_analysis_use_case(
     file_analizator_service: FileAnalizatorServiceProtocol = Depends(get_file_analizator_service),
 ) -> GetFileAnalysisUseCaseProtocol:
-    return GetFileAnalysisUseCase(file_service=file_analizator_service)
\ No newline at end of file
+    return GetFileAnalysisUseCase(file_service=file_analizator_service)
+
+def get_telemetry_percentiles_use_case(
+    telemetry_repository: AnalysisTelemetryRepositoryProtocol = Depends(__get_analysis_telemetry_repository),
+) -> GetTelemetryPercentilesUseCaseProtocol:
+    return GetTelemetryPercentilesUseCase(telemetry_repository=telemetry_repository)
+
+
+def _build_file_analizator_service(session: AsyncSession, settings: Settings) -> FileAnalizatorServiceProtocol:
+    """
+    Сервис анализа для фоновых задач.
+    Зависимости собираются вручную, так как задача выполняется вне контекста запроса.
+    """
+    file_service = get_file_managment_service(
+        file_repository=FileRepository(session),
+        file_cache_repository=get_file_cache_repository(get_redis_client()),
+        file_service=get_file_service(client=get_s3_client(), settings=settings),
+        settings=settings,
+    )
+    return get_file_analizator_service(
+        file_processing_repository=FileProcessingRepository(session=session),
+        file_service=file_service,
+        analyzer_service=get_analyzer_service(
+            settings=settings,
+            response_cache=get_llm_cache_repository(redis_client=get_redis_client(), settings=settings),
+            limiter=get_llm_limiter(),
+            request_policy=get_llm_request_policy(),
+            excel_parser=get_excel_parser(),
+            client=get_llm_client(),
+            prompt_registry=get_prompt_registry(),
+        ),
+        job_queue=get_analysis_worker_pool(),
+        settings=settings,
+        telemetry_repository=AnalysisTelemetryRepository(session=session),
+    )
+
+
+async def process_analysis_job(job: AnalysisJob) -> None:
+    """Обработчик задачи для пула воркеров"""
+    settings = get_settings()
+    async with AsyncSessionFactory() as session:
+        service = _build_file_analizator_service(session, settings)
+        await service.process_task(
+            job.task_id, job.file_id,
+            timings=job.timings, received_at=job.received_at, submitted_at=job.submitted_at,
+        )
+
+
+async def recover_analysis_jobs() -> int:
+    """Возвращает в очередь задачи, оставшиеся без процесса после перезапуска или падения"""
+    settings = get_settings()
+    async with AsyncSessionFactory() as session:
+        service = _build_file_analizator_service(session, settings)
+        return await service.recover_tasks(
+            stale_after=settings.analysis.lease_ttl,
+            max_recoveries=settings.analysis.max_recoveries,
+        )
@@ -1,15 +1,23 @@
 import uuid
 from typing import Optional
 import sqlalchemy as sa
-from shared.models import TimestampMixin
+from sqlalchemy_utils import ChoiceType
+from shared.models import CreationTimeMixin, TimestampMixin
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, MappedColumn
 from sqlalchemy.dialects.postgresql import UUID, JSON 
 from ...core.db import Base
+from ...core.enums import AnalysisStatus
 
 
 class FileProcessingResult(Base, TimestampMixin):
     __tablename__ = "file_processing_results"
+    __table_args__ = (
+        sa.Index(
+            "file_processing_results_fingerprint_idx",
+            "content_hash", "model_url", "prompt_version", "schema_version"
+        ),
+    )
 
     input_file_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), 
@@ -21,4 +29,60 @@ class FileProcessingResult(Base, TimestampMixin):
     result_table: MappedColumn[Optional[dict]] = mapped_column(
         JSON,  
         nullable=True
-    )
\ No newline at end of file
+    )
+    # Записи, созданные до появления фоновых задач, уже содержат готовый результат
+    status: MappedColumn[AnalysisStatus] = mapped_column(
+        ChoiceType(AnalysisStatus, impl=sa.String(32)),
+        nullable=False,
+        default=AnalysisStatus.QUEUED,
+        server_default=AnalysisStatus.DONE.value,
+        index=True
+    )
+    processed_reports: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0, server_default="0")
+    total_reports: MappedColumn[Optional[int]] = mapped_column(sa.Integer, nullable=True)
+    error: MappedColumn[Optional[str]] = mapped_column(sa.Text, nullable=True)
+
+    # Отпечаток анализа: одинаковый файл + та же модель, промпт и схема дают тот же результат
+    content_hash: MappedColumn[Optional[str]] = mapped_column(sa.String(64), nullable=True)
+    model_url: MappedColumn[Optional[str]] = mapped_column(sa.String(256), nullable=True)
+    prompt_version: MappedColumn[Optional[str]] = mapped_column(sa.String(64), nullable=True)
+    schema_version: MappedColumn[Optional[str]] = mapped_column(sa.String(64), nullable=True)
+
+
+class AnalysisTelemetry(Base, CreationTimeMixin):
+    """Телеметрия одного выполнения анализа: итоги по LLM и подробности по каждому запросу"""
+    __tablename__ = "analysis_telemetry"
+
+    result_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("file_processing_results.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    status: MappedColumn[AnalysisStatus] = mapped_column(ChoiceType(AnalysisStatus, impl=sa.String(32)), nullable=False)
+    total_seconds: MappedColumn[float] = mapped_column(sa.Float, nullable=False)
+    reports: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    llm_calls: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    prompt_tokens: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    completion_tokens: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    retries: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    cache_hits: MappedColumn[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    # Запросы к LLM: листы, ожидание слота, повторы, TTFB, длительность и токены
+    details: MappedColumn[Optional[list]] = mapped_column(JSON, nullable=True)
+
+
+class AnalysisStageTiming(Base, CreationTimeMixin):
+    """Длительность стадии анализа; отдельные строки нужны для перцентилей по стадиям"""
+    __tablename__ = "analysis_stage_timings"
+    __table_args__ = (
+        sa.Index("analysis_stage_timings_stage_created_at_idx", "stage", "created_at"),
+    )
+
+    telemetry_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("analysis_telemetry.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    stage: MappedColumn[str] = mapped_column(sa.String(64), nullable=False)
+    seconds: MappedColumn[float] = mapped_column(sa.Float, nullable=False)
@@ -0,0 +1,65 @@
+import uuid
+import redis.asyncio as redis
+from typing import Iterable
+from typing_extensions import Self
+from ....core.repositories.base_redis_repository import BaseRedisRepository
+
+
+class AnalysisJobLeaseRedisRepositoryProtocol(BaseRedisRepository[str]):
+    async def hold(self: Self, task_ids: Iterable[uuid.UUID], owner: str, ttl: int) -> None:
+        ...
+
+    async def acquire(self: Self, task_id: uuid.UUID, owner: str, ttl: int) -> bool:
+        ...
+
+    async def release(self: Self, task_id: uuid.UUID) -> None:
+        ...
+
+    async def is_held(self: Self, task_id: uuid.UUID) -> bool:
+        ...
+
+    async def add_recovery(self: Self, task_id: uuid.UUID, ttl: int) -> int:
+        ...
+
+
+class AnalysisJobLeaseRedisRepository(AnalysisJobLeaseRedisRepositoryProtocol):
+    """
+    Аренды задач анализа:
+    - lease:{id} — процесс, у которого задача в очереди или выполняется; живёт ttl секунд,
+      процесс продлевает аренды своих задач, пока они не завершатся
+    - recoveries:{id} — сколько раз задачу возвращали в очередь после потери процесса
+
+    Задача queued/running без аренды никем не выполняется (процесс перезапущен или упал).
+    """
+
+    def __init__(self: Self, redis_client: redis.Redis):
+        super().__init__(redis_client, prefix="analysis_jobs")
+
+    async def hold(self: Self, task_ids: Iterable[uuid.UUID], owner: str, ttl: int) -> None:
+        """Ставит или продлевает аренды задач процесса"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.set(self._lease_key(task_id), owner, ex=ttl)
+        await pipe.execute()
+
+    async def acquire(self: Self, task_id: uuid.UUID, owner: str, ttl: int) -> bool:
+        """Берёт аренду задачи, у которой её нет; True получает ровно один из процессов"""
+        return bool(await self.redis_client.set(self._lease_key(task_id), owner, ex=ttl, nx=True))
+
+    async def release(self: Self, task_id: uuid.UUID) -> None:
+        await self.redis_client.delete(self._lease_key(task_id))
+
+    async def is_held(self: Self, task_id: uuid.UUID) -> bool:
+        return bool(await self.redis_client.exists(self._lease_key(task_id)))
+
+    async def add_recovery(self: Self, task_id: uuid.UUID, ttl: int) -> int:
+        """Увеличивает счётчик восстановлений задачи, возвращает новое значение"""
+        key = self._make_key(f"recoveries:{task_id}")
+        pipe = self.redis_client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, ttl)
+        count, _ = await pipe.execute()
+        return int(count)
+
+    def _lease_key(self: Self, task_id: uuid.UUID) -> str:
+        return self._make_key(f"lease:{task_id}")
@@ -0,0 +1,69 @@
+import sqlalchemy as sa
+from datetime import datetime
+from typing_extensions import Self
+from shared.schemas.base import UpdateBaseModel
+from ....core.repositories.base_repository import BaseRepositoryImpl
+from ..models import AnalysisTelemetry, AnalysisStageTiming
+from ..schemas import AnalysisTelemetryCreateSchema, AnalysisTelemetryReadSchema, AnalysisStagePercentilesSchema
+
+
+class AnalysisTelemetryRepositoryProtocol(
+    BaseRepositoryImpl[
+        AnalysisTelemetry,
+        AnalysisTelemetryReadSchema,
+        AnalysisTelemetryCreateSchema,
+        UpdateBaseModel
+    ]
+    ):
+    async def create_with_stages(
+        self: Self, create_object: AnalysisTelemetryCreateSchema, stages: dict[str, float]
+    ) -> AnalysisTelemetryReadSchema:
+        ...
+
+    async def get_stage_percentiles(self: Self, since: datetime) -> list[AnalysisStagePercentilesSchema]:
+        ...
+
+
+class AnalysisTelemetryRepository(AnalysisTelemetryRepositoryProtocol):
+    async def create_with_stages(
+        self: Self, create_object: AnalysisTelemetryCreateSchema, stages: dict[str, float]
+    ) -> AnalysisTelemetryReadSchema:
+        """Сохраняет телеметрию и длительности стадий в одной транзакции"""
+        async with self.session as s, s.begin():
+            stmt = (
+                sa.insert(self.model_type)
+                .values(**create_object.model_dump(exclude={'id'}))
+                .returning(self.model_type)
+            )
+            model = (await s.execute(stmt)).scalar_one()
+            if stages:
+                await s.execute(
+                    sa.insert(AnalysisStageTiming),
+                    [{"telemetry_id": model.id, "stage": stage, "seconds": seconds} for stage, seconds in stages.items()],
+                )
+            return self.read_schema_type.model_validate(model, from_attributes=True)
+
+    async def get_stage_percentiles(self: Self, since: datetime) -> list[AnalysisStagePercentilesSchema]:
+        """Перцентили длительности каждой стадии по анализам, завершённым после since"""
+        seconds = AnalysisStageTiming.seconds
+
+        def percentile(q: float):
+            return sa.func.percentile_cont(q).within_group(seconds)
+
+        async with self.session as s:
+            stmt = (
+                sa.select(
+                    AnalysisStageTiming.stage,
+                    sa.func.count().label("count"),
+                    sa.func.avg(seconds).label("avg"),
+                    percentile(0.5).label("p50"),
+                    percentile(0.9).label("p90"),
+                    percentile(0.99).label("p99"),
+                    sa.func.max(seconds).label("max"),
+                )
+                .where(AnalysisStageTiming.created_at >= since)
+                .group_by(AnalysisStageTiming.stage)
+                .order_by(AnalysisStageTiming.stage)
+            )
+            rows = (await s.execute(stmt)).mappings().all()
+            return [AnalysisStagePercentilesSchema.model_validate(dict(row)) for row in rows]
@@ -1,16 +1,63 @@
 import uuid
+from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, Field
 from shared.schemas.base import TimestampMixin, CreateBaseModel, UpdateBaseModel
+from ...core.enums import AnalysisStatus
 
 class FileProcessingResultBaseSchema(BaseModel):
     input_file_id: uuid.UUID = Field(..., description="ID of the input file")
-    result_table: dict = Field(..., description="Resulting data table from file processing")
+    result_table: Optional[dict] = Field(None, description="Resulting data table from file processing")
+    status: AnalysisStatus = Field(AnalysisStatus.QUEUED, description="Status of the analysis task")
+    processed_reports: int = Field(0, description="Number of reports already processed")
+    total_reports: Optional[int] = Field(None, description="Total number of reports found in the file")
+    error: Optional[str] = Field(None, description="Error message if the analysis failed")
+    content_hash: Optional[str] = Field(None, description="SHA-256 of the input file content")
+    model_url: Optional[str] = Field(None, description="LLM model used for the analysis")
+    prompt_version: Optional[str] = Field(None, description="Version of the system prompt")
+    schema_version: Optional[str] = Field(None, description="Version of the JSON schema")
 
 class FileProcessingResultCreateSchema(FileProcessingResultBaseSchema, CreateBaseModel):
     pass
 
-class FileProcessingResultUpdateSchema(FileProcessingResultBaseSchema, UpdateBaseModel):
-    pass
+class FileProcessingResultUpdateSchema(UpdateBaseModel):
+    result_table: Optional[dict] = None
+    status: Optional[AnalysisStatus] = None
+    processed_reports: Optional[int] = None
+    total_reports: Optional[int] = None
+    error: Optional[str] = None
+    content_hash: Optional[str] = None
+    prompt_version: Optional[str] = None
+    schema_version: Optional[str] = None
 
 class FileProcessingResultReadSchema(FileProcessingResultBaseSchema, TimestampMixin):
-    id: uuid.UUID = Field(..., description="Unique identifier of the file processing result")
\ No newline at end of file
+    id: uuid.UUID = Field(..., description="Unique identifier of the file processing result")
+
+class AnalysisTelemetryCreateSchema(CreateBaseModel):
+    result_id: uuid.UUID = Field(..., description="ID of the file processing result")
+    status: AnalysisStatus = Field(..., description="Final status of the analysis")
+    total_seconds: float = Field(..., description="Wall time from upload to the stored result")
+    reports: int = Field(0, description="Number of reports sent to the LLM")
+    llm_calls: int = Field(0, description="Number of LLM requests")
+    prompt_tokens: int = Field(0, description="Prompt tokens reported by the LLM")
+    completion_tokens: int = Field(0, description="Completion tokens reported by the LLM")
+    retries: int = Field(0, description="Retries of LLM requests")
+    cache_hits: int = Field(0, description="Responses taken from the LLM response cache")
+    details: Optional[list[dict]] = Field(None, description="Per-request LLM telemetry")
+
+class AnalysisTelemetryReadSchema(AnalysisTelemetryCreateSchema):
+    id: uuid.UUID = Field(..., description="Unique identifier of the telemetry record")
+    created_at: datetime = Field(..., description="Creation time")
+
+class AnalysisStagePercentilesSchema(BaseModel):
+    stage: str = Field(..., description="Analysis stage")
+    count: int = Field(..., description="Number of analyses with this stage in the window")
+    avg: float = Field(..., description="Mean duration, seconds")
+    p50: float = Field(..., description="Median duration, seconds")
+    p90: float = Field(..., description="90th percentile, seconds")
+    p99: float = Field(..., description="99th percentile, seconds")
+    max: float = Field(..., description="Maximum duration, seconds")
+
+class AnalysisTelemetryPercentilesSchema(BaseModel):
+    window_minutes: int = Field(..., description="Time window the percentiles are computed over")
+    stages: list[AnalysisStagePercentilesSchema] = Field(..., description="Percentiles per stage")
@@ -1,18 +1,54 @@
+import asyncio
+import hashlib
+import time
 import uuid
+import logging
+from datetime import datetime, timedelta, timezone
 from fastapi import UploadFile
-from typing import Protocol
+from typing import Optional, Protocol
 from typing_extensions import Self
 from shared.schemas.files import FileCreateSchema
-from ...analyzer.services.analyzer import AnalyzerServiceProtocol
+from ....core.enums import AnalysisStatus
+from ....core.utils.telemetry import AnalysisTrace, trace_stage, use_trace
+from ...analyzer.services.analyzer import AnalyzerServiceProtocol, ProgressCallback
 from ...files.services.file_managment_service import FileManagmentServiceProtocol
+from ...files.services.upload_stream import DigestingStream, UploadStream
+from ..exceptions import AnalysisQueueFullError
 from ..repositories.file_processing import FileProcessingRepositoryProtocol
-from ..schemas import FileProcessingResultCreateSchema, FileProcessingResultReadSchema
+from ..repositories.telemetry import AnalysisTelemetryRepositoryProtocol
+from ..schemas import (
+    FileProcessingResultCreateSchema, FileProcessingResultReadSchema, FileProcessingResultUpdateSchema,
+    AnalysisTelemetryCreateSchema
+)
+from .job_queue import AnalysisJob, AnalysisJobQueueProtocol
+
+
+logger = logging.getLogger(__name__)
 
 class FileAnalizatorServiceProtocol(Protocol):
     file_service: FileManagmentServiceProtocol
     analyzer_service: AnalyzerServiceProtocol
 
-    async def analyze_and_store(self: Self, file: UploadFile) -> FileProcessingResultReadSchema:
+    async def analyze_and_store(self: Self, file: UploadFile, force: bool = False) -> FileProcessingResultReadSchema:
+        ...
+
+    async def analyze_and_store_stream(self: Self, file: UploadStream, force: bool = False) -> FileProcessingResultReadSchema:
+        ...
+
+    async def analyze_file(self: Self, file_id: uuid.UUID) -> FileProcessingResultReadSchema:
+        ...
+
+    async def process_task(
+        self: Self,
+        task_id: uuid.UUID,
+        file_id: uuid.UUID,
+        timings: Optional[dict[str, float]] = None,
+        received_at: Optional[float] = None,
+        submitted_at: Optional[float] = None,
+    ) -> None:
+        ...
+
+    async def recover_tasks(self: Self, stale_after: float, max_recoveries: int, limit: int = 100) -> int:
         ...
 
     async def get_analyzes_result(self: Self, task_id: uuid.UUID) -> FileProcessingResultReadSchema:
@@ -23,27 +59,328 @@ class FileAnalizatorService(FileAnalizatorServiceProtocol):
                  file_processing_repository: FileProcessingRepositoryProtocol,
                  file_service: FileManagmentServiceProtocol, 
                  analyzer_service: AnalyzerServiceProtocol,
+                 job_queue: AnalysisJobQueueProtocol | None = None,
+                 progress_interval: float = 1.0,
+                 telemetry_repository: AnalysisTelemetryRepositoryProtocol | None = None,
                  ):
         self.file_processing_repository = file_processing_repository
         self.file_service = file_service
         self.analyzer_service = analyzer_service
+        self.job_queue = job_queue
+        self.progress_interval = progress_interval
+        self.telemetry_repository = telemetry_repository
+
+    async def analyze_and_store(self: Self, file: UploadFile, force: bool = False) -> FileProcessingResultReadSchema:
+        """
+        Сохраняет файл и ставит его анализ в очередь.
+        Возвращает запись со статусом queued, результат появится после обработки воркером.
+
+        Если такой же файл уже анализировался той же моделью с теми же промптом и схемой,
+        возвращается существующий результат (или ещё выполняющаяся задача) без повторной
+        загрузки и вызовов LLM. force=True отключает переиспользование.
+        """
+        if self.job_queue is None:
+            raise RuntimeError("Analysis job queue is not configured")
+
+        # Стадии приёма файла передаются воркеру вместе с задачей
+        received_at = time.monotonic()
+        trace = AnalysisTrace()
 
-    async def analyze_and_store(self: Self, file: UploadFile) -> FileProcessingResultReadSchema:
-        # Сохраняем любой файл, который пришёл к нам с помощью file_service
         content = await file.read()
-        created_file = await self.file_service.create_from_content(FileCreateSchema(), content, file.filename)
+        with trace.stage("hash"):
+            content_hash = await asyncio.to_thread(self._hash_content, content)
+
+        if not force:
+            existing = await self._find_existing(content_hash, trace)
+            if existing is not None:
+                return existing
+
+        # Не принимаем файл, если очередь уже заполнена
+        self.job_queue.ensure_capacity()
+
+        # Сохраняем любой файл, который пришёл к нам с помощью file_service
+        with trace.stage("upload"):
+            created_file = await self.file_service.create_from_content(FileCreateSchema(), content, file.filename)
+
+        return await self._submit(created_file.id, content_hash, trace, received_at)
+
+    async def analyze_and_store_stream(self: Self, file: UploadStream, force: bool = False) -> FileProcessingResultReadSchema:
+        """
+        То же, что analyze_and_store, но файл не читается в память: тело запроса потоком уходит
+        в хранилище, хэш и размер считаются на лету, а воркер читает файл из хранилища сам.
+
+        Хэш известен только после загрузки, поэтому повторный файл всё же загружается,
+        после чего удаляется, и возвращается существующий результат.
+        """
+        if self.job_queue is None:
+            raise RuntimeError("Analysis job queue is not configured")
+
+        received_at = time.monotonic()
+        trace = AnalysisTrace()
+
+        # Проверяем очередь до приёма тела запроса
+        self.job_queue.ensure_capacity()
+
+        stream = DigestingStream(file.chunks)
+        with trace.stage("upload"):
+            created_file = await self.file_service.create_from_stream(
+                FileCreateSchema(), stream, file.filename, content_type=file.content_type
+            )
+        content_hash = stream.sha256
 
+        if not force:
+            existing = await self._find_existing(content_hash, trace)
+            if existing is not None:
+                await self.file_service.delete(created_file.id, creator_user_id=None)
+                return existing
 
-        # Потом анализируем файл
-        analysis_result = await self.analyzer_service.analyze(content)
+        return await self._submit(created_file.id, content_hash, trace, received_at)
 
-        
+    async def analyze_file(self: Self, file_id: uuid.UUID) -> FileProcessingResultReadSchema:
+        """
+        Ставит в очередь анализ уже загруженного файла (например, загруженного по частям).
+        У файла не больше одной задачи анализа: повторный вызов возвращает существующую.
+        Хэш содержимого неизвестен до чтения файла, поэтому поиск готового результата
+        по содержимому не выполняется; хэш сохраняет воркер.
+        """
+        if self.job_queue is None:
+            raise RuntimeError("Analysis job queue is not configured")
+
+        received_at = time.monotonic()
+        trace = AnalysisTrace()
+
+        # Проверяем, что файл существует
+        await self.file_service.get(file_id)
+
+        existing = await self.file_processing_repository.get_by_input_file_id(file_id)
+        if existing is not None:
+            return existing
+
+        self.job_queue.ensure_capacity()
+        return await self._submit(file_id, None, trace, received_at)
+
+    async def _find_existing(self: Self, content_hash: str, trace: AnalysisTrace) -> Optional[FileProcessingResultReadSchema]:
+        """
+        Готовый результат анализа того же содержимого или задача, которая ещё выполняется.
+        Задача queued/running без живой аренды никем не выполняется (процесс перезапущен или упал),
+        к ней не присоединяемся.
+        """
+        fingerprint = dict(
+            content_hash=content_hash,
+            model_url=self.analyzer_service.model_url,
+            prompt_version=self.analyzer_service.prompt_version,
+            schema_version=self.analyzer_service.schema_version,
+        )
+        with trace.stage("dedupe_lookup"):
+            existing = await self.file_processing_repository.get_by_fingerprint(**fingerprint)
+            if existing is None:
+                for task in await self.file_processing_repository.get_in_flight_by_fingerprint(**fingerprint):
+                    if await self.job_queue.is_alive(task.id):
+                        existing = task
+                        break
+        if existing is not None:
+            logger.info(f"Reusing analysis {existing.id} ({existing.status.value}) for content {content_hash}")
+        return existing
+
+    async def _submit(
+        self: Self,
+        input_file_id: uuid.UUID,
+        content_hash: Optional[str],
+        trace: AnalysisTrace,
+        received_at: float,
+    ) -> FileProcessingResultReadSchema:
+        """Создаёт запись задачи со статусом queued и ставит её в очередь воркеров"""
         file_result = FileProcessingResultCreateSchema(
-            input_file_id=created_file.id,
-            result_table=analysis_result
+            input_file_id=input_file_id,
+            status=AnalysisStatus.QUEUED,
+            content_hash=content_hash,
+            model_url=self.analyzer_service.model_url,
+            prompt_version=self.analyzer_service.prompt_version,
+            schema_version=self.analyzer_service.schema_version,
         )
+        with trace.stage("db_insert"):
+            task = await self.file_processing_repository.create(file_result)
+
+        try:
+            await self.job_queue.submit(AnalysisJob(
+                task_id=task.id,
+                file_id=input_file_id,
+                timings=trace.stages,
+                received_at=received_at,
+                submitted_at=time.monotonic(),
+            ))
+        except Exception as e:
+            await self._mark_failed(task.id, str(e))
+            raise
+
+        return task
+
+    async def process_task(
+        self: Self,
+        task_id: uuid.UUID,
+        file_id: uuid.UUID,
+        timings: Optional[dict[str, float]] = None,
+        received_at: Optional[float] = None,
+        submitted_at: Optional[float] = None,
+    ) -> None:
+        """
+        Выполняет анализ поставленной в очередь задачи и сохраняет результат.
+        Файл читается из хранилища по file_id.
+        timings, received_at и submitted_at — телеметрия приёма файла из analyze_and_store.
+        """
+        started_at = time.monotonic()
+        trace = AnalysisTrace(stages=dict(timings or {}))
+        if submitted_at is not None:
+            trace.add_stage("queue_wait", started_at - submitted_at)
+
+        with use_trace(trace):
+            status = await self._run_task(task_id, file_id)
+        await self._store_telemetry(task_id, status, trace, received_at or started_at)
+
+    async def _run_task(self: Self, task_id: uuid.UUID, file_id: uuid.UUID) -> AnalysisStatus:
+        with trace_stage("db_progress"):
+            await self.file_processing_repository.update(
+                FileProcessingResultUpdateSchema(id=task_id, status=AnalysisStatus.RUNNING)
+            )
 
-        return await self.file_processing_repository.create(file_result)
+        try:
+            with trace_stage("download"):
+                content = await self.file_service.read_content(file_id)
+            # Хэш файлов, загруженных без чтения в память, — для переиспользования результата
+            content_hash = await asyncio.to_thread(self._hash_content, content)
+            analysis_result = await self.analyzer_service.analyze(
+                content, on_progress=self._make_progress_callback(task_id)
+            )
+        except asyncio.CancelledError:
+            # Задача остаётся running без аренды, её вернёт в очередь восстановление (recover_tasks)
+            logger.warning(f"Analysis task {task_id} was interrupted")
+            raise
+        except Exception as e:
+            logger.error(f"Analysis task {task_id} failed: {e}", exc_info=True)
+            await self._mark_failed(task_id, str(e))
+            return AnalysisStatus.FAILED
+
+        with trace_stage("db_result"):
+            await self.file_processing_repository.update(
+                FileProcessingResultUpdateSchema(
+                    id=task_id,
+                    status=AnalysisStatus.DONE,
+                    result_table=analysis_result,
+                    content_hash=content_hash,
+                    # Версии, с которыми анализ фактически выполнен (промпт мог обновиться, пока задача ждала в очереди)
+                    prompt_version=self.analyzer_service.prompt_version,
+                    schema_version=self.analyzer_service.schema_version,
+                )
+            )
+        logger.info(f"Analysis task {task_id} done")
+        return AnalysisStatus.DONE
     
+    async def recover_tasks(self: Self, stale_after: float, max_recoveries: int, limit: int = 100) -> int:
+        """
+        Возвращает в очередь задачи queued/running, которые никто не выполняет: очередь живёт
+        в памяти процесса и теряется при его перезапуске или падении. Проверяются задачи старше
+        stale_after секунд (у только что созданной аренда может ещё не появиться).
+        Задача, восстановленная больше max_recoveries раз (например, роняет процесс), помечается failed.
+        Возвращает число восстановленных задач.
+        """
+        if self.job_queue is None:
+            raise RuntimeError("Analysis job queue is not configured")
+
+        created_before = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        recovered = 0
+        for task in await self.file_processing_repository.get_in_flight(created_before, limit):
+            try:
+                self.job_queue.ensure_capacity()
+            except AnalysisQueueFullError:
+                # Остальные задачи восстановим при следующем запуске
+                break
+            recovery = await self.job_queue.claim(task.id)
+            if recovery is None:
+                continue
+            if recovery > max_recoveries:
+                logger.error(f"Analysis task {task.id} was lost {recovery} times, giving up")
+                await self._mark_failed(task.id, f"Analysis was interrupted {recovery} times")
+                continue
+
+            logger.warning(f"Requeueing orphaned analysis task {task.id} ({task.status.value}, recovery {recovery})")
+            await self.file_processing_repository.update(
+                FileProcessingResultUpdateSchema(id=task.id, status=AnalysisStatus.QUEUED, processed_reports=0)
+            )
+            try:
+                await self.job_queue.submit(AnalysisJob(
+                    task_id=task.id, file_id=task.input_file_id, submitted_at=time.monotonic()
+                ))
+            except AnalysisQueueFullError:
+                break
+            recovered += 1
+        return recovered
+
     async def get_analyzes_result(self: Self, task_id: uuid.UUID) -> FileProcessingResultReadSchema:
-        return await self.file_processing_repository.get(task_id)
\ No newline at end of file
+        return await self.file_processing_repository.get(task_id)
+
+    @staticmethod
+    def _hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _make_progress_callback(self: Self, task_id: uuid.UUID) -> ProgressCallback:
+        """Создаёт колбэк, который сохраняет прогресс не чаще, чем раз в progress_interval секунд"""
+        last_update = 0.0
+
+        async def on_progress(processed: int, total: int) -> None:
+            nonlocal last_update
+            now = time.monotonic()
+            if processed not in (0, total) and now - last_update < self.progress_interval:
+                return
+            last_update = now
+            with trace_stage("db_progress"):
+                await self.file_processing_repository.update(
+                    FileProcessingResultUpdateSchema(id=task_id, processed_reports=processed, total_reports=total)
+                )
+
+        return on_progress
+
+    async def _mark_failed(self: Self, task_id: uuid.UUID, error: str) -> None:
+        try:
+            await self.file_processing_repository.update(
+                FileProcessingResultUpdateSchema(id=task_id, status=AnalysisStatus.FAILED, error=error)
+            )
+        except Exception as e:
+            logger.error(f"Failed to mark analysis task {task_id} as failed: {e}", exc_info=True)
+
+    async def _store_telemetry(
+        self: Self, task_id: uuid.UUID, status: AnalysisStatus, trace: AnalysisTrace, received_at: float
+    ) -> None:
+        """
+        Сохраняет разбивку времени анализа. Стадии llm_queue и llm_generation — суммы
+        по всем запросам к LLM (запросы идут параллельно, поэтому сумма может превышать стадию llm).
+        Ошибка сохранения телеметрии не влияет на результат анализа.
+        """
+        if self.telemetry_repository is None:
+            return
+
+        total_seconds = time.monotonic() - received_at
+        calls = trace.llm_calls
+        stages = dict(trace.stages)
+        if calls:
+            stages["llm_queue"] = sum(call.queue_wait for call in calls)
+            stages["llm_generation"] = sum(call.duration - call.queue_wait for call in calls)
+        stages["total"] = total_seconds
+
+        try:
+            await self.telemetry_repository.create_with_stages(
+                AnalysisTelemetryCreateSchema(
+                    result_id=task_id,
+                    status=status,
+                    total_seconds=total_seconds,
+                    reports=len({report for call in calls for report in call.reports}),
+                    llm_calls=len(calls),
+                    prompt_tokens=sum(call.prompt_tokens for call in calls),
+                    completion_tokens=sum(call.completion_tokens for call in calls),
+                    retries=sum(call.retries for call in calls),
+                    cache_hits=trace.cache_hits,
+                    details=[call.to_dict() for call in calls],
+                ),
+                stages,
+            )
+        except Exception as e:
+            logger.error(f"Failed to store telemetry of analysis task {task_id}: {e}", exc_info=True)
@@ -0,0 +1,254 @@
+import asyncio
+import uuid
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, Protocol
+from typing_extensions import Self
+from ..exceptions import AnalysisQueueFullError
+from ..repositories.jobs_cache import AnalysisJobLeaseRedisRepositoryProtocol
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnalysisJob:
+    """
+    Задача анализа, ожидающая выполнения в пуле воркеров.
+    Файл воркер читает из хранилища по file_id, содержимое в очереди не хранится.
+    """
+    task_id: uuid.UUID
+    file_id: uuid.UUID
+    # Телеметрия приёма файла: длительности стадий запроса и моменты (time.monotonic) приёма и постановки в очередь
+    timings: dict[str, float] = field(default_factory=dict)
+    received_at: Optional[float] = None
+    submitted_at: Optional[float] = None
+
+
+AnalysisJobHandler = Callable[[AnalysisJob], Awaitable[None]]
+
+
+class AnalysisJobQueueProtocol(Protocol):
+    def ensure_capacity(self: Self) -> None:
+        ...
+
+    async def submit(self: Self, job: AnalysisJob) -> None:
+        ...
+
+    async def is_alive(self: Self, task_id: uuid.UUID) -> bool:
+        ...
+
+    async def claim(self: Self, task_id: uuid.UUID) -> Optional[int]:
+        ...
+
+    def stats(self: Self) -> dict:
+        ...
+
+
+class AnalysisWorkerPool(AnalysisJobQueueProtocol):
+    """
+    Пул asyncio-воркеров внутри процесса.
+    Задачи кладутся в ограниченную очередь и выполняются не более чем `workers` одновременно.
+
+    Очередь живёт только в памяти процесса, поэтому на каждую задачу, пока она в очереди
+    или выполняется, в Redis держится аренда (продлевается раз в lease_ttl / 3 секунд).
+    Задачу без аренды никто не выполняет, её можно вернуть в очередь (claim).
+    """
+
+    # Сколько помнить число восстановлений задачи
+    RECOVERIES_TTL = 24 * 60 * 60
+
+    def __init__(self: Self,
+                 handler: AnalysisJobHandler,
+                 leases: AnalysisJobLeaseRedisRepositoryProtocol,
+                 workers: int = 4,
+                 max_queue_size: int = 100,
+                 lease_ttl: int = 60):
+        self.handler = handler
+        self.leases = leases
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.lease_ttl = lease_ttl
+        self.owner = uuid.uuid4().hex
+        self._queue: asyncio.Queue[AnalysisJob] = asyncio.Queue(maxsize=max_queue_size)
+        self._tasks: list[asyncio.Task] = []
+        # Задачи процесса в очереди и в работе — их аренды продлеваются
+        self._active: set[uuid.UUID] = set()
+        self._running = 0
+
+    async def start(self: Self) -> None:
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(), name=f"analysis-worker-{i}"))
+        self._tasks.append(asyncio.create_task(self._heartbeat(), name="analysis-leases"))
+        logger.info(f"Analysis worker pool started: {self.workers} workers, queue size {self.max_queue_size}")
+
+    async def stop(self: Self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if not self._queue.empty():
+            # Аренды истекут, и задачи восстановит другой процесс или этот после перезапуска
+            logger.warning(f"Analysis worker pool stopped with {self._queue.qsize()} queued jobs")
+        logger.info("Analysis worker pool stopped")
+
+    def ensure_capacity(self: Self) -> None:
+        """Проверяет, что в очереди есть место, до того как файл будет сохранён"""
+        if self._queue.full():
+            raise AnalysisQueueFullError(self.max_queue_size)
+
+    async def submit(self: Self, job: AnalysisJob) -> None:
+        self.ensure_capacity()
+        await self.leases.hold([job.task_id], self.owner, self.lease_ttl)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await self.leases.release(job.task_id)
+            raise AnalysisQueueFullError(self.max_queue_size)
+        self._active.add(job.task_id)
+
+    async def is_alive(self: Self, task_id: uuid.UUID) -> bool:
+        """Задача в очереди или выполняется в этом или другом процессе"""
+        return task_id in self._active or await self.leases.is_held(task_id)
+
+    async def claim(self: Self, task_id: uuid.UUID) -> Optional[int]:
+        """
+        Забирает задачу, которую никто не выполняет. Возвращает номер восстановления задачи
+        или None, если у задачи есть живая аренда (её выполняет процесс или уже забрал другой).
+        """
+        if task_id in self._active or not await self.leases.acquire(task_id, self.owner, self.lease_ttl):
+            return None
+        return await self.leases.add_recovery(task_id, self.RECOVERIES_TTL)
+
+    def stats(self: Self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+        }
+
+    async def _worker(self: Self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            try:
+                await self.handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis job {job.task_id} failed: {e}", exc_info=True)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+                self._active.discard(job.task_id)
+                await self._release(job.task_id)
+
+    async def _release(self: Self, task_id: uuid.UUID) -> None:
+        try:
+            await self.leases.release(task_id)
+        except Exception as e:
+            # Аренда истечёт сама, задача уже завершена
+            logger.warning(f"Failed to release lease of analysis job {task_id}: {e}")
+
+    async def _heartbeat(self: Self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            if not self._active:
+                continue
+            try:
+                await self.leases.hold(list(self._active), self.owner, self.lease_ttl)
+            except Exception as e:
+                logger.error(f"Failed to refresh analysis job leases: {e}")
+
+
+AnalysisRecoveryHandler = Callable[[], Awaitable[int]]
+
+
+class AnalysisJobRecovery:
+    """
+    Восстановление задач, оставшихся без процесса: при старте и затем раз в interval секунд
+    вызывает handler, который возвращает задачи без аренды в очередь (или помечает их failed).
+    """
+
+    def __init__(self: Self, handler: AnalysisRecoveryHandler, interval: float):
+        self.handler = handler
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self: Self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch(), name="analysis-recovery")
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self: Self) -> None:
+        while True:
+            try:
+                recovered = await self.handler()
+                if recovered:
+                    logger.info(f"Recovered {recovered} orphaned analysis jobs")
+            except Exception as e:
+                logger.error(f"Analysis job recovery failed: {e}")
+            if self.interval <= 0:
+                return
+            await asyncio.sleep(self.interval)
+
+
+# Глобальный экземпляр пула (один на процесс)
+_worker_pool: Optional[AnalysisWorkerPool] = None
+
+
+def get_analysis_worker_pool() -> AnalysisWorkerPool:
+    """Возвращает пул воркеров, запущенный в lifespan приложения"""
+    if _worker_pool is None:
+        raise RuntimeError("Analysis worker pool is not started")
+    return _worker_pool
+
+
+async def start_analysis_worker_pool(
+    handler: AnalysisJobHandler,
+    leases: AnalysisJobLeaseRedisRepositoryProtocol,
+    workers: int,
+    max_queue_size: int,
+    lease_ttl: int,
+) -> AnalysisWorkerPool:
+    """Создаёт и запускает пул воркеров"""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = AnalysisWorkerPool(handler, leases, workers, max_queue_size, lease_ttl)
+        await _worker_pool.start()
+    return _worker_pool
+
+
+async def stop_analysis_worker_pool() -> None:
+    """Останавливает пул воркеров"""
+    global _worker_pool
+    if _worker_pool is not None:
+        await _worker_pool.stop()
+        _worker_pool = None
+
+
+# Глобальный экземпляр восстановления задач (один на процесс)
+_job_recovery: Optional[AnalysisJobRecovery] = None
+
+
+async def start_analysis_job_recovery(handler: AnalysisRecoveryHandler, interval: float) -> AnalysisJobRecovery:
+    """Запускает восстановление задач, оставшихся без процесса"""
+    global _job_recovery
+    if _job_recovery is None:
+        _job_recovery = AnalysisJobRecovery(handler, interval)
+        await _job_recovery.start()
+    return _job_recovery
+
+
+async def stop_analysis_job_recovery() -> None:
+    """Останавливает восстановление задач"""
+    global _job_recovery
+    if _job_recovery is not None:
+        await _job_recovery.stop()
+        _job_recovery = None
@@ -1,13 +1,14 @@
 from fastapi import UploadFile
 from typing_extensions import Self
 from ....core.use_cases import UseCaseProtocol
+from ...files.services.upload_stream import UploadStream
 from ..services.file_analizator import FileAnalizatorServiceProtocol
 from ..schemas import FileProcessingResultReadSchema
 
 
 class CreateFileAnalysisUseCaseProtocol(UseCaseProtocol[FileProcessingResultReadSchema]):
 
-    async def __call__(self: Self, file: UploadFile) -> FileProcessingResultReadSchema:
+    async def __call__(self: Self, file: UploadFile | UploadStream, force: bool = False) -> FileProcessingResultReadSchema:
         ...
 
 
@@ -16,5 +17,7 @@ class CreateFileAnalysisUseCase(CreateFileAnalysisUseCaseProtocol):
     def __init__(self: Self, file_service: FileAnalizatorServiceProtocol):
         self.file_service = file_service
 
-    async def __call__(self: Self, file: UploadFile) -> FileProcessingResultReadSchema:
-        return await self.file_service.analyze_and_store(file)
\ No newline at end of file
+    async def __call__(self: Self, file: UploadFile | UploadStream, force: bool = False) -> FileProcessingResultReadSchema:
+        if isinstance(file, UploadStream):
+            return await self.file_service.analyze_and_store_stream(file, force=force)
+        return await self.file_service.analyze_and_store(file, force=force)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import uuid
+from typing_extensions import Self
+from ....core.use_cases import UseCaseProtocol
+from ..services.file_analizator import FileAnalizatorServiceProtocol
+from ..schemas import FileProcessingResultReadSchema
+
+
+class CreateFileAnalysisByFileUseCaseProtocol(UseCaseProtocol[FileProcessingResultReadSchema]):
+
+    async def __call__(self: Self, file_id: uuid.UUID) -> FileProcessingResultReadSchema:
+        ...
+
+
+class CreateFileAnalysisByFileUseCase(CreateFileAnalysisByFileUseCaseProtocol):
+
+    def __init__(self: Self, file_service: FileAnalizatorServiceProtocol):
+        self.file_service = file_service
+
+    async def __call__(self: Self, file_id: uuid.UUID) -> FileProcessingResultReadSchema:
+        return await self.file_service.analyze_file(file_id)
\ No newline at end of file
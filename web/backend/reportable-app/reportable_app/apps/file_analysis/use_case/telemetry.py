@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+from typing_extensions import Self
+from ....core.use_cases import UseCaseProtocol
+from ..repositories.telemetry import AnalysisTelemetryRepositoryProtocol
+from ..schemas import AnalysisTelemetryPercentilesSchema
+
+
+class GetTelemetryPercentilesUseCaseProtocol(UseCaseProtocol[AnalysisTelemetryPercentilesSchema]):
+
+    async def __call__(self: Self, window_minutes: int) -> AnalysisTelemetryPercentilesSchema:
+        ...
+
+
+class GetTelemetryPercentilesUseCase(GetTelemetryPercentilesUseCaseProtocol):
+
+    def __init__(self: Self, telemetry_repository: AnalysisTelemetryRepositoryProtocol):
+        self.telemetry_repository = telemetry_repository
+
+    async def __call__(self: Self, window_minutes: int) -> AnalysisTelemetryPercentilesSchema:
+        since = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+        stages = await self.telemetry_repository.get_stage_percentiles(since)
+        return AnalysisTelemetryPercentilesSchema(window_minutes=window_minutes, stages=stages)
@@ -1,30 +1,43 @@
+import uuid
 import redis.asyncio as redis
 from fastapi import Depends
-from ...core.db import AsyncSession, get_async_session
-from ...core.clients.s3_client import S3ClientFactory
+from ...core.db import AsyncSession, AsyncSessionFactory, get_async_session
+from ...core.clients.s3_client import S3ClientFactory, get_s3_client_factory
+from ...core.clients.s3_signer import get_s3_url_signer
 from ...core.redis import get_redis_client
+from ...core.repositories.local_cache import get_local_cache, get_cache_invalidation_bus
 from ...settings import Settings, get_settings
 from .repositories.files import FileRepositoryProtocol, FileRepository
 from .repositories.files_cache import FileRedisRepositoryProtocol, FileRedisRepository
+from .repositories.uploads_cache import (
+    UploadSessionRedisRepositoryProtocol, UploadSessionRedisRepository,
+    DirectUploadRedisRepositoryProtocol, DirectUploadRedisRepository,
+)
 from .services.file_service import FileServiceProtocol, S3FileService
 from .services.file_managment_service import FileManagmentServiceProtocol, FileManagmentService
+from .services.resumable_upload import ResumableUploadServiceProtocol, ResumableUploadService
+from .services.direct_upload import DirectUploadServiceProtocol, DirectUploadService
 from .use_cases.create import CreateFileUseCaseProtocol, CreateFileUseCase
 from .use_cases.delete import DeleteFileUseCaseProtocol, DeleteFileUseCase
 from .use_cases.get import GetFileUseCaseProtocol, GetFileUseCase
 from .use_cases.get_by_template import GetByTemplateFileUseCaseProtocol, GetByTemplateFileUseCase
 from .use_cases.create_batch import CreateBatchFileUseCaseProtocol, CreateBatchFileUseCase
 from .use_cases.get_by_ids import GetIdsFileUseCaseProtocol, GetIdsFileUseCase
+from .use_cases.initiate_upload import InitiateUploadUseCaseProtocol, InitiateUploadUseCase
+from .use_cases.upload_part import UploadPartUseCaseProtocol, UploadPartUseCase
+from .use_cases.get_upload import GetUploadUseCaseProtocol, GetUploadUseCase
+from .use_cases.complete_upload import CompleteUploadUseCaseProtocol, CompleteUploadUseCase
+from .use_cases.abort_upload import AbortUploadUseCaseProtocol, AbortUploadUseCase
+from .use_cases.issue_direct_upload import IssueDirectUploadUseCaseProtocol, IssueDirectUploadUseCase
+from .use_cases.confirm_direct_upload import ConfirmDirectUploadUseCaseProtocol, ConfirmDirectUploadUseCase
 
 def __get_file_repository(session: AsyncSession = Depends(get_async_session)
                           ) -> FileRepositoryProtocol:
     return FileRepository(session)
 
-def get_s3_client(settings: Settings = Depends(get_settings)) -> S3ClientFactory:
-    return S3ClientFactory(
-        endpoint_url=settings.minio.endpoint,
-        aws_access_key_id=settings.minio.access_key,
-        aws_secret_access_key=settings.minio.secret_key
-    )
+def get_s3_client() -> S3ClientFactory:
+    # Общий для процесса клиент, создаётся в lifespan приложения
+    return get_s3_client_factory()
 
 
 def get_file_cache_repository(redis_client: redis.Redis = Depends(get_redis_client)) -> FileRedisRepositoryProtocol:
@@ -32,9 +45,12 @@ def get_file_cache_repository(redis_client: redis.Redis = Depends(get_redis_clie
     Provides a repository for file caching.
     
     :param redis_client: Redis client for caching.
-    :return: FileRepository instance configured for caching.
+    :return: FileRepository instance configured for caching,
+        with the in-process cache in front of Redis when it is enabled.
     """
-    return FileRedisRepository(redis_client=redis_client)
+    return FileRedisRepository(redis_client=redis_client,
+                               local=get_local_cache("files_local"),
+                               bus=get_cache_invalidation_bus())
 
 def get_file_service(client: S3ClientFactory = Depends(get_s3_client),
                      settings: Settings = Depends(get_settings)
@@ -42,7 +58,11 @@ def get_file_service(client: S3ClientFactory = Depends(get_s3_client),
     return S3FileService(client_factory=client,
                          bucket_name=settings.minio.bucket_name,
                          real_url=settings.minio.real_url,
-                         url_to_change=settings.minio.url_to_change)
+                         url_to_change=settings.minio.url_to_change,
+                         multipart_part_size=settings.minio.multipart_part_size,
+                         multipart_concurrency=settings.minio.multipart_concurrency,
+                         url_signer=get_s3_url_signer() if settings.minio.local_signing else None,
+                         url_expires_in=settings.minio.url_expires_in)
 
 
 def get_file_managment_service(file_repository: FileRepositoryProtocol = Depends(__get_file_repository),
@@ -78,4 +98,85 @@ def get_file_create_batch_use_case(file_managment_service: FileManagmentServiceP
 
 def get_file_get_by_ids_use_case(file_managment_service: FileManagmentServiceProtocol = Depends(get_file_managment_service)
                                 ) -> GetIdsFileUseCaseProtocol:
-    return GetIdsFileUseCase(file_managment_service)
\ No newline at end of file
+    return GetIdsFileUseCase(file_managment_service)
+
+
+def get_upload_session_repository(redis_client: redis.Redis = Depends(get_redis_client),
+                                  settings: Settings = Depends(get_settings)
+                                  ) -> UploadSessionRedisRepositoryProtocol:
+    return UploadSessionRedisRepository(redis_client=redis_client, idle_timeout=settings.uploads.idle_timeout)
+
+
+async def is_file_registered(file_id: uuid.UUID) -> bool:
+    """Есть ли запись файла в БД — для фоновых задач, выполняемых вне контекста запроса"""
+    async with AsyncSessionFactory() as session:
+        return await FileRepository(session).get_or_none(file_id) is not None
+
+
+def get_resumable_upload_service(sessions: UploadSessionRedisRepositoryProtocol = Depends(get_upload_session_repository),
+                                 file_service: FileServiceProtocol = Depends(get_file_service),
+                                 file_managment_service: FileManagmentServiceProtocol = Depends(get_file_managment_service),
+                                 settings: Settings = Depends(get_settings)
+                                 ) -> ResumableUploadServiceProtocol:
+    return ResumableUploadService(
+        sessions=sessions,
+        file_service=file_service,
+        file_managment_service=file_managment_service,
+        part_size=settings.minio.multipart_part_size,
+        idle_timeout=settings.uploads.idle_timeout,
+        max_parts=settings.uploads.max_parts,
+    )
+
+
+def get_initiate_upload_use_case(resumable_upload_service: ResumableUploadServiceProtocol = Depends(get_resumable_upload_service)
+                                 ) -> InitiateUploadUseCaseProtocol:
+    return InitiateUploadUseCase(resumable_upload_service)
+
+
+def get_upload_part_use_case(resumable_upload_service: ResumableUploadServiceProtocol = Depends(get_resumable_upload_service)
+                             ) -> UploadPartUseCaseProtocol:
+    return UploadPartUseCase(resumable_upload_service)
+
+
+def get_get_upload_use_case(resumable_upload_service: ResumableUploadServiceProtocol = Depends(get_resumable_upload_service)
+                            ) -> GetUploadUseCaseProtocol:
+    return GetUploadUseCase(resumable_upload_service)
+
+
+def get_complete_upload_use_case(resumable_upload_service: ResumableUploadServiceProtocol = Depends(get_resumable_upload_service)
+                                 ) -> CompleteUploadUseCaseProtocol:
+    return CompleteUploadUseCase(resumable_upload_service)
+
+
+def get_abort_upload_use_case(resumable_upload_service: ResumableUploadServiceProtocol = Depends(get_resumable_upload_service)
+                              ) -> AbortUploadUseCaseProtocol:
+    return AbortUploadUseCase(resumable_upload_service)
+
+
+def get_direct_upload_repository(redis_client: redis.Redis = Depends(get_redis_client)
+                                 ) -> DirectUploadRedisRepositoryProtocol:
+    return DirectUploadRedisRepository(redis_client=redis_client)
+
+
+def get_direct_upload_service(uploads: DirectUploadRedisRepositoryProtocol = Depends(get_direct_upload_repository),
+                              file_service: FileServiceProtocol = Depends(get_file_service),
+                              file_managment_service: FileManagmentServiceProtocol = Depends(get_file_managment_service),
+                              settings: Settings = Depends(get_settings)
+                              ) -> DirectUploadServiceProtocol:
+    return DirectUploadService(
+        uploads=uploads,
+        file_service=file_service,
+        file_managment_service=file_managment_service,
+        expires_in=settings.uploads.direct_expires_in,
+        max_size=settings.uploads.direct_max_size,
+    )
+
+
+def get_issue_direct_upload_use_case(direct_upload_service: DirectUploadServiceProtocol = Depends(get_direct_upload_service)
+                                     ) -> IssueDirectUploadUseCaseProtocol:
+    return IssueDirectUploadUseCase(direct_upload_service)
+
+
+def get_confirm_direct_upload_use_case(direct_upload_service: DirectUploadServiceProtocol = Depends(get_direct_upload_service)
+                                       ) -> ConfirmDirectUploadUseCaseProtocol:
+    return ConfirmDirectUploadUseCase(direct_upload_service)
@@ -26,4 +26,31 @@ class FileUploadError(CoreException):
             extras=extras_data,
             headers=headers
         )
-        self.filename = filename
\ No newline at end of file
+        self.filename = filename
+
+
+class UploadSessionNotFound(CoreException):
+    """
+    Ошибка, если загрузка по частям не найдена (завершена, отменена или брошена).
+    """
+    def __init__(
+        self,
+        upload_id: str,
+        headers: dict[str, str] | None = None,
+        extras: dict[str, Any] | None = None
+    ) -> None:
+        detail = f'Upload {upload_id} not found.'
+
+        # Подготовка дополнительных данных
+        extras_data = extras or {}
+        extras_data["upload_id"] = upload_id
+
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail,
+            error_code="UPLOAD_NOT_FOUND",
+            error_type="UploadNotFound",
+            extras=extras_data,
+            headers=headers
+        )
+        self.upload_id = upload_id
@@ -0,0 +1,150 @@
+import json
+import time
+import uuid
+import redis.asyncio as redis
+from typing import Optional
+from typing_extensions import Self
+from ....core.repositories.base_redis_repository import BaseRedisRepository
+from ..schemas import UploadSessionDBSchema, DirectUploadDBSchema
+
+
+class UploadSessionRedisRepositoryProtocol(BaseRedisRepository[str]):
+    async def create_session(self: Self, session: UploadSessionDBSchema) -> None:
+        ...
+
+    async def get_session(self: Self, upload_id: uuid.UUID) -> Optional[UploadSessionDBSchema]:
+        ...
+
+    async def add_part(self: Self, upload_id: uuid.UUID, part_number: int, etag: str, size: int) -> None:
+        ...
+
+    async def get_parts(self: Self, upload_id: uuid.UUID) -> dict[int, tuple[str, int]]:
+        ...
+
+    async def get_last_activity(self: Self, upload_id: uuid.UUID) -> Optional[float]:
+        ...
+
+    async def claim(self: Self, upload_id: uuid.UUID) -> bool:
+        ...
+
+    async def release(self: Self, upload_id: uuid.UUID) -> None:
+        ...
+
+    async def delete_session(self: Self, upload_id: uuid.UUID) -> None:
+        ...
+
+    async def get_idle(self: Self, idle_timeout: int, limit: int = 100) -> list[uuid.UUID]:
+        ...
+
+
+class UploadSessionRedisRepository(UploadSessionRedisRepositoryProtocol):
+    """
+    Состояние загрузок по частям:
+    - session:{id} — параметры загрузки
+    - parts:{id} — полученные части (номер -> ETag и размер)
+    - active — время последней активности каждой незавершённой загрузки (для очистки брошенных)
+
+    Ключи загрузки живут вдвое дольше idle_timeout, чтобы брошенную загрузку успели
+    отменить в S3 до того, как Redis забудет её UploadId.
+    """
+
+    ACTIVE_KEY = "active"
+
+    def __init__(self: Self, redis_client: redis.Redis, idle_timeout: int):
+        super().__init__(redis_client, prefix="uploads")
+        self.ttl = idle_timeout * 2
+
+    async def create_session(self: Self, session: UploadSessionDBSchema) -> None:
+        pipe = self.redis_client.pipeline()
+        pipe.setex(self._session_key(session.upload_id), self.ttl, session.model_dump_json())
+        pipe.zadd(self._make_key(self.ACTIVE_KEY), {str(session.upload_id): time.time()})
+        await pipe.execute()
+
+    async def get_session(self: Self, upload_id: uuid.UUID) -> Optional[UploadSessionDBSchema]:
+        data = await self.redis_client.get(self._session_key(upload_id))
+        if data is None:
+            return None
+        return UploadSessionDBSchema.model_validate_json(self._deserialize(data))
+
+    async def add_part(self: Self, upload_id: uuid.UUID, part_number: int, etag: str, size: int) -> None:
+        """Запоминает часть и продлевает жизнь загрузки"""
+        parts_key = self._parts_key(upload_id)
+        pipe = self.redis_client.pipeline()
+        pipe.hset(parts_key, str(part_number), json.dumps([etag, size]))
+        pipe.expire(parts_key, self.ttl)
+        pipe.expire(self._session_key(upload_id), self.ttl)
+        # xx: незавершённой загрузкой считается только та, что ещё есть в индексе
+        pipe.zadd(self._make_key(self.ACTIVE_KEY), {str(upload_id): time.time()}, xx=True)
+        await pipe.execute()
+
+    async def get_parts(self: Self, upload_id: uuid.UUID) -> dict[int, tuple[str, int]]:
+        parts = await self.redis_client.hgetall(self._parts_key(upload_id))
+        result = {}
+        for number, value in parts.items():
+            etag, size = json.loads(self._deserialize(value))
+            result[int(self._deserialize(number))] = (etag, size)
+        return result
+
+    async def get_last_activity(self: Self, upload_id: uuid.UUID) -> Optional[float]:
+        return await self.redis_client.zscore(self._make_key(self.ACTIVE_KEY), str(upload_id))
+
+    async def claim(self: Self, upload_id: uuid.UUID) -> bool:
+        """
+        Забирает загрузку из индекса активных. True получает ровно один вызывающий,
+        поэтому завершение, отмена и очистка одной загрузки не выполняются дважды.
+        """
+        return bool(await self.redis_client.zrem(self._make_key(self.ACTIVE_KEY), str(upload_id)))
+
+    async def release(self: Self, upload_id: uuid.UUID) -> None:
+        """Возвращает загрузку в индекс активных, если её не удалось завершить"""
+        await self.redis_client.zadd(self._make_key(self.ACTIVE_KEY), {str(upload_id): time.time()})
+
+    async def delete_session(self: Self, upload_id: uuid.UUID) -> None:
+        pipe = self.redis_client.pipeline()
+        pipe.delete(self._session_key(upload_id), self._parts_key(upload_id))
+        pipe.zrem(self._make_key(self.ACTIVE_KEY), str(upload_id))
+        await pipe.execute()
+
+    async def get_idle(self: Self, idle_timeout: int, limit: int = 100) -> list[uuid.UUID]:
+        """Загрузки без активности дольше idle_timeout секунд"""
+        ids = await self.redis_client.zrangebyscore(
+            self._make_key(self.ACTIVE_KEY), "-inf", time.time() - idle_timeout, start=0, num=limit
+        )
+        return [uuid.UUID(self._deserialize(upload_id)) for upload_id in ids]
+
+    def _session_key(self: Self, upload_id: uuid.UUID) -> str:
+        return self._make_key(f"session:{upload_id}")
+
+    def _parts_key(self: Self, upload_id: uuid.UUID) -> str:
+        return self._make_key(f"parts:{upload_id}")
+
+
+class DirectUploadRedisRepositoryProtocol(BaseRedisRepository[str]):
+    async def create_upload(self: Self, upload: DirectUploadDBSchema, ttl: int) -> None:
+        ...
+
+    async def get_upload(self: Self, file_id: uuid.UUID) -> Optional[DirectUploadDBSchema]:
+        ...
+
+    async def claim(self: Self, file_id: uuid.UUID) -> bool:
+        ...
+
+
+class DirectUploadRedisRepository(DirectUploadRedisRepositoryProtocol):
+    """Выданные формы прямой загрузки в хранилище, живут до подтверждения или истечения формы"""
+
+    def __init__(self: Self, redis_client: redis.Redis):
+        super().__init__(redis_client, prefix="direct_uploads")
+
+    async def create_upload(self: Self, upload: DirectUploadDBSchema, ttl: int) -> None:
+        await self.set(str(upload.file_id), upload.model_dump_json(), ttl=ttl)
+
+    async def get_upload(self: Self, file_id: uuid.UUID) -> Optional[DirectUploadDBSchema]:
+        data = await self.get(str(file_id))
+        if data is None:
+            return None
+        return DirectUploadDBSchema.model_validate_json(data)
+
+    async def claim(self: Self, file_id: uuid.UUID) -> bool:
+        """Удаляет форму; True получает ровно один из одновременных вызовов подтверждения"""
+        return await self.delete(str(file_id))
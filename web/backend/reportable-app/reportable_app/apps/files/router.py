@@ -9,13 +9,31 @@ from .use_cases.get import GetFileUseCaseProtocol
 from .use_cases.get_by_template import GetByTemplateFileUseCaseProtocol
 from .use_cases.create_batch import CreateBatchFileUseCaseProtocol
 from .use_cases.get_by_ids import GetIdsFileUseCaseProtocol
+from .use_cases.initiate_upload import InitiateUploadUseCaseProtocol
+from .use_cases.upload_part import UploadPartUseCaseProtocol
+from .use_cases.get_upload import GetUploadUseCaseProtocol
+from .use_cases.complete_upload import CompleteUploadUseCaseProtocol
+from .use_cases.abort_upload import AbortUploadUseCaseProtocol
+from .use_cases.issue_direct_upload import IssueDirectUploadUseCaseProtocol
+from .use_cases.confirm_direct_upload import ConfirmDirectUploadUseCaseProtocol
+from .schemas import (
+    UploadSessionCreateSchema, UploadSessionReadSchema, UploadPartReadSchema,
+    DirectUploadCreateSchema, DirectUploadReadSchema,
+)
 from .depends import (
     get_file_create_use_case,
     get_file_delete_use_case,
     get_file_get_by_template_use_case,
     get_file_get_use_case,
     get_file_create_batch_use_case,
-    get_file_get_by_ids_use_case
+    get_file_get_by_ids_use_case,
+    get_initiate_upload_use_case,
+    get_upload_part_use_case,
+    get_get_upload_use_case,
+    get_complete_upload_use_case,
+    get_abort_upload_use_case,
+    get_issue_direct_upload_use_case,
+    get_confirm_direct_upload_use_case,
 )
 
 router = APIRouter(prefix='/api/files', tags=['Files'])
@@ -62,6 +80,63 @@ router = APIRouter(prefix='/api/files', tags=['Files'])
 #     return None
 
 
+# Загрузка по частям с докачкой: начать, отправить части (в любом порядке, с повторами),
+# узнать полученные части, завершить. Анализ загруженного файла: POST /api/analyzer/analyze/{file_id}
+@router.post('/uploads/', response_model=UploadSessionReadSchema, status_code=201)
+async def initiate_upload(data: UploadSessionCreateSchema,
+                          use_case: InitiateUploadUseCaseProtocol = Depends(get_initiate_upload_use_case)
+                          ) -> UploadSessionReadSchema:
+    return await use_case(data)
+
+
+@router.get('/uploads/{upload_id}', response_model=UploadSessionReadSchema)
+async def get_upload(upload_id: uuid.UUID = Path(...),
+                     use_case: GetUploadUseCaseProtocol = Depends(get_get_upload_use_case)
+                     ) -> UploadSessionReadSchema:
+    return await use_case(upload_id)
+
+
+@router.put('/uploads/{upload_id}/parts/{part_number}', response_model=UploadPartReadSchema)
+async def upload_part(request: Request,
+                      upload_id: uuid.UUID = Path(...),
+                      part_number: int = Path(..., ge=1, description="1-based chunk number"),
+                      use_case: UploadPartUseCaseProtocol = Depends(get_upload_part_use_case)
+                      ) -> UploadPartReadSchema:
+    # Тело запроса — содержимое части как есть (не multipart), не больше part_size
+    return await use_case(upload_id, part_number, await request.body())
+
+
+@router.post('/uploads/{upload_id}/complete', response_model=FileReadSchema, status_code=201)
+async def complete_upload(upload_id: uuid.UUID = Path(...),
+                          use_case: CompleteUploadUseCaseProtocol = Depends(get_complete_upload_use_case)
+                          ) -> FileReadSchema:
+    return await use_case(upload_id)
+
+
+@router.delete('/uploads/{upload_id}', response_model=None, status_code=204)
+async def abort_upload(upload_id: uuid.UUID = Path(...),
+                       use_case: AbortUploadUseCaseProtocol = Depends(get_abort_upload_use_case)
+                       ) -> None:
+    await use_case(upload_id)
+    return None
+
+
+# Прямая загрузка в хранилище: API выдаёт presigned POST, браузер отправляет файл в MinIO/S3,
+# затем загрузка подтверждается. Подтвердить и сразу запустить анализ: POST /api/analyzer/direct-uploads/{file_id}/confirm
+@router.post('/direct-uploads/', response_model=DirectUploadReadSchema, status_code=201)
+async def issue_direct_upload(data: DirectUploadCreateSchema,
+                              use_case: IssueDirectUploadUseCaseProtocol = Depends(get_issue_direct_upload_use_case)
+                              ) -> DirectUploadReadSchema:
+    return await use_case(data)
+
+
+@router.post('/direct-uploads/{file_id}/confirm', response_model=FileReadSchema, status_code=201)
+async def confirm_direct_upload(file_id: uuid.UUID = Path(...),
+                                use_case: ConfirmDirectUploadUseCaseProtocol = Depends(get_confirm_direct_upload_use_case)
+                                ) -> FileReadSchema:
+    return await use_case(file_id)
+
+
 @router.get('/{file_id}', response_model=FileReadSchema)
 async def get(file_id: uuid.UUID = Path(...), 
                            use_case: GetFileUseCaseProtocol = Depends(get_file_get_use_case)
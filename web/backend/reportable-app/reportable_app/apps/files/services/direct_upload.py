@@ -0,0 +1,99 @@
+import uuid
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Protocol
+from typing_extensions import Self
+from shared.schemas.files import FileReadSchema
+from ....core.utils.exceptions import ValidationError
+from ..repositories.uploads_cache import DirectUploadRedisRepositoryProtocol
+from ..schemas import FileCreateDBSchema, DirectUploadCreateSchema, DirectUploadDBSchema, DirectUploadReadSchema
+from .file_service import FileServiceProtocol
+from .file_managment_service import FileManagmentServiceProtocol
+
+
+logger = logging.getLogger(__name__)
+
+
+class DirectUploadServiceProtocol(Protocol):
+    async def issue(self: Self, data: DirectUploadCreateSchema, user_id: Optional[uuid.UUID] = None) -> DirectUploadReadSchema:
+        ...
+
+    async def confirm(self: Self, file_id: uuid.UUID) -> FileReadSchema:
+        ...
+
+
+class DirectUploadService(DirectUploadServiceProtocol):
+    """
+    Загрузка файла браузером напрямую в хранилище по presigned POST.
+
+    API выдаёт форму с подписанной политикой (ключ, Content-Type, размер), браузер отправляет файл
+    в MinIO/S3, после чего клиент подтверждает загрузку: объект проверяется через head_object
+    и создаётся запись File. Через API проходят только метаданные.
+    """
+
+    def __init__(self: Self,
+                 uploads: DirectUploadRedisRepositoryProtocol,
+                 file_service: FileServiceProtocol,
+                 file_managment_service: FileManagmentServiceProtocol,
+                 expires_in: int,
+                 max_size: int):
+        self.uploads = uploads
+        self.file_service = file_service
+        self.file_managment_service = file_managment_service
+        self.expires_in = expires_in
+        self.max_size = max_size
+
+    async def issue(self: Self, data: DirectUploadCreateSchema, user_id: Optional[uuid.UUID] = None) -> DirectUploadReadSchema:
+        file_id = uuid.uuid4()
+        path = self.file_managment_service.make_path(file_id, data.subdir, data.filename)
+        url, fields = await self.file_service.get_upload_form(path, data.content_type, self.max_size, self.expires_in)
+
+        # Форма хранится чуть дольше срока действия: загрузка, начатая в последний момент, должна успеть завершиться
+        await self.uploads.create_upload(DirectUploadDBSchema(
+            file_id=file_id,
+            path=path,
+            filename=data.filename,
+            content_type=data.content_type,
+            max_size=self.max_size,
+            creator_user_id=user_id,
+        ), ttl=self.expires_in * 2)
+
+        return DirectUploadReadSchema(
+            file_id=file_id,
+            url=url,
+            fields=fields,
+            max_size=self.max_size,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.expires_in),
+        )
+
+    async def confirm(self: Self, file_id: uuid.UUID) -> FileReadSchema:
+        """
+        Создаёт запись File для загруженного объекта; повторное и одновременное подтверждения
+        возвращают ту же запись. Форма удаляется только после создания записи: при сбое БД
+        подтверждение можно повторить.
+        """
+        upload = await self.uploads.get_upload(file_id)
+        if upload is None:
+            # Уже подтверждена (тогда File существует) или форма истекла
+            return await self.file_managment_service.get(file_id)
+
+        stored = await self.file_service.head(upload.path)
+        if stored is None:
+            raise ValidationError("file_id", "file is not uploaded to the storage yet")
+        if stored["size"] > upload.max_size:
+            # Политика формы не даёт загрузить больше, проверка на случай изменения настроек
+            await self.file_service.delete(upload.path)
+            raise ValidationError("file_id", f"file is larger than {upload.max_size} bytes")
+
+        created_file = await self.file_managment_service.register(FileCreateDBSchema(
+            id=file_id,
+            filename=upload.filename,
+            content_type=stored["content_type"],
+            size=stored["size"],
+            path=upload.path,
+            creator_user_id=upload.creator_user_id,
+        ))
+        # Форму удаляет первое из одновременных подтверждений, остальные получают ту же запись
+        if await self.uploads.claim(file_id):
+            logger.info(f"Direct upload {file_id} confirmed: {upload.path} ({stored['size']} bytes)")
+        return created_file
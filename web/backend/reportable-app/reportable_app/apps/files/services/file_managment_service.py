@@ -5,13 +5,13 @@ import json
 import hashlib
 import logging
 from fastapi import UploadFile
-from typing import Optional, Protocol, List
+from typing import AsyncIterable, Optional, Protocol, List
 from typing_extensions import Self
 from pathlib import Path
 from shared.schemas.files import (
     FileReadSchema, FilesListReadSchema, FileCreateSchema, FileIdsSchema
 )
-from ....core.utils.exceptions import FileNotFound
+from ....core.utils.exceptions import FileNotFound, ModelAlreadyExistsError
 from ..schemas import (
     FileUpdateSchema,
     FileCreateDBSchema, FileUpdateDBSchema,
@@ -32,6 +32,21 @@ class FileManagmentServiceProtocol(Protocol):
     async def create_from_content(self: Self, data: FileCreateSchema, content: bytes, filename: str, user_id: Optional[uuid.UUID] = None, content_type: str = "application/octet-stream") -> FileReadSchema:
         ...
 
+    async def create_from_stream(self: Self, data: FileCreateSchema, chunks: AsyncIterable[bytes], filename: Optional[str], user_id: Optional[uuid.UUID] = None, content_type: str = "application/octet-stream") -> FileReadSchema:
+        ...
+
+    async def read_content(self: Self, id: uuid.UUID) -> bytes:
+        ...
+
+    def make_path(self: Self, file_id: uuid.UUID, subdir: str, filename: Optional[str]) -> str:
+        ...
+
+    async def register(self: Self, data: FileCreateDBSchema) -> FileReadSchema:
+        ...
+
+    async def exists(self: Self, id: uuid.UUID) -> bool:
+        ...
+
     async def update(self: Self, id: uuid.UUID, data: FileUpdateSchema, file: UploadFile) -> FileReadSchema:
         ...
 
@@ -106,6 +121,62 @@ class FileManagmentService(FileManagmentServiceProtocol):
             url=uploaded_file_url
         )
     
+    async def create_from_stream(self: Self, data: FileCreateSchema, chunks: AsyncIterable[bytes], filename: Optional[str], user_id: Optional[uuid.UUID] = None, content_type: str = "application/octet-stream") -> FileReadSchema:
+        """Как create_from_content, но файл загружается в S3 потоком, не собираясь в памяти целиком"""
+        generated_id = uuid.uuid4()
+        path = self._generate_photo_path(generated_id, data.subdir, filename)
+
+        try:
+            size = await self.file_service.upload_stream(path, chunks, content_type)
+        except Exception as e:
+            logger.error(f"Failed to upload file {path}: {e}")
+            raise FileUploadError(filename or path)
+
+        return await self.register(FileCreateDBSchema(
+            id=generated_id,
+            filename=data.filename or filename or path.rsplit("/", 1)[-1],
+            content_type=content_type,
+            size=size,
+            template_name=data.template_name,
+            path=path,
+            creator_user_id=user_id
+        ))
+
+    async def read_content(self: Self, id: uuid.UUID) -> bytes:
+        """Содержимое файла из хранилища"""
+        db_file = await self._get_cached_file_data(id) or await self.file_repository.get(id)
+        return await self.file_service.download(db_file.path)
+
+    def make_path(self: Self, file_id: uuid.UUID, subdir: str, filename: Optional[str]) -> str:
+        """Путь объекта в хранилище для нового файла"""
+        return self._generate_photo_path(file_id, subdir, filename)
+
+    async def register(self: Self, data: FileCreateDBSchema) -> FileReadSchema:
+        """
+        Создаёт запись для объекта, который уже загружен в хранилище по data.path.
+        Повторная регистрация того же объекта (повтор запроса, одновременные вызовы)
+        возвращает уже созданную запись.
+        """
+        try:
+            created_file = await self.file_repository.create(data)
+        except ModelAlreadyExistsError:
+            created_file = await self.file_repository.get_or_none(data.id) if data.id else None
+            if created_file is None or created_file.path != data.path:
+                raise
+        uploaded_file_url = await self.get_file_url(created_file.path)
+
+        await self._cache_file_url(created_file.path, uploaded_file_url)
+        await self._cache_file_data(created_file.id, created_file)
+
+        return FileReadSchema(
+            **created_file.model_dump(exclude={"path"}),
+            url=uploaded_file_url
+        )
+
+    async def exists(self: Self, id: uuid.UUID) -> bool:
+        """Есть ли запись файла в БД"""
+        return await self.file_repository.get_or_none(id) is not None
+
     async def create_batch(self: Self, data_list: list[FileCreateSchema], files: list[UploadFile], user_id: Optional[uuid.UUID] = None) -> FilesListReadSchema:
         files_id = []
         files_to_upload: list[tuple[str, UploadFile]] = []
@@ -278,12 +349,11 @@ class FileManagmentService(FileManagmentServiceProtocol):
         all_files_data = db_files
         logger.debug(f"Total files to process: {len(all_files_data)} DB: {len(db_files)})")
         
-        # Параллельно получаем URL для всех файлов
+        # Получаем URL для всех файлов одной пачкой
         logger.debug(f"Generating URLs for {len(all_files_data)} files")
-        url_tasks = [self.get_file_url(db_file.path) for db_file in all_files_data]
-        
+
         try:
-            urls = await asyncio.gather(*url_tasks, return_exceptions=True)
+            urls = await self.file_service.get_urls([db_file.path for db_file in all_files_data])
             logger.debug("Successfully generated all URLs")
         except Exception as e:
             logger.error(f"Failed to generate URLs: {e}", exc_info=True)
@@ -375,18 +445,15 @@ class FileManagmentService(FileManagmentServiceProtocol):
     async def _get_cached_file_data(self: Self, file_id: uuid.UUID) -> Optional[FileReadDBSchema]:
         """Получает данные файла из кэша"""
         cache_key = self._make_file_cache_key(file_id)
-        cached_data = await self.file_repository_cache.get(cache_key)
-        
-        if cached_data:
-            try:
-                data_dict = json.loads(cached_data)
-                return FileReadDBSchema(**data_dict)
-            except (json.JSONDecodeError, Exception):
-                # Если не удалось десериализовать, удаляем из кэша
-                await self.file_repository_cache.delete(cache_key)
-                return None
-        
-        return None
+        try:
+            # Разобранная модель кэшируется в памяти процесса вместе со строкой
+            return await self.file_repository_cache.get_decoded(
+                cache_key, lambda data: FileReadDBSchema(**json.loads(data))
+            )
+        except (json.JSONDecodeError, Exception):
+            # Если не удалось десериализовать, удаляем из кэша
+            await self.file_repository_cache.delete(cache_key)
+            return None
     
     async def _get_cached_files_data(self: Self, file_ids: List[uuid.UUID]) -> List[FileReadDBSchema]:
         """Получает данные нескольких файлов из кэша"""
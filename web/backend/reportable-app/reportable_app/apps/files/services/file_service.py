@@ -2,14 +2,19 @@ import asyncio
 from fastapi import UploadFile
 from botocore.exceptions import ClientError
 import logging
-from typing import Protocol, cast
+from typing import AsyncIterable, Optional, Protocol, cast
 from typing_extensions import Self
 from types_aiobotocore_s3 import S3Client
 from ....core.clients.s3_client import S3ClientFactory
+from ....core.clients.s3_signer import S3UrlSigner
+from ....core.metrics import S3_OPERATION_DURATION, observe_duration
 
 
 logger = logging.getLogger(__name__)
 
+# Bucket'ы, существование которых уже проверено в этом процессе
+_checked_buckets: set[str] = set()
+
 
 class FileServiceProtocol(Protocol):
     async def upload(self: Self, path: str, file: UploadFile) -> bool:
@@ -17,6 +22,9 @@ class FileServiceProtocol(Protocol):
     
     async def get_url(self: Self, path: str) -> str:
          ...
+
+    async def get_urls(self: Self, paths: list[str]) -> list[str]:
+        ...
     
     async def delete(self: Self, path: str) -> bool:
          ...
@@ -30,32 +38,63 @@ class FileServiceProtocol(Protocol):
     async def upload_batch(self: Self, files: list[tuple[str, UploadFile]]) -> list[bool]:
         ...
 
+    async def upload_stream(self: Self, path: str, chunks: AsyncIterable[bytes], content_type: str = "application/octet-stream") -> int:
+        ...
+
+    async def download(self: Self, path: str) -> bytes:
+        ...
+
+    async def create_multipart_upload(self: Self, path: str, content_type: str = "application/octet-stream") -> str:
+        ...
+
+    async def upload_part(self: Self, path: str, upload_id: str, part_number: int, body: bytes) -> str:
+        ...
+
+    async def complete_multipart_upload(self: Self, path: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        ...
+
+    async def abort_multipart_upload(self: Self, path: str, upload_id: str) -> None:
+        ...
+
+    async def get_upload_form(self: Self, path: str, content_type: str, max_size: int, expires_in: int = 3600) -> tuple[str, dict[str, str]]:
+        ...
+
+    async def head(self: Self, path: str) -> Optional[dict]:
+        ...
+
 
 class S3FileService(FileServiceProtocol):
-    def __init__(self: Self, client_factory: S3ClientFactory, bucket_name: str, real_url: str, url_to_change: str):
+    def __init__(self: Self, client_factory: S3ClientFactory, bucket_name: str, real_url: str, url_to_change: str,
+                 multipart_part_size: int = 8 * 1024 * 1024, multipart_concurrency: int = 4,
+                 url_signer: Optional[S3UrlSigner] = None, url_expires_in: int = 1800):
         self.client_factory = client_factory
         self.bucket_name = bucket_name
         self.real_url = real_url
         self.url_to_change = url_to_change
-        self._bucket_checked = False
+        self.multipart_part_size = multipart_part_size
+        self.multipart_concurrency = multipart_concurrency
+        # Если задан, ссылки на скачивание подписываются локально, без клиента S3
+        self.url_signer = url_signer
+        self.url_expires_in = url_expires_in
 
     async def _ensure_bucket_exists(self) -> None:
-        """Ленивая проверка и создание bucket'а"""
-        if self._bucket_checked:
+        """Ленивая проверка и создание bucket'а (один раз на процесс)"""
+        if self.bucket_name in _checked_buckets:
             return
             
         try:
-            async with self.client_factory.get_client() as client:
-                s3_client = cast(S3Client, client)
-                try:
-                    await s3_client.head_bucket(Bucket=self.bucket_name)
-                except ClientError as e:
-                    if e.response['Error']['Code'] == '404':
-                        await s3_client.create_bucket(Bucket=self.bucket_name)
-                        logger.info(f"Bucket {self.bucket_name} created")
-                    else:
-                        raise
-            self._bucket_checked = True
+            with observe_duration(S3_OPERATION_DURATION, operation="ensure_bucket"):
+                async with self.client_factory.get_client() as client:
+                    s3_client = cast(S3Client, client)
+                    try:
+                        await s3_client.head_bucket(Bucket=self.bucket_name)
+                    except ClientError as e:
+                        if e.response['Error']['Code'] == '404':
+                            await s3_client.create_bucket(Bucket=self.bucket_name)
+                            logger.info(f"Bucket {self.bucket_name} created")
+                        else:
+                            raise
+            _checked_buckets.add(self.bucket_name)
         except Exception as e:
             logger.error(f"Failed to ensure bucket exists: {e}")
             raise
@@ -80,14 +119,15 @@ class S3FileService(FileServiceProtocol):
 
     async def _upload_content(self: Self, path: str, content: bytes, content_type: str = "application/octet-stream") -> bool:
         try:
-            async with self.client_factory.get_client() as client:
-                s3_client = cast(S3Client, client)
-                await s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=path,
-                    Body=content,
-                    ContentType=content_type
-                )
+            with observe_duration(S3_OPERATION_DURATION, operation="put_object"):
+                async with self.client_factory.get_client() as client:
+                    s3_client = cast(S3Client, client)
+                    await s3_client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=path,
+                        Body=content,
+                        ContentType=content_type
+                    )
             logger.info(f"File uploaded successfully: {path}")
             return True
         except Exception as e:
@@ -123,18 +163,179 @@ class S3FileService(FileServiceProtocol):
         
         return processed_results
 
+    async def upload_stream(self: Self, path: str, chunks: AsyncIterable[bytes], content_type: str = "application/octet-stream") -> int:
+        """
+        Потоковая загрузка через S3 multipart upload: куски накапливаются до multipart_part_size
+        и отправляются частями, не более multipart_concurrency частей одновременно. Пока все слоты
+        заняты, чтение входного потока приостанавливается, поэтому в памяти не больше
+        multipart_concurrency + 2 частей (отправляемые, готовая к отправке и накапливаемая)
+        независимо от размера файла.
+        Файл меньше одной части загружается обычным put_object.
 
-    async def upload_html(self: Self, path: str, html_text: str) -> bool:
+        Returns:
+            Размер загруженного файла в байтах. При ошибке загрузка отменяется (abort) и исключение пробрасывается.
+        """
         await self._ensure_bucket_exists()
+        part_size = self.multipart_part_size
+        slots = asyncio.Semaphore(self.multipart_concurrency)
+        parts: list[asyncio.Task] = []
+        buffer = bytearray()
+        upload_id = None
+        size = 0
+
+        async def upload_part(number: int, body: bytes) -> tuple[int, str]:
+            try:
+                return number, await self.upload_part(path, upload_id, number, body)
+            finally:
+                slots.release()
+
+        async def send_part(body: bytes) -> None:
+            await slots.acquire()
+            # Ошибка уже завершившейся части прерывает загрузку, не дожидаясь конца потока
+            for task in parts:
+                if task.done():
+                    task.result()
+            parts.append(asyncio.create_task(upload_part(len(parts) + 1, body)))
+
         try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        upload_id = await self.create_multipart_upload(path, content_type)
+                    await send_part(bytes(buffer[:part_size]))
+                    del buffer[:part_size]
+
+            if upload_id is None:
+                with observe_duration(S3_OPERATION_DURATION, operation="put_object"):
+                    async with self.client_factory.get_client() as client:
+                        s3_client = cast(S3Client, client)
+                        await s3_client.put_object(
+                            Bucket=self.bucket_name, Key=path, Body=bytes(buffer), ContentType=content_type
+                        )
+            else:
+                if buffer:
+                    await send_part(bytes(buffer))
+                    buffer.clear()
+                await self.complete_multipart_upload(path, upload_id, list(await asyncio.gather(*parts)))
+        except BaseException:
+            for task in parts:
+                task.cancel()
+            await asyncio.gather(*parts, return_exceptions=True)
+            if upload_id is not None:
+                try:
+                    await self.abort_multipart_upload(path, upload_id)
+                except Exception as e:
+                    logger.warning(f"Failed to abort multipart upload {path}: {e}")
+            raise
+
+        logger.info(f"File uploaded successfully: {path} ({size} bytes, {len(parts) or 1} parts)")
+        return size
+
+    async def create_multipart_upload(self: Self, path: str, content_type: str = "application/octet-stream") -> str:
+        """Начинает multipart upload, возвращает его UploadId"""
+        await self._ensure_bucket_exists()
+        with observe_duration(S3_OPERATION_DURATION, operation="create_multipart_upload"):
+            async with self.client_factory.get_client() as client:
+                s3_client = cast(S3Client, client)
+                response = await s3_client.create_multipart_upload(
+                    Bucket=self.bucket_name, Key=path, ContentType=content_type
+                )
+        return response["UploadId"]
+
+    async def upload_part(self: Self, path: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """Загружает часть (повторная загрузка с тем же номером заменяет её), возвращает ETag"""
+        with observe_duration(S3_OPERATION_DURATION, operation="upload_part"):
+            async with self.client_factory.get_client() as client:
+                s3_client = cast(S3Client, client)
+                response = await s3_client.upload_part(
+                    Bucket=self.bucket_name, Key=path, UploadId=upload_id, PartNumber=part_number, Body=body
+                )
+        return response["ETag"]
+
+    async def complete_multipart_upload(self: Self, path: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        """Собирает объект из частей: parts — пары (номер части, ETag)"""
+        with observe_duration(S3_OPERATION_DURATION, operation="complete_multipart_upload"):
+            async with self.client_factory.get_client() as client:
+                s3_client = cast(S3Client, client)
+                await s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name, Key=path, UploadId=upload_id,
+                    MultipartUpload={"Parts": [
+                        {"PartNumber": number, "ETag": etag} for number, etag in sorted(parts)
+                    ]},
+                )
+
+    async def abort_multipart_upload(self: Self, path: str, upload_id: str) -> None:
+        """Отменяет multipart upload, загруженные части удаляются хранилищем"""
+        with observe_duration(S3_OPERATION_DURATION, operation="abort_multipart_upload"):
             async with self.client_factory.get_client() as client:
                 s3_client = cast(S3Client, client)
-                await s3_client.put_object(
+                await s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=path, UploadId=upload_id)
+
+    async def download(self: Self, path: str) -> bytes:
+        await self._ensure_bucket_exists()
+        with observe_duration(S3_OPERATION_DURATION, operation="get_object"):
+            async with self.client_factory.get_client() as client:
+                s3_client = cast(S3Client, client)
+                response = await s3_client.get_object(Bucket=self.bucket_name, Key=path)
+                async with response["Body"] as body:
+                    return await body.read()
+
+
+    async def get_upload_form(self: Self, path: str, content_type: str, max_size: int, expires_in: int = 3600) -> tuple[str, dict[str, str]]:
+        """
+        Presigned POST для загрузки файла браузером напрямую в хранилище, минуя API.
+        Политика ограничивает ключ, Content-Type и размер (1..max_size байт).
+
+        Returns:
+            URL формы (с хостом url_to_change) и поля, которые нужно отправить вместе с файлом.
+        """
+        await self._ensure_bucket_exists()
+        with observe_duration(S3_OPERATION_DURATION, operation="presign_post"):
+            async with self.client_factory.get_client() as client:
+                s3_client = cast(S3Client, client)
+                form = await s3_client.generate_presigned_post(
                     Bucket=self.bucket_name,
                     Key=path,
-                    Body=html_text.encode("utf-8"),
-                    ContentType="text/html; charset=utf-8"
+                    Fields={"Content-Type": content_type},
+                    Conditions=[
+                        {"Content-Type": content_type},
+                        ["content-length-range", 1, max_size],
+                    ],
+                    ExpiresIn=expires_in,
                 )
+        # Хост не входит в подпись политики POST, поэтому его можно подменить, как в get_url
+        return form["url"].replace(self.real_url, self.url_to_change), form["fields"]
+
+    async def head(self: Self, path: str) -> Optional[dict]:
+        """Размер и Content-Type объекта или None, если объекта нет"""
+        with observe_duration(S3_OPERATION_DURATION, operation="head_object"):
+            async with self.client_factory.get_client() as client:
+                s3_client = cast(S3Client, client)
+                try:
+                    response = await s3_client.head_object(Bucket=self.bucket_name, Key=path)
+                except ClientError as e:
+                    if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                        return None
+                    raise
+        return {
+            "size": response["ContentLength"],
+            "content_type": response.get("ContentType") or "application/octet-stream",
+        }
+
+    async def upload_html(self: Self, path: str, html_text: str) -> bool:
+        await self._ensure_bucket_exists()
+        try:
+            with observe_duration(S3_OPERATION_DURATION, operation="put_object"):
+                async with self.client_factory.get_client() as client:
+                    s3_client = cast(S3Client, client)
+                    await s3_client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=path,
+                        Body=html_text.encode("utf-8"),
+                        ContentType="text/html; charset=utf-8"
+                    )
             logger.info(f"HTML file uploaded successfully: {path}")
             return True
         except Exception as e:
@@ -142,18 +343,29 @@ class S3FileService(FileServiceProtocol):
             return False
 
     async def get_url(self: Self, path: str) -> str:
-        # TODO: Redis чтобы каждый раз не генерировать новую ссылку
+        return (await self.get_urls([path]))[0]
+
+    async def get_urls(self: Self, paths: list[str]) -> list[str]:
+        """Presigned-ссылки на скачивание; при локальной подписи вся пачка подписывается одним вызовом"""
+        if self.url_signer is None:
+            return list(await asyncio.gather(*[self._presign_with_client(path) for path in paths]))
+
+        with observe_duration(S3_OPERATION_DURATION, operation="presign_get_local"):
+            urls = self.url_signer.sign_many(self.bucket_name, paths, self.url_expires_in)
+        return [url.replace(self.real_url, self.url_to_change) for url in urls]
+
+    async def _presign_with_client(self: Self, path: str) -> str:
         await self._ensure_bucket_exists()
         try:
-            async with self.client_factory.get_client() as client:
-                s3_client = cast(S3Client, client)
+            with observe_duration(S3_OPERATION_DURATION, operation="presign_get"):
+                async with self.client_factory.get_client() as client:
+                    s3_client = cast(S3Client, client)
 
-                # Генерируем presigned URL на 30 минут
-                url = await s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={'Bucket': self.bucket_name, 'Key': path},
-                    ExpiresIn=1800  # 30 минут
-                )
+                    url = await s3_client.generate_presigned_url(
+                        'get_object',
+                        Params={'Bucket': self.bucket_name, 'Key': path},
+                        ExpiresIn=self.url_expires_in
+                    )
             
             new_url = url.replace(
                 self.real_url, 
@@ -168,27 +380,27 @@ class S3FileService(FileServiceProtocol):
     async def delete(self: Self, path: str) -> bool:
         await self._ensure_bucket_exists()
         try:
-            async with self.client_factory.get_client() as client:
-                s3_client = cast(S3Client, client)
+            with observe_duration(S3_OPERATION_DURATION, operation="delete_object"):
+                async with self.client_factory.get_client() as client:
+                    s3_client = cast(S3Client, client)
 
-                
-                # Проверяем существование объекта
-                try:
-                    await s3_client.head_object(
+                    # Проверяем существование объекта
+                    try:
+                        await s3_client.head_object(
+                            Bucket=self.bucket_name,
+                            Key=path
+                        )
+                    except ClientError as e:
+                        if e.response['Error']['Code'] == '404':
+                            logger.warning(f"File not found for deletion: {path}")
+                            return False
+                        raise
+
+                    # Удаляем объект
+                    await s3_client.delete_object(
                         Bucket=self.bucket_name,
                         Key=path
                     )
-                except ClientError as e:
-                    if e.response['Error']['Code'] == '404':
-                        logger.warning(f"File not found for deletion: {path}")
-                        return False
-                    raise
-                
-                # Удаляем объект
-                await s3_client.delete_object(
-                    Bucket=self.bucket_name,
-                    Key=path
-                )
                 
             logger.info(f"File deleted successfully: {path}")
             return True
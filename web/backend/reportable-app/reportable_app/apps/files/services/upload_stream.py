@@ -0,0 +1,114 @@
+import hashlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+from typing_extensions import Self
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+@dataclass
+class UploadStream:
+    """
+    Файл из multipart-запроса, который читается кусками по мере прихода тела запроса.
+    chunks можно пройти только один раз.
+    """
+    filename: Optional[str]
+    content_type: str
+    chunks: AsyncIterator[bytes]
+
+
+class DigestingStream:
+    """Пропускает куски через себя, попутно считая размер и SHA-256"""
+
+    def __init__(self: Self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def __aiter__(self: Self) -> AsyncIterator[bytes]:
+        return self._iterate()
+
+    async def _iterate(self: Self) -> AsyncIterator[bytes]:
+        async for chunk in self._chunks:
+            self._hash.update(chunk)
+            self.size += len(chunk)
+            yield chunk
+
+    @property
+    def sha256(self: Self) -> str:
+        return self._hash.hexdigest()
+
+
+async def open_multipart_file(request: Request, field_name: str = "file") -> Optional[UploadStream]:
+    """
+    Находит в теле multipart/form-data поле field_name и возвращает его содержимое потоком.
+    В отличие от request.form() файл не складывается во временный файл и не читается целиком:
+    в памяти держится только текущий кусок тела запроса.
+    Возвращает None, если запрос не multipart или поля нет.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        return None
+
+    events = _multipart_events(request, boundary)
+    headers: dict[bytes, bytes] = {}
+    async for kind, value in events:
+        if kind == "part_begin":
+            headers = {}
+        elif kind == "header":
+            name, header_value = value
+            headers[name.lower()] = header_value
+        elif kind == "headers_finished":
+            _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+            if disposition.get(b"name", b"").decode() != field_name:
+                continue
+            filename = disposition.get(b"filename")
+            return UploadStream(
+                filename=filename.decode() if filename is not None else None,
+                content_type=headers.get(b"content-type", b"application/octet-stream").decode(),
+                chunks=_part_data(events),
+            )
+    return None
+
+
+async def _part_data(events: AsyncIterator[tuple[str, object]]) -> AsyncIterator[bytes]:
+    async for kind, value in events:
+        if kind == "data":
+            yield value
+        elif kind == "part_end":
+            return
+
+
+async def _multipart_events(request: Request, boundary: bytes) -> AsyncIterator[tuple[str, object]]:
+    """
+    События парсера python-multipart: парсер вызывает колбэки синхронно на каждый кусок тела,
+    события копятся в списке и отдаются после разбора куска.
+    """
+    pending: list[tuple[str, object]] = []
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_header_end() -> None:
+        pending.append(("header", (bytes(header_field), bytes(header_value))))
+        header_field.clear()
+        header_value.clear()
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": lambda: pending.append(("part_begin", None)),
+        "on_part_data": lambda data, start, end: pending.append(("data", data[start:end])),
+        "on_part_end": lambda: pending.append(("part_end", None)),
+        "on_header_field": lambda data, start, end: header_field.extend(data[start:end]),
+        "on_header_value": lambda data, start, end: header_value.extend(data[start:end]),
+        "on_header_end": on_header_end,
+        "on_headers_finished": lambda: pending.append(("headers_finished", None)),
+    })
+
+    async for chunk in request.stream():
+        parser.write(chunk)
+        events, pending[:] = list(pending), []
+        for event in events:
+            yield event
+    parser.finalize()
+    for event in pending:
+        yield event
@@ -0,0 +1,19 @@
+import uuid
+from typing_extensions import Self
+from ....core.use_cases import UseCaseProtocol
+from ..services.resumable_upload import ResumableUploadServiceProtocol
+
+
+class AbortUploadUseCaseProtocol(UseCaseProtocol[None]):
+
+    async def __call__(self: Self, upload_id: uuid.UUID) -> None:
+        ...
+
+
+class AbortUploadUseCase(AbortUploadUseCaseProtocol):
+
+    def __init__(self: Self, resumable_upload_service: ResumableUploadServiceProtocol):
+        self.resumable_upload_service = resumable_upload_service
+
+    async def __call__(self: Self, upload_id: uuid.UUID) -> None:
+        return await self.resumable_upload_service.abort(upload_id)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import uuid
+from typing_extensions import Self
+from shared.schemas.files import FileReadSchema
+from ....core.use_cases import UseCaseProtocol
+from ..services.resumable_upload import ResumableUploadServiceProtocol
+
+
+class CompleteUploadUseCaseProtocol(UseCaseProtocol[FileReadSchema]):
+
+    async def __call__(self: Self, upload_id: uuid.UUID) -> FileReadSchema:
+        ...
+
+
+class CompleteUploadUseCase(CompleteUploadUseCaseProtocol):
+
+    def __init__(self: Self, resumable_upload_service: ResumableUploadServiceProtocol):
+        self.resumable_upload_service = resumable_upload_service
+
+    async def __call__(self: Self, upload_id: uuid.UUID) -> FileReadSchema:
+        return await self.resumable_upload_service.complete(upload_id)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import uuid
+from typing_extensions import Self
+from shared.schemas.files import FileReadSchema
+from ....core.use_cases import UseCaseProtocol
+from ..services.direct_upload import DirectUploadServiceProtocol
+
+
+class ConfirmDirectUploadUseCaseProtocol(UseCaseProtocol[FileReadSchema]):
+
+    async def __call__(self: Self, file_id: uuid.UUID) -> FileReadSchema:
+        ...
+
+
+class ConfirmDirectUploadUseCase(ConfirmDirectUploadUseCaseProtocol):
+
+    def __init__(self: Self, direct_upload_service: DirectUploadServiceProtocol):
+        self.direct_upload_service = direct_upload_service
+
+    async def __call__(self: Self, file_id: uuid.UUID) -> FileReadSchema:
+        return await self.direct_upload_service.confirm(file_id)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import uuid
+from typing_extensions import Self
+from ..schemas import UploadSessionReadSchema
+from ....core.use_cases import UseCaseProtocol
+from ..services.resumable_upload import ResumableUploadServiceProtocol
+
+
+class GetUploadUseCaseProtocol(UseCaseProtocol[UploadSessionReadSchema]):
+
+    async def __call__(self: Self, upload_id: uuid.UUID) -> UploadSessionReadSchema:
+        ...
+
+
+class GetUploadUseCase(GetUploadUseCaseProtocol):
+
+    def __init__(self: Self, resumable_upload_service: ResumableUploadServiceProtocol):
+        self.resumable_upload_service = resumable_upload_service
+
+    async def __call__(self: Self, upload_id: uuid.UUID) -> UploadSessionReadSchema:
+        return await self.resumable_upload_service.get_status(upload_id)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from typing_extensions import Self
+from ..schemas import DirectUploadCreateSchema, DirectUploadReadSchema
+from ....core.use_cases import UseCaseProtocol
+from ..services.direct_upload import DirectUploadServiceProtocol
+
+
+class IssueDirectUploadUseCaseProtocol(UseCaseProtocol[DirectUploadReadSchema]):
+
+    async def __call__(self: Self, data: DirectUploadCreateSchema) -> DirectUploadReadSchema:
+        ...
+
+
+class IssueDirectUploadUseCase(IssueDirectUploadUseCaseProtocol):
+
+    def __init__(self: Self, direct_upload_service: DirectUploadServiceProtocol):
+        self.direct_upload_service = direct_upload_service
+
+    async def __call__(self: Self, data: DirectUploadCreateSchema) -> DirectUploadReadSchema:
+        return await self.direct_upload_service.issue(data)
\ No newline at end of file
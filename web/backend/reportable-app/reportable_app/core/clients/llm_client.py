@@ -0,0 +1,48 @@
+import httpx
+import logging
+from typing import Optional
+from openai import AsyncOpenAI
+from ...settings import settings
+from ..utils.telemetry import record_response_headers
+
+logger = logging.getLogger(__name__)
+
+# Глобальный экземпляр клиента: один пул соединений (keep-alive, TLS) на процесс
+_llm_client: Optional[AsyncOpenAI] = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Создает и возвращает клиент LLM"""
+    global _llm_client
+
+    if _llm_client is not None:
+        return _llm_client
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm.max_connections,
+            max_keepalive_connections=settings.llm.max_keepalive_connections,
+            keepalive_expiry=settings.llm.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.llm.request_timeout, connect=settings.llm.connect_timeout),
+        # TTFB запроса к LLM для телеметрии анализа
+        event_hooks={"response": [record_response_headers]},
+    )
+    # Повторы выполняет AdaptiveLLMLimiter, поэтому встроенные повторы клиента отключены
+    _llm_client = AsyncOpenAI(
+        api_key=settings.llm.api_key,
+        base_url=settings.llm.base_url,
+        max_retries=0,
+        http_client=http_client,
+    )
+    logger.info(f"LLM client created: {settings.llm.base_url}, max {settings.llm.max_connections} connections")
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Закрывает клиент LLM вместе с пулом соединений"""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
+        logger.info("LLM client closed")
@@ -1,34 +1,114 @@
+import asyncio
+import logging
 import aioboto3
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from aiobotocore.config import AioConfig
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncGenerator, Optional
 from typing_extensions import Self
 from types_aiobotocore_s3 import S3Client
+from ...settings import settings
+
+logger = logging.getLogger(__name__)
+
 
 class S3ClientFactory:
+    """
+    Долгоживущий клиент S3 с общим пулом соединений.
+
+    Клиент создаётся один раз (в lifespan приложения или при первом обращении) и отдаётся
+    всем операциям через get_client; закрывается в close. Так каждая операция не платит
+    за создание клиента и новое соединение.
+    """
+
     def __init__(
         self: Self,
         endpoint_url: str,
         aws_access_key_id: str,
         aws_secret_access_key: str,
-        region_name: str = "us-east-1"
+        region_name: str = "us-east-1",
+        max_pool_connections: int = 50,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
     ):
         self._endpoint_url = endpoint_url
         self._aws_access_key_id = aws_access_key_id
         self._aws_secret_access_key = aws_secret_access_key
         self._region_name = region_name
+        self._config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
         self._session = aioboto3.Session()
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client: Optional[S3Client] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self: Self) -> S3Client:
+        async with self._lock:
+            if self._client is None:
+                exit_stack = AsyncExitStack()
+                self._client = await exit_stack.enter_async_context(
+                    self._session.client(
+                        "s3",
+                        endpoint_url=self._endpoint_url,
+                        aws_access_key_id=self._aws_access_key_id,
+                        aws_secret_access_key=self._aws_secret_access_key,
+                        region_name=self._region_name,
+                        config=self._config,
+                    )
+                )
+                self._exit_stack = exit_stack
+                logger.info(
+                    f"S3 client created: {self._endpoint_url}, max {self._config.max_pool_connections} connections"
+                )
+        return self._client
+
+    async def close(self: Self) -> None:
+        async with self._lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+                self._exit_stack = None
+                self._client = None
+                logger.info("S3 client closed")
 
     @asynccontextmanager
     async def get_client(self: Self) -> AsyncGenerator[S3Client, None]:
-        client = self._session.client(
-            "s3",
-            endpoint_url=self._endpoint_url,
-            aws_access_key_id=self._aws_access_key_id,
-            aws_secret_access_key=self._aws_secret_access_key,
-            region_name=self._region_name
+        """Общий клиент; по выходе из блока не закрывается"""
+        yield self._client or await self.start()
+
+
+# Глобальный экземпляр клиента: один пул соединений на процесс
+_s3_client_factory: Optional[S3ClientFactory] = None
+
+
+def get_s3_client_factory() -> S3ClientFactory:
+    """Возвращает общий клиент S3 (создаётся при первом обращении)"""
+    global _s3_client_factory
+
+    if _s3_client_factory is None:
+        _s3_client_factory = S3ClientFactory(
+            endpoint_url=settings.minio.endpoint,
+            aws_access_key_id=settings.minio.access_key,
+            aws_secret_access_key=settings.minio.secret_key,
+            region_name=settings.minio.region,
+            max_pool_connections=settings.minio.max_pool_connections,
+            connect_timeout=settings.minio.connect_timeout,
+            read_timeout=settings.minio.read_timeout,
         )
-        try:
-            async with client as c:
-                yield c
-        except Exception:
-            raise
\ No newline at end of file
+    return _s3_client_factory
+
+
+async def start_s3_client() -> S3ClientFactory:
+    """Создаёт общий клиент S3 вместе с пулом соединений"""
+    factory = get_s3_client_factory()
+    await factory.start()
+    return factory
+
+
+async def close_s3_client() -> None:
+    """Закрывает общий клиент S3"""
+    global _s3_client_factory
+    if _s3_client_factory is not None:
+        await _s3_client_factory.close()
+        _s3_client_factory = None
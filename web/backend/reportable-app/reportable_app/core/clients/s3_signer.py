@@ -0,0 +1,116 @@
+import hmac
+import time
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from urllib.parse import quote, urlsplit
+from typing_extensions import Self
+from ...settings import settings
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+class S3UrlSigner:
+    """
+    Локальная подпись presigned GET-ссылок S3 (SigV4, query-параметры, path-style, как у MinIO).
+
+    Подпись — чистое вычисление: клиент S3 и сеть не нужны. Ключ подписи зависит только от даты,
+    региона и секрета, поэтому вычисляется раз в сутки и кэшируется.
+
+    time_bucket > 0 округляет время подписи вниз до начала окна: в пределах окна все реплики
+    отдают одинаковую ссылку на объект, и браузер может кэшировать файл по URL. Срок действия
+    продлевается на длину окна, чтобы ссылка жила не меньше expires_in с момента выдачи.
+    """
+
+    ALGORITHM = "AWS4-HMAC-SHA256"
+    # Ограничение S3 на срок действия presigned-ссылки
+    MAX_EXPIRES = 7 * 24 * 60 * 60
+
+    def __init__(
+        self: Self,
+        endpoint_url: str,
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        region_name: str = "us-east-1",
+        time_bucket: int = 0,
+    ):
+        parts = urlsplit(endpoint_url)
+        self._base_url = f"{parts.scheme}://{parts.netloc}"
+        self._host = parts.netloc
+        self._access_key = aws_access_key_id
+        self._secret_key = aws_secret_access_key
+        self._region = region_name
+        self.time_bucket = time_bucket
+        self._signing_keys: dict[str, bytes] = {}
+
+    def sign(self: Self, bucket: str, key: str, expires_in: int = 1800, now: Optional[float] = None) -> str:
+        return self.sign_many(bucket, [key], expires_in, now)[0]
+
+    def sign_many(self: Self, bucket: str, keys: Iterable[str], expires_in: int = 1800, now: Optional[float] = None) -> list[str]:
+        """Подписывает ссылки на объекты bucket'а; время и ключ подписи общие для всей пачки"""
+        now = time.time() if now is None else now
+        if self.time_bucket > 0:
+            signed_at = int(now - now % self.time_bucket)
+            expires_in += self.time_bucket
+        else:
+            signed_at = int(now)
+        expires_in = min(int(expires_in), self.MAX_EXPIRES)
+
+        moment = datetime.fromtimestamp(signed_at, timezone.utc)
+        amz_date = moment.strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        scope = f"{date}/{self._region}/s3/aws4_request"
+        signing_key = self._signing_key(date)
+
+        # Параметры уже в порядке сортировки, значения не требуют кодирования, кроме credential
+        query = (
+            f"X-Amz-Algorithm={self.ALGORITHM}"
+            f"&X-Amz-Credential={quote(f'{self._access_key}/{scope}', safe='-_.~')}"
+            f"&X-Amz-Date={amz_date}"
+            f"&X-Amz-Expires={expires_in}"
+            f"&X-Amz-SignedHeaders=host"
+        )
+        request_tail = f"\n{query}\nhost:{self._host}\n\nhost\nUNSIGNED-PAYLOAD"
+        string_to_sign_head = f"{self.ALGORITHM}\n{amz_date}\n{scope}\n"
+
+        urls = []
+        for key in keys:
+            path = f"/{bucket}/{quote(key, safe='/~')}"
+            canonical_request = f"GET\n{path}{request_tail}"
+            string_to_sign = string_to_sign_head + hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+            signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+            urls.append(f"{self._base_url}{path}?{query}&X-Amz-Signature={signature}")
+        return urls
+
+    def _signing_key(self: Self, date: str) -> bytes:
+        signing_key = self._signing_keys.get(date)
+        if signing_key is None:
+            signing_key = _hmac(f"AWS4{self._secret_key}".encode("utf-8"), date)
+            for part in (self._region, "s3", "aws4_request"):
+                signing_key = _hmac(signing_key, part)
+            # Нужны ключи только текущих суток (и соседних — около полуночи)
+            if len(self._signing_keys) > 2:
+                self._signing_keys.clear()
+            self._signing_keys[date] = signing_key
+        return signing_key
+
+
+# Глобальный экземпляр: кэш ключей подписи общий для процесса
+_s3_url_signer: Optional[S3UrlSigner] = None
+
+
+def get_s3_url_signer() -> S3UrlSigner:
+    """Возвращает общий объект подписи ссылок S3"""
+    global _s3_url_signer
+
+    if _s3_url_signer is None:
+        _s3_url_signer = S3UrlSigner(
+            endpoint_url=settings.minio.endpoint,
+            aws_access_key_id=settings.minio.access_key,
+            aws_secret_access_key=settings.minio.secret_key,
+            region_name=settings.minio.region,
+            time_bucket=settings.minio.url_time_bucket,
+        )
+    return _s3_url_signer
@@ -1,3 +1,4 @@
+import time
 from typing import Annotated, AsyncGenerator
 from uuid import uuid4, UUID
 from fastapi import Depends
@@ -5,7 +6,9 @@ from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..settings import settings
+from .metrics import DB_POOL_CHECKOUT_WAIT
 
 __all__ = (
     'Base',
@@ -24,10 +27,22 @@ POSTGRES_INDEXES_NAMING_CONVENTION = {
 
 metadata = MetaData(naming_convention=POSTGRES_INDEXES_NAMING_CONVENTION)
 
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который замеряет ожидание свободного соединения (включая открытие нового)"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
 asyncio_engine = create_async_engine(
     settings.db.dsn,
     connect_args={'options': f'-csearch_path={settings.db.scheme}'},
-    echo=settings.debug
+    echo=settings.debug,
+    poolclass=InstrumentedAsyncQueuePool,
 )
 
 AsyncSessionFactory = async_sessionmaker(
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class AnalysisStatus(str, Enum):
+    """
+    Статус задачи анализа файла.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
@@ -4,6 +4,7 @@ from abc import ABC
 import json
 from typing import TypeVar, Generic
 from typing_extensions import Self
+from ..metrics import record_cache_lookup
 
 T = TypeVar('T')  # Тип данных для сериализации
 
@@ -34,7 +35,10 @@ class BaseRedisRepository(ABC, Generic[T]):
         result = await self.redis_client.get(redis_key)
         
         if result is None:
+            record_cache_lookup(self.prefix, hits=0, misses=1)
             return None
+
+        record_cache_lookup(self.prefix, hits=1, misses=0)
             
         return self._deserialize(result)
     
@@ -78,6 +82,8 @@ class BaseRedisRepository(ABC, Generic[T]):
         """Получает несколько значений"""
         redis_keys = [self._make_key(key) for key in keys]
         results = await self.redis_client.mget(redis_keys)
+        hits = sum(1 for result in results if result)
+        record_cache_lookup(self.prefix, hits=hits, misses=len(results) - hits)
         
         return {
             key: self._deserialize(result) if result else None
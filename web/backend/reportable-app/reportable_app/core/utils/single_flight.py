@@ -0,0 +1,47 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+from typing_extensions import Self
+
+T = TypeVar('T')
+
+
+class SingleFlight(Generic[T]):
+    """
+    Объединяет одновременные вызовы с одинаковым ключом в один.
+    Первый вызов выполняет функцию, остальные ждут его результат.
+    """
+
+    def __init__(self: Self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self: Self) -> int:
+        return len(self._calls)
+
+    async def do(self: Self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменили первый вызов, а не нас — пробуем выполнить сами
+                if future.cancelled():
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Помечаем исключение как полученное, даже если никто не ждал результат
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
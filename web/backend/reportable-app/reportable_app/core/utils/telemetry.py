@@ -0,0 +1,145 @@
+import time
+import httpx
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from typing_extensions import Self
+
+
+@dataclass
+class LLMCallTrace:
+    """Один запрос к LLM: по каким отчётам, к какой модели, сколько ждал слота, повторы, TTFB и токены"""
+    reports: list[str]
+    model: str = ""
+    queue_wait: float = 0.0
+    retries: int = 0
+    ttfb: Optional[float] = None
+    duration: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def to_dict(self: Self) -> dict:
+        return {
+            "reports": self.reports,
+            "model": self.model,
+            "queue_wait": round(self.queue_wait, 4),
+            "retries": self.retries,
+            "ttfb": round(self.ttfb, 4) if self.ttfb is not None else None,
+            "duration": round(self.duration, 4),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+@dataclass
+class LLMAttempt:
+    """
+    Одна попытка запроса к LLM. У запроса их может быть несколько (повторы, дублирующий запрос),
+    и идут они параллельно, поэтому начало и TTFB хранятся отдельно для каждой попытки.
+    """
+    started: float = field(default_factory=time.monotonic)
+    ttfb: Optional[float] = None
+
+
+@dataclass
+class AnalysisTrace:
+    """
+    Разбивка времени анализа по стадиям (секунды, повторные замеры одной стадии суммируются)
+    и список запросов к LLM.
+    """
+    stages: dict[str, float] = field(default_factory=dict)
+    llm_calls: list[LLMCallTrace] = field(default_factory=list)
+    cache_hits: int = 0
+
+    def add_stage(self: Self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self: Self, stage: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_stage(stage, time.monotonic() - started)
+
+
+_analysis_trace: ContextVar[Optional[AnalysisTrace]] = ContextVar("analysis_trace", default=None)
+_llm_call: ContextVar[Optional[LLMCallTrace]] = ContextVar("llm_call", default=None)
+_llm_attempt: ContextVar[Optional[LLMAttempt]] = ContextVar("llm_attempt", default=None)
+
+
+def current_trace() -> Optional[AnalysisTrace]:
+    return _analysis_trace.get()
+
+
+def current_llm_call() -> Optional[LLMCallTrace]:
+    return _llm_call.get()
+
+
+@contextmanager
+def use_trace(trace: AnalysisTrace) -> Iterator[AnalysisTrace]:
+    """Делает trace текущим: задачи, созданные внутри, наследуют его вместе с контекстом"""
+    token = _analysis_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _analysis_trace.reset(token)
+
+
+@contextmanager
+def trace_stage(stage: str) -> Iterator[None]:
+    """Замер стадии текущего анализа; вне анализа ничего не делает"""
+    trace = _analysis_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(stage):
+        yield
+
+
+@contextmanager
+def trace_llm_call(reports: list[str], model: str = "") -> Iterator[Optional[LLMCallTrace]]:
+    """Замер одного запроса к LLM вместе с ожиданием слота и повторами"""
+    trace = _analysis_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    call = LLMCallTrace(reports=reports, model=model)
+    token = _llm_call.set(call)
+    started = time.monotonic()
+    try:
+        yield call
+    finally:
+        call.duration = time.monotonic() - started
+        _llm_call.reset(token)
+        trace.llm_calls.append(call)
+
+
+@contextmanager
+def trace_llm_attempt() -> Iterator[Optional[LLMAttempt]]:
+    """
+    Замер одной попытки текущего запроса к LLM. Попытки запускаются отдельными задачами
+    со своей копией контекста, так что параллельные попытки не перетирают друг друга.
+    """
+    if _llm_call.get() is None:
+        yield None
+        return
+
+    attempt = LLMAttempt()
+    token = _llm_attempt.set(attempt)
+    try:
+        yield attempt
+    finally:
+        _llm_attempt.reset(token)
+
+
+async def record_response_headers(response: httpx.Response) -> None:
+    """
+    Хук httpx: вызывается по получении заголовков ответа, до чтения тела.
+    Время от начала попытки до этого момента — TTFB запроса к LLM.
+    """
+    attempt = _llm_attempt.get()
+    if attempt is not None:
+        attempt.ttfb = time.monotonic() - attempt.started
@@ -0,0 +1,64 @@
+"""
+Общие фикстуры тестов.
+
+Настройки приложения читаются при импорте reportable_app.settings, поэтому обязательные
+переменные окружения задаются здесь, до импорта модулей приложения.
+Redis в тестах — fakeredis, БД и S3 заменяются фейками из tests/fakes.py.
+"""
+import os
+import json
+import tempfile
+import pytest
+import fakeredis
+
+_data_dir = tempfile.mkdtemp(prefix="reportable-tests-")
+
+TEST_JSON_SCHEMA = {
+    "name": "test",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "Инвентарный номер": {"type": ["string", "null"], "description": "Инвентарный номер скважины"},
+            "Месторождение": {"type": ["string", "null"], "description": "Район расположения скважины"},
+            "Начало мероприятия": {"type": ["string", "null"], "description": "Дата начала ремонтных работ"},
+            "Тип мероприятия": {"type": ["string", "null"], "description": "Тип выполненного мероприятия"},
+        },
+        "required": ["Инвентарный номер", "Месторождение", "Начало мероприятия", "Тип мероприятия"],
+    },
+}
+
+with open(os.path.join(_data_dir, "prompts.json"), "w", encoding="utf-8") as f:
+    json.dump({"system_prompt": "Заполни JSON по отчёту"}, f, ensure_ascii=False)
+with open(os.path.join(_data_dir, "schema.json"), "w", encoding="utf-8") as f:
+    json.dump(TEST_JSON_SCHEMA, f, ensure_ascii=False)
+
+for name, value in {
+    "BASE_URL": "http://testserver",
+    "SECRET_KEY": "test",
+    "CORS_ORIGINS": "http://testserver",
+    "SERVICE_JWT__SECRET_KEY": "test",
+    "USER_ACCESS_TOKEN__SECRET_KEY": "test",
+    "DB__HOST": "localhost",
+    "DB__PORT": "5432",
+    "DB__USER": "test",
+    "DB__PASSWORD": "test",
+    "DB__NAME": "test",
+    "MINIO__ENDPOINT": "http://localhost:9000",
+    "MINIO__ACCESS_KEY": "minioadmin",
+    "MINIO__SECRET_KEY": "minioadmin",
+    "MINIO__BUCKET_NAME": "reportable",
+    "MINIO__REAL_URL": "http://localhost:9000",
+    "MINIO__URL_TO_CHANGE": "http://localhost:9000",
+    "MINIO__STANDART_PATH": "files",
+    "REDIS__HOST": "localhost",
+    "LLM__API_KEY": "test",
+    "LLM__MODEL_URL": "test-model",
+    "LLM__PROMPTS_PATH": os.path.join(_data_dir, "prompts.json"),
+    "LLM__SCHEMA_PATH": os.path.join(_data_dir, "schema.json"),
+}.items():
+    os.environ.setdefault(f"REPORTABLE_SERVICE_APP_{name}", value)
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
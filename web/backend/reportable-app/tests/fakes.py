@@ -0,0 +1,224 @@
+"""
+Фейки БД, хранилища и LLM для тестов: повторяют контракты репозиториев и сервисов приложения в памяти.
+"""
+import io
+import json
+import uuid
+import hashlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import AsyncIterable, Callable, Optional
+from openpyxl import Workbook
+from reportable_app.core.enums import AnalysisStatus
+from reportable_app.core.utils.exceptions import ModelAlreadyExistsError, ModelNotFoundException
+from reportable_app.apps.files.models import File
+from reportable_app.apps.files.schemas import FileCreateDBSchema, FileReadDBSchema
+from reportable_app.apps.file_analysis.models import FileProcessingResult
+from reportable_app.apps.analyzer.services.analyzer import AnalyzerService
+from reportable_app.apps.analyzer.services.prompt_registry import get_prompt_registry
+from reportable_app.apps.file_analysis.schemas import (
+    FileProcessingResultCreateSchema, FileProcessingResultReadSchema, FileProcessingResultUpdateSchema,
+)
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class InMemoryFileRepository:
+    def __init__(self, rows: Optional[dict] = None):
+        self.rows: dict[uuid.UUID, FileReadDBSchema] = {} if rows is None else rows
+        # Сколько ближайших вызовов create завершатся ошибкой БД
+        self.fail_creates = 0
+
+    async def create(self, data: FileCreateDBSchema) -> FileReadDBSchema:
+        if self.fail_creates:
+            self.fail_creates -= 1
+            raise ConnectionError("database is unavailable")
+        file_id = data.id or uuid.uuid4()
+        if file_id in self.rows:
+            raise ModelAlreadyExistsError(File, "id", "duplicate key for field: id")
+        row = FileReadDBSchema(**data.model_dump(exclude={"id"}), id=file_id)
+        self.rows[file_id] = row
+        return row
+
+    async def get(self, id: uuid.UUID) -> FileReadDBSchema:
+        if id not in self.rows:
+            raise ModelNotFoundException(File, id)
+        return self.rows[id]
+
+    async def get_or_none(self, id: uuid.UUID) -> Optional[FileReadDBSchema]:
+        return self.rows.get(id)
+
+    async def delete(self, id: uuid.UUID) -> bool:
+        self.rows.pop(id, None)
+        return True
+
+
+class InMemoryFileProcessingRepository:
+    def __init__(self, rows: Optional[dict] = None):
+        self.rows: dict[uuid.UUID, FileProcessingResultReadSchema] = {} if rows is None else rows
+
+    async def create(self, data: FileProcessingResultCreateSchema) -> FileProcessingResultReadSchema:
+        row = FileProcessingResultReadSchema(**data.model_dump(exclude={"id"}), id=data.id or uuid.uuid4())
+        self.rows[row.id] = row
+        return row
+
+    async def update(self, data: FileProcessingResultUpdateSchema) -> FileProcessingResultReadSchema:
+        if data.id not in self.rows:
+            raise ModelNotFoundException(FileProcessingResult, data.id)
+        row = self.rows[data.id].model_copy(
+            update={**data.model_dump(exclude={"id"}, exclude_unset=True), "updated_at": datetime.now(timezone.utc)}
+        )
+        self.rows[data.id] = row
+        return row
+
+    async def get(self, id: uuid.UUID) -> FileProcessingResultReadSchema:
+        if id not in self.rows:
+            raise ModelNotFoundException(FileProcessingResult, id)
+        return self.rows[id]
+
+    async def get_by_fingerprint(self, content_hash: str, model_url: str, prompt_version: str,
+                                 schema_version: str) -> Optional[FileProcessingResultReadSchema]:
+        rows = self._matching(content_hash, model_url, prompt_version, schema_version, (AnalysisStatus.DONE,))
+        return rows[0] if rows else None
+
+    async def get_in_flight_by_fingerprint(self, content_hash: str, model_url: str, prompt_version: str,
+                                           schema_version: str, limit: int = 5) -> list[FileProcessingResultReadSchema]:
+        statuses = (AnalysisStatus.QUEUED, AnalysisStatus.RUNNING)
+        return self._matching(content_hash, model_url, prompt_version, schema_version, statuses)[:limit]
+
+    async def get_by_input_file_id(self, input_file_id: uuid.UUID) -> Optional[FileProcessingResultReadSchema]:
+        return next((row for row in self.rows.values() if row.input_file_id == input_file_id), None)
+
+    async def get_in_flight(self, created_before: datetime, limit: int = 100) -> list[FileProcessingResultReadSchema]:
+        rows = [
+            row for row in self.rows.values()
+            if row.status in (AnalysisStatus.QUEUED, AnalysisStatus.RUNNING) and row.created_at < created_before
+        ]
+        return sorted(rows, key=lambda row: row.created_at)[:limit]
+
+
+    def _matching(self, content_hash, model_url, prompt_version, schema_version, statuses) -> list:
+        rows = [
+            row for row in self.rows.values()
+            if (row.content_hash, row.model_url, row.prompt_version, row.schema_version)
+            == (content_hash, model_url, prompt_version, schema_version)
+            and row.status in statuses
+        ]
+        return sorted(rows, key=lambda row: row.created_at, reverse=True)
+
+
+class InMemoryStorage:
+    """Хранилище объектов с multipart upload — заменяет S3FileService"""
+
+    def __init__(self):
+        self.objects: dict[str, tuple[bytes, str]] = {}
+        self.uploads: dict[str, dict] = {}
+        self.fail_completes = 0
+
+    async def upload_content(self, path: str, content: bytes, content_type: str = "application/octet-stream") -> bool:
+        self.objects[path] = (content, content_type)
+        return True
+
+    async def upload_stream(self, path: str, chunks: AsyncIterable[bytes], content_type: str = "application/octet-stream") -> int:
+        body = b"".join([chunk async for chunk in chunks])
+        self.objects[path] = (body, content_type)
+        return len(body)
+
+    async def download(self, path: str) -> bytes:
+        return self.objects[path][0]
+
+    async def head(self, path: str) -> Optional[dict]:
+        if path not in self.objects:
+            return None
+        body, content_type = self.objects[path]
+        return {"size": len(body), "content_type": content_type}
+
+    async def delete(self, path: str) -> bool:
+        return self.objects.pop(path, None) is not None
+
+    async def get_url(self, path: str) -> str:
+        return (await self.get_urls([path]))[0]
+
+    async def get_urls(self, paths: list[str]) -> list[str]:
+        return [f"http://storage.test/{path}" for path in paths]
+
+    async def create_multipart_upload(self, path: str, content_type: str = "application/octet-stream") -> str:
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {"path": path, "content_type": content_type, "parts": {}}
+        return upload_id
+
+    async def upload_part(self, path: str, upload_id: str, part_number: int, body: bytes) -> str:
+        self.uploads[upload_id]["parts"][part_number] = body
+        return hashlib.md5(body).hexdigest()
+
+    async def complete_multipart_upload(self, path: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        if self.fail_completes:
+            self.fail_completes -= 1
+            raise ConnectionError("storage is unavailable")
+        upload = self.uploads.pop(upload_id, None)
+        if upload is None:
+            raise KeyError(f"NoSuchUpload: {upload_id}")
+        body = b"".join(upload["parts"][number] for number, _ in sorted(parts))
+        self.objects[path] = (body, upload["content_type"])
+
+    async def abort_multipart_upload(self, path: str, upload_id: str) -> None:
+        if self.uploads.pop(upload_id, None) is None:
+            raise KeyError(f"NoSuchUpload: {upload_id}")
+
+    async def get_upload_form(self, path: str, content_type: str, max_size: int, expires_in: int = 3600) -> tuple[str, dict[str, str]]:
+        return "http://storage.test/bucket", {"key": path, "Content-Type": content_type}
+
+
+class FakeLLMClient:
+    """Совместим с AsyncOpenAI в части chat.completions.create; answer строит ответ по сообщениям запроса"""
+
+    def __init__(self, answer: Callable[[list[dict]], dict]):
+        self.answer = answer
+        self.requests: list[dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        content = json.dumps(self.answer(kwargs["messages"]), ensure_ascii=False)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+        )
+
+
+class InMemoryTelemetryRepository:
+    def __init__(self):
+        self.records: list[tuple] = []
+
+    async def create_with_stages(self, data, stages: dict[str, float]) -> None:
+        self.records.append((data, stages))
+
+
+def make_analyzer(client, **options) -> AnalyzerService:
+    """AnalyzerService с промптом и схемой из тестовых файлов (conftest), опции — как у конструктора"""
+    return AnalyzerService(client=client, model_url="test-model", prompt_config=get_prompt_registry().current(), **options)
+
+
+def make_workbook(reports: dict[str, list[str]], summary: Optional[dict[str, str]] = None) -> bytes:
+    """Книга в формате выгрузки: листы «Текущая», «Сводка» и по листу отчёта на каждую дату"""
+    workbook = Workbook()
+    current = workbook.active
+    current.title = "Текущая"
+    current.append(["Скважина", "101"])
+    summary_sheet = workbook.create_sheet("Сводка")
+    for date, text in (summary or {}).items():
+        summary_sheet.append([date, None, None, text])
+    for date, lines in reports.items():
+        sheet = workbook.create_sheet(date)
+        for line in lines:
+            sheet.append([line])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,241 @@
+"""
+Жизненный цикл задачи анализа: приём файла и переиспользование результатов, пул воркеров
+и process_analysis_job целиком, аренды задач и восстановление потерянных задач.
+Зависимости собираются так же, как в приложении, заменены только БД, S3 и LLM.
+"""
+import io
+import time
+import asyncio
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import UploadFile
+from reportable_app.settings import settings
+from reportable_app.core.enums import AnalysisStatus
+from reportable_app.apps.files.schemas import FileCreateDBSchema
+from reportable_app.apps.file_analysis import depends
+from reportable_app.apps.file_analysis.repositories.jobs_cache import AnalysisJobLeaseRedisRepository
+from reportable_app.apps.file_analysis.schemas import FileProcessingResultCreateSchema
+from reportable_app.apps.file_analysis.services.job_queue import (
+    AnalysisJob, start_analysis_worker_pool, stop_analysis_worker_pool,
+)
+from reportable_app.apps.analyzer.services.excel_parser import start_excel_parser, stop_excel_parser
+from reportable_app.apps.analyzer.services.prompt_registry import stop_prompt_registry
+from .fakes import (
+    FakeLLMClient, FakeSession, InMemoryFileProcessingRepository, InMemoryFileRepository,
+    InMemoryStorage, InMemoryTelemetryRepository, make_workbook,
+)
+
+
+REPORT_LINES = [
+    "Скважина 101, месторождение Южное, инвентарный номер 4512.",
+    "Подготовительные работы: переезд бригады, монтаж подъёмника, опрессовка колонны на 120 атм.",
+    "Глушение скважины раствором плотностью 1.18 г/см3 в объёме 30 м3, подъём УЭЦН, спуск нового насоса.",
+]
+
+
+def answer(messages: list[dict]) -> dict:
+    return {
+        "Инвентарный номер": "4512",
+        "Месторождение": "Южное",
+        "Начало мероприятия": "01.02.2024",
+        "Тип мероприятия": "смена УЭЦН",
+    }
+
+
+@pytest.fixture
+async def worker_env(monkeypatch, redis_client):
+    files = InMemoryFileRepository()
+    results = InMemoryFileProcessingRepository()
+    telemetry = InMemoryTelemetryRepository()
+    storage = InMemoryStorage()
+    llm = FakeLLMClient(answer)
+    leases = AnalysisJobLeaseRedisRepository(redis_client)
+
+    monkeypatch.setattr(depends, "AsyncSessionFactory", FakeSession)
+    monkeypatch.setattr(depends, "FileRepository", lambda session: files)
+    monkeypatch.setattr(depends, "FileProcessingRepository", lambda session: results)
+    monkeypatch.setattr(depends, "AnalysisTelemetryRepository", lambda session: telemetry)
+    monkeypatch.setattr(depends, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(depends, "get_s3_client", lambda: None)
+    monkeypatch.setattr(depends, "get_file_service", lambda client, settings: storage)
+    monkeypatch.setattr(depends, "get_llm_client", lambda: llm)
+
+    start_excel_parser(
+        executor="thread", workers=1, max_pending=4, parallel_sheets_min=20, sheets_per_chunk=10, max_waiting=8
+    )
+    pool = await start_analysis_worker_pool(
+        depends.process_analysis_job, leases, workers=1, max_queue_size=4, lease_ttl=60
+    )
+    try:
+        yield files, results, telemetry, storage, llm, pool
+    finally:
+        await stop_analysis_worker_pool()
+        stop_excel_parser()
+        await stop_prompt_registry()
+
+
+async def wait_for_status(results: InMemoryFileProcessingRepository, task_id: uuid.UUID, timeout: float = 10.0):
+    async def finished():
+        while results.rows[task_id].status not in (AnalysisStatus.DONE, AnalysisStatus.FAILED):
+            await asyncio.sleep(0.01)
+        return results.rows[task_id]
+
+    return await asyncio.wait_for(finished(), timeout)
+
+
+async def store_workbook(files: InMemoryFileRepository, storage: InMemoryStorage):
+    content = make_workbook({"01.02.2024": REPORT_LINES})
+    stored = await files.create(FileCreateDBSchema(
+        path=f"files/analysis/{uuid.uuid4()}.xlsx", size=len(content),
+        content_type="application/vnd.ms-excel", filename="book.xlsx",
+    ))
+    await storage.upload_content(stored.path, content)
+    return stored
+
+
+async def orphaned_task(results: InMemoryFileProcessingRepository, file_id: uuid.UUID, status: AnalysisStatus):
+    """Задача, оставшаяся от упавшего процесса: создана давно, аренды нет"""
+    task = await results.create(FileProcessingResultCreateSchema(input_file_id=file_id, status=status))
+    results.rows[task.id] = task.model_copy(update={"created_at": datetime.now(timezone.utc) - timedelta(minutes=10)})
+    return task
+
+
+async def test_queued_job_runs_to_done_through_worker_pool(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+
+    stored = await store_workbook(files, storage)
+    task = await results.create(FileProcessingResultCreateSchema(input_file_id=stored.id))
+
+    await pool.submit(AnalysisJob(task_id=task.id, file_id=stored.id, submitted_at=time.monotonic()))
+    row = await wait_for_status(results, task.id)
+
+    assert row.status == AnalysisStatus.DONE, row.error
+    assert row.result_table["01.02.2024"]["Инвентарный номер"] == "4512"
+    assert row.processed_reports == row.total_reports == 1
+    assert row.content_hash is not None
+    assert llm.requests, "анализ должен обратиться к LLM"
+
+    [(record, stages)] = telemetry.records
+    assert record.status == AnalysisStatus.DONE
+    assert record.llm_calls == len(llm.requests)
+    assert {"queue_wait", "download", "parse", "llm", "total"} <= set(stages)
+
+
+async def test_uploaded_file_is_queued_by_id_and_lease_is_released(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    service = depends._build_file_analizator_service(FakeSession(), settings)
+    content = make_workbook({"01.02.2024": REPORT_LINES})
+
+    task = await service.analyze_and_store(UploadFile(file=io.BytesIO(content), filename="book.xlsx"))
+    assert task.status == AnalysisStatus.QUEUED
+    assert await pool.is_alive(task.id)
+
+    row = await wait_for_status(results, task.id)
+    assert row.status == AnalysisStatus.DONE, row.error
+    # Воркер прочитал файл из хранилища по id записи файла
+    assert storage.objects[files.rows[row.input_file_id].path][0] == content
+    assert not await pool.is_alive(task.id)
+
+
+@pytest.mark.parametrize("status", [AnalysisStatus.QUEUED, AnalysisStatus.RUNNING])
+async def test_recovery_requeues_task_left_by_dead_process(worker_env, status):
+    files, results, telemetry, storage, llm, pool = worker_env
+    stored = await store_workbook(files, storage)
+    task = await orphaned_task(results, stored.id, status)
+
+    assert await depends.recover_analysis_jobs() == 1
+    row = await wait_for_status(results, task.id)
+    assert row.status == AnalysisStatus.DONE, row.error
+
+
+async def test_recovery_skips_fresh_and_alive_tasks(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    stored = await store_workbook(files, storage)
+    # Только что созданная задача: аренда могла ещё не появиться
+    fresh = await results.create(FileProcessingResultCreateSchema(input_file_id=stored.id))
+    # Задача, которую выполняет другой процесс
+    alive = await orphaned_task(results, stored.id, AnalysisStatus.RUNNING)
+    await pool.leases.hold([alive.id], "other-process", ttl=60)
+
+    assert await depends.recover_analysis_jobs() == 0
+    assert results.rows[fresh.id].status == AnalysisStatus.QUEUED
+    assert results.rows[alive.id].status == AnalysisStatus.RUNNING
+
+
+async def test_recovery_claims_each_task_once(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    stored = await store_workbook(files, storage)
+    task = await orphaned_task(results, stored.id, AnalysisStatus.RUNNING)
+
+    recovered = await asyncio.gather(depends.recover_analysis_jobs(), depends.recover_analysis_jobs())
+    assert sorted(recovered) == [0, 1]
+    await wait_for_status(results, task.id)
+    assert len(telemetry.records) == 1
+
+
+async def test_task_lost_too_many_times_is_failed(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    stored = await store_workbook(files, storage)
+    task = await orphaned_task(results, stored.id, AnalysisStatus.RUNNING)
+    for _ in range(settings.analysis.max_recoveries):
+        await pool.leases.add_recovery(task.id, ttl=60)
+
+    assert await depends.recover_analysis_jobs() == 0
+    row = results.rows[task.id]
+    assert row.status == AnalysisStatus.FAILED
+    assert "interrupted" in row.error
+    assert not llm.requests
+
+
+async def test_identical_upload_reuses_done_result(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    service = depends._build_file_analizator_service(FakeSession(), settings)
+    content = make_workbook({"01.02.2024": REPORT_LINES})
+
+    first = await service.analyze_and_store(UploadFile(file=io.BytesIO(content), filename="book.xlsx"))
+    await wait_for_status(results, first.id)
+    requests = len(llm.requests)
+
+    second = await service.analyze_and_store(UploadFile(file=io.BytesIO(content), filename="copy.xlsx"))
+    assert second.id == first.id
+    assert len(llm.requests) == requests
+    assert len(files.rows) == 1
+
+
+async def test_identical_upload_joins_alive_task(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    service = depends._build_file_analizator_service(FakeSession(), settings)
+    content = make_workbook({"01.02.2024": REPORT_LINES})
+    stored = await store_workbook(files, storage)
+    running = await orphaned_task(results, stored.id, AnalysisStatus.RUNNING)
+    results.rows[running.id] = running.model_copy(update={
+        "content_hash": service._hash_content(content),
+        "model_url": service.analyzer_service.model_url,
+        "prompt_version": service.analyzer_service.prompt_version,
+        "schema_version": service.analyzer_service.schema_version,
+    })
+    # Задачу выполняет другой процесс
+    await pool.leases.hold([running.id], "other-process", ttl=60)
+
+    task = await service.analyze_and_store(UploadFile(file=io.BytesIO(content), filename="book.xlsx"))
+    assert task.id == running.id
+
+
+async def test_identical_upload_does_not_join_orphaned_task(worker_env):
+    files, results, telemetry, storage, llm, pool = worker_env
+    service = depends._build_file_analizator_service(FakeSession(), settings)
+    content = make_workbook({"01.02.2024": REPORT_LINES})
+    stored = await store_workbook(files, storage)
+    orphan = await orphaned_task(results, stored.id, AnalysisStatus.QUEUED)
+    results.rows[orphan.id] = orphan.model_copy(update={
+        "content_hash": service._hash_content(content),
+        "model_url": service.analyzer_service.model_url,
+        "prompt_version": service.analyzer_service.prompt_version,
+        "schema_version": service.analyzer_service.schema_version,
+    })
+
+    task = await service.analyze_and_store(UploadFile(file=io.BytesIO(content), filename="book.xlsx"))
+    assert task.id != orphan.id
+    row = await wait_for_status(results, task.id)
+    assert row.status == AnalysisStatus.DONE, row.error
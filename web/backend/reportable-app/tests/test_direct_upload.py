@@ -0,0 +1,89 @@
+"""
+Прямая загрузка в хранилище: выдача формы, подтверждение, повтор подтверждения после сбоя БД
+и одновременные подтверждения.
+"""
+import asyncio
+import pytest
+from reportable_app.core.utils.exceptions import ValidationError
+from reportable_app.apps.files.repositories.files_cache import FileRedisRepository
+from reportable_app.apps.files.repositories.uploads_cache import DirectUploadRedisRepository
+from reportable_app.apps.files.schemas import DirectUploadCreateSchema
+from reportable_app.apps.files.services.direct_upload import DirectUploadService
+from reportable_app.apps.files.services.file_managment_service import FileManagmentService
+from .fakes import InMemoryFileRepository, InMemoryStorage
+
+BODY = b"workbook"
+
+
+@pytest.fixture
+def direct(redis_client):
+    files = InMemoryFileRepository()
+    storage = InMemoryStorage()
+    uploads = DirectUploadRedisRepository(redis_client)
+    managment = FileManagmentService(files, FileRedisRepository(redis_client), storage, "files", 60)
+    service = DirectUploadService(uploads, storage, managment, expires_in=60, max_size=1024)
+    return service, uploads, files, storage
+
+
+async def upload_directly(service: DirectUploadService, storage: InMemoryStorage, body: bytes = BODY):
+    """Выдаёт форму и загружает файл так, как это сделал бы браузер"""
+    form = await service.issue(DirectUploadCreateSchema(filename="book.xlsx", content_type="application/vnd.ms-excel"))
+    await storage.upload_content(form.fields["key"], body, form.fields["Content-Type"])
+    return form
+
+
+async def test_confirm_registers_uploaded_object_once(direct):
+    service, uploads, files, storage = direct
+    form = await upload_directly(service, storage)
+
+    created = await service.confirm(form.file_id)
+    assert created.id == form.file_id
+    assert (created.size, created.content_type) == (len(BODY), "application/vnd.ms-excel")
+    assert await uploads.get_upload(form.file_id) is None
+
+    again = await service.confirm(form.file_id)
+    assert again.id == created.id
+    assert list(files.rows) == [form.file_id]
+
+
+async def test_confirm_before_upload_is_rejected(direct):
+    service, uploads, files, storage = direct
+    form = await service.issue(DirectUploadCreateSchema(filename="book.xlsx"))
+
+    with pytest.raises(ValidationError):
+        await service.confirm(form.file_id)
+    assert await uploads.get_upload(form.file_id) is not None
+
+
+async def test_oversized_object_is_deleted(direct):
+    service, uploads, files, storage = direct
+    form = await upload_directly(service, storage, body=b"x" * 2048)
+
+    with pytest.raises(ValidationError):
+        await service.confirm(form.file_id)
+    assert not storage.objects
+    assert not files.rows
+
+
+async def test_confirm_is_retried_after_database_failure(direct):
+    service, uploads, files, storage = direct
+    form = await upload_directly(service, storage)
+    files.fail_creates = 1
+
+    with pytest.raises(ConnectionError):
+        await service.confirm(form.file_id)
+    # Форма не потеряна: повтор создаёт запись для того же объекта
+    assert await uploads.get_upload(form.file_id) is not None
+
+    created = await service.confirm(form.file_id)
+    assert created.id == form.file_id
+    assert await uploads.get_upload(form.file_id) is None
+
+
+async def test_concurrent_confirms_return_the_same_file(direct):
+    service, uploads, files, storage = direct
+    form = await upload_directly(service, storage)
+
+    first, second = await asyncio.gather(service.confirm(form.file_id), service.confirm(form.file_id))
+    assert first.id == second.id == form.file_id
+    assert list(files.rows) == [form.file_id]
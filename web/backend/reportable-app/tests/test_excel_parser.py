@@ -0,0 +1,92 @@
+"""
+Пул разбора Excel-книг: разбор книги, ограничение очереди ожидания и пересоздание пула
+после падения дочернего процесса.
+"""
+import os
+import asyncio
+import threading
+import pytest
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from reportable_app.apps.analyzer.exceptions import ExcelParserBusyError
+from reportable_app.apps.analyzer.services.excel_parser import ExcelParserPool, read_sheet_names
+from .fakes import make_workbook
+
+
+class BrokenPool(ThreadPoolExecutor):
+    """Пул, у которого упал дочерний процесс: все задачи завершаются BrokenProcessPool"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+
+@pytest.fixture
+def parser():
+    parser = ExcelParserPool(
+        executor="thread", workers=2, max_pending=8, parallel_sheets_min=2, sheets_per_chunk=1, max_waiting=4
+    )
+    parser.start()
+    try:
+        yield parser
+    finally:
+        parser.stop()
+
+
+async def test_large_workbook_is_parsed_in_parallel_chunks(parser, monkeypatch):
+    content = make_workbook({"01.02.2024": ["Спуск насоса"], "02.02.2024": ["Подъём насоса"]})
+    sources = []
+    run = parser._run
+
+    async def recording_run(fn, source, *args):
+        sources.append(source)
+        return await run(fn, source, *args)
+
+    monkeypatch.setattr(parser, "_run", recording_run)
+    reports = await parser.extract_reports(content)
+
+    assert list(reports) == ["01.02.2024", "02.02.2024"]
+    assert "Подъём насоса" in reports["02.02.2024"]
+    # Сводка и обе части читают книгу из одного временного файла, а не получают копию байтов
+    first, *parts = sources
+    assert first == content
+    assert len(parts) == 3 and len(set(parts)) == 1
+    assert isinstance(parts[0], str) and not os.path.exists(parts[0])
+
+
+async def test_broken_pool_is_restarted_once(parser, monkeypatch):
+    starts = []
+    start = parser.start
+    monkeypatch.setattr(parser, "start", lambda: (starts.append(1), start()))
+    broken = BrokenPool()
+    parser._executor = broken
+    content = make_workbook({"01.02.2024": ["Спуск насоса"]})
+
+    results = await asyncio.gather(
+        *[parser._run(read_sheet_names, content) for _ in range(4)], return_exceptions=True
+    )
+
+    assert all(isinstance(result, BrokenProcessPool) for result in results)
+    assert len(starts) == 1
+    assert parser._executor is not broken
+    assert await parser._run(read_sheet_names, content) == ["Текущая", "Сводка", "01.02.2024"]
+    assert parser.stats()["running"] == 0
+
+
+async def test_new_workbooks_are_rejected_when_wait_queue_is_full(parser):
+    release = threading.Event()
+    content = make_workbook({"01.02.2024": ["Спуск насоса"]})
+    # Все слоты пула заняты, перед ним ждут max_waiting задач
+    busy = [asyncio.create_task(parser._run(release.wait)) for _ in range(parser.max_pending + parser.max_waiting)]
+    await asyncio.sleep(0.05)
+    assert parser.stats()["pending"] == parser.max_waiting
+
+    with pytest.raises(ExcelParserBusyError) as error:
+        await parser.extract_reports(content)
+    assert error.value.status_code == 503
+    assert parser.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*busy)
+    assert list(await parser.extract_reports(content)) == ["01.02.2024"]
@@ -0,0 +1,340 @@
+"""
+Запросы к LLM: ограничитель параллельности, хеджирование с телеметрией попыток, лимит токенов ответа,
+каскад моделей и SingleFlight.
+"""
+import json
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from openai import BadRequestError, RateLimitError
+from reportable_app.core.utils.single_flight import SingleFlight
+from reportable_app.core.utils.telemetry import AnalysisTrace, record_response_headers, use_trace
+from reportable_app.apps.analyzer.services.hedging import LLMRequestPolicy
+from reportable_app.apps.analyzer.services.limiter import AdaptiveLLMLimiter
+from .fakes import FakeLLMClient, make_analyzer
+
+
+def api_error(error_type, status_code: int):
+    response = httpx.Response(status_code, request=httpx.Request("POST", "http://llm.test/v1/chat/completions"))
+    return error_type("error", response=response, body=None)
+
+
+def warmed_policy(latency: float, model: str = "", samples: int = 20) -> LLMRequestPolicy:
+    """Политика с историей задержек: хеджирование срабатывает через latency секунд"""
+    policy = LLMRequestPolicy(hedging_enabled=True, hedge_min_samples=samples, hedge_max_ratio=1.0)
+    for _ in range(samples):
+        policy._record(policy.bucket(100, model), latency)
+    return policy
+
+
+class TimedLLMClient:
+    """
+    Клиент LLM, у которого каждая попытка по очереди получает заголовки через headers_after[i]
+    секунд и тело ещё через body_after. Хук заголовков вызывается так же, как его вызывает httpx.
+    """
+
+    def __init__(self, headers_after: list[float], body_after: float = 0.01):
+        self.headers_after = list(headers_after)
+        self.body_after = body_after
+        self.started = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        attempt = self.started
+        self.started += 1
+        await asyncio.sleep(self.headers_after[attempt])
+        await record_response_headers(None)
+        await asyncio.sleep(self.body_after)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f'{{"attempt": {attempt}}}'))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+# ---- ограничитель ----
+
+async def test_limiter_caps_concurrency():
+    limiter = AdaptiveLLMLimiter(initial_limit=2, max_limit=2)
+    running = peak = 0
+
+    async def request():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    results = await asyncio.gather(*(limiter.run(request) for _ in range(8)))
+    assert results == ["ok"] * 8
+    assert peak == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+async def test_limiter_serves_longest_requests_first():
+    limiter = AdaptiveLLMLimiter(initial_limit=1, max_limit=1)
+    release = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await release.wait()
+
+    async def request(name):
+        order.append(name)
+
+    first = asyncio.create_task(limiter.run(blocker))
+    await asyncio.sleep(0)
+    waiting = [asyncio.create_task(limiter.run(lambda n=n: request(n), priority=p))
+               for n, p in (("short", 10), ("long", 1000), ("medium", 100))]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *waiting)
+    assert order == ["long", "medium", "short"]
+
+
+async def test_limiter_retries_throttled_requests_and_backs_off():
+    limiter = AdaptiveLLMLimiter(initial_limit=8, backoff_base=0.001, backoff_max=0.001)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise api_error(RateLimitError, 429)
+        return "ok"
+
+    assert await limiter.run(request) == "ok"
+    stats = limiter.stats()
+    assert (stats["retries"], stats["throttled"]) == (2, 2)
+    # Всплеск ошибок уменьшает лимит один раз за cooldown
+    assert stats["limit"] < 8
+
+
+async def test_limiter_does_not_retry_client_errors():
+    limiter = AdaptiveLLMLimiter(backoff_base=0.001)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        raise api_error(BadRequestError, 400)
+
+    with pytest.raises(BadRequestError):
+        await limiter.run(request)
+    assert calls == 1
+    assert limiter.stats()["in_flight"] == 0
+
+
+# ---- хеджирование ----
+
+async def test_policy_without_history_does_not_hedge():
+    policy = LLMRequestPolicy(hedging_enabled=True)
+    starts = 0
+
+    async def request(timeout):
+        nonlocal starts
+        starts += 1
+        await asyncio.sleep(0.02)
+        return timeout
+
+    timeout = await policy.run(request, tokens=100)
+    assert starts == 1
+    assert timeout == policy.timeout_for(100)
+
+
+async def test_policy_hedges_slow_attempt_and_cancels_loser():
+    policy = warmed_policy(0.02)
+    cancelled = []
+
+    async def request(timeout):
+        attempt = len(cancelled)
+        cancelled.append(False)
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled[attempt] = True
+            raise
+        return attempt
+
+    assert await policy.run(request, tokens=100) == 1
+    assert cancelled == [True, False]
+    stats = policy.stats()
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+
+
+async def test_policy_propagates_error_before_hedge():
+    policy = warmed_policy(1.0)
+
+    async def request(timeout):
+        raise ConnectionError("boom")
+
+    with pytest.raises(ConnectionError):
+        await policy.run(request, tokens=100)
+    assert policy.stats()["hedged"] == 0
+
+
+async def test_ttfb_of_primary_attempt_is_not_shifted_by_hedge():
+    # Дубль запускается через 0.05 с, но отвечает первым исходный запрос — его TTFB 0.2 с от его начала
+    client = TimedLLMClient(headers_after=[0.2, 1.0])
+    analyzer = make_analyzer(client, request_policy=warmed_policy(0.05, model="test-model"))
+    trace = AnalysisTrace()
+
+    with use_trace(trace):
+        content = await analyzer._request_model("test-model", "prompt", {}, ["01.02.2024"], size=100)
+
+    assert content == '{"attempt": 0}'
+    assert client.started == 2
+    [call] = trace.llm_calls
+    assert call.ttfb >= 0.19
+    assert call.duration >= call.ttfb
+
+
+async def test_ttfb_of_winning_hedge_is_measured_from_its_own_start():
+    client = TimedLLMClient(headers_after=[1.0, 0.05])
+    analyzer = make_analyzer(client, request_policy=warmed_policy(0.05, model="test-model"))
+    trace = AnalysisTrace()
+
+    with use_trace(trace):
+        content = await analyzer._request_model("test-model", "prompt", {}, ["01.02.2024"], size=100)
+
+    assert content == '{"attempt": 1}'
+    [call] = trace.llm_calls
+    assert 0.04 <= call.ttfb < 0.09
+    assert call.duration >= 0.1
+
+
+# ---- лимит ответа ----
+
+async def test_answer_limit_follows_request_size():
+    client = FakeLLMClient(lambda messages: {})
+    analyzer = make_analyzer(client, answer_tokens_min=512, answer_tokens_max=4096)
+
+    for text in ("Спуск насоса.", "Спуск насоса, промывка скважины. " * 60, "Спуск насоса. " * 2000):
+        await analyzer._analyze_with_llm(analyzer._create_prompt(text), reports=["01.02.2024"])
+
+    short, medium, long = [request["max_tokens"] for request in client.requests]
+    assert short == 512
+    assert 512 < medium < 4096
+    assert long == 4096
+
+
+# ---- каскад моделей ----
+
+VALID_ANSWER = {"Инвентарный номер": "4512", "Месторождение": "Южное", "Начало мероприятия": "", "Тип мероприятия": "КРС"}
+
+
+def cascade_client(answers: dict[str, object]) -> FakeLLMClient:
+    """Ответ зависит от модели запроса; исключение вместо ответа — ошибка запроса к этой модели"""
+    client = FakeLLMClient(lambda messages: None)
+
+    def answer(messages: list[dict]) -> dict:
+        result = answers[client.requests[-1]["model"]]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    client.answer = answer
+    return client
+
+
+def cascade_outcomes(analyzer) -> dict[str, dict]:
+    return {row["model"]: row for row in analyzer.cascade_stats.stats()["models"]}
+
+
+async def test_invalid_answer_is_escalated_to_next_model():
+    client = cascade_client({"small": {"Инвентарный номер": 4512}, "large": VALID_ANSWER})
+    analyzer = make_analyzer(client, models=["small", "large"])
+
+    answer = await analyzer._analyze_with_llm(analyzer._create_prompt("Спуск насоса."), reports=["01.02.2024"])
+
+    assert json.loads(answer) == VALID_ANSWER
+    assert [request["model"] for request in client.requests] == ["small", "large"]
+    outcomes = cascade_outcomes(analyzer)
+    assert outcomes["small"]["escalated"] == 1 and outcomes["small"]["reasons"]
+    assert outcomes["large"]["accepted"] == 1
+
+
+async def test_valid_answer_of_first_model_is_accepted():
+    client = cascade_client({"small": VALID_ANSWER, "large": VALID_ANSWER})
+    analyzer = make_analyzer(client, models=["small", "large"])
+
+    await analyzer._analyze_with_llm(analyzer._create_prompt("Спуск насоса."), reports=["01.02.2024"])
+
+    assert [request["model"] for request in client.requests] == ["small"]
+    assert cascade_outcomes(analyzer)["small"]["acceptance"] == 1.0
+
+
+async def test_request_error_escalates_and_error_of_last_model_is_raised():
+    client = cascade_client({"small": ConnectionError("small is down"), "large": ConnectionError("large is down")})
+    analyzer = make_analyzer(client, models=["small", "large"])
+
+    with pytest.raises(ConnectionError, match="large is down"):
+        await analyzer._analyze_with_llm(analyzer._create_prompt("Спуск насоса."), reports=["01.02.2024"])
+
+    outcomes = cascade_outcomes(analyzer)
+    assert outcomes["small"]["escalated"] == 1 and outcomes["small"]["reasons"] == {"error": 1}
+    assert outcomes["large"]["failed"] == 1
+
+
+async def test_long_report_goes_straight_to_last_model():
+    client = cascade_client({"small": VALID_ANSWER, "large": VALID_ANSWER})
+    analyzer = make_analyzer(client, models=["small", "large"], cascade_max_tokens=200)
+    # Пакет коротких отчётов проходит каскад, хотя весь запрос длиннее порога
+    batch = [f"0{day}.02.2024" for day in range(1, 9)]
+
+    await analyzer._analyze_with_llm(analyzer._create_prompt("Спуск насоса. " * 200), reports=["01.02.2024"])
+    await analyzer._analyze_with_llm(analyzer._create_prompt("Спуск насоса."), reports=batch)
+
+    assert [request["model"] for request in client.requests] == ["large", "small"]
+    assert analyzer.cascade_stats.stats()["routed_long"] == 1
+
+
+# ---- SingleFlight ----
+
+async def test_single_flight_runs_concurrent_calls_once():
+    flight = SingleFlight[str]()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+
+async def test_single_flight_shares_errors():
+    flight = SingleFlight[str]()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad")
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.in_flight() == 0
+
+
+async def test_single_flight_waiter_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight[str]()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return f"call {calls}"
+
+    leader = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await follower == "call 2"
+    assert leader.cancelled()
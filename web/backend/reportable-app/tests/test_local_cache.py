@@ -0,0 +1,94 @@
+"""
+Локальный кэш процесса перед Redis: попадания, инвалидация удалением в этом и в другом процессе
+и чтения, которые пересекаются с удалением.
+"""
+import json
+import asyncio
+import pytest
+from reportable_app.core.repositories.local_cache import CacheInvalidationBus, LocalTTLCache
+from reportable_app.apps.files.repositories.files_cache import FileRedisRepository
+
+KEY = "url:files/book.xlsx"
+
+
+def make_repository(redis_client) -> FileRedisRepository:
+    local = LocalTTLCache("files", ttl=60, max_entries=100, max_bytes=1_000_000)
+    bus = CacheInvalidationBus(redis_client, "cache-invalidation")
+    bus.register(local)
+    return FileRedisRepository(redis_client, local=local, bus=bus)
+
+
+@pytest.fixture
+async def repository(redis_client):
+    repository = make_repository(redis_client)
+    await repository.set(KEY, json.dumps({"url": "v1"}))
+    return repository
+
+
+async def test_decoded_value_is_reused_until_delete(repository, redis_client):
+    decodes = []
+
+    def decode(raw: str) -> dict:
+        decodes.append(raw)
+        return json.loads(raw)
+
+    assert await repository.get_decoded(KEY, decode) == {"url": "v1"}
+    # Значение в Redis меняется в обход процесса — чтение идёт из локального кэша
+    await redis_client.set(repository._make_key(KEY), json.dumps({"url": "v2"}))
+    assert await repository.get_decoded(KEY, decode) == {"url": "v1"}
+    assert len(decodes) == 1
+
+    await repository.delete(KEY)
+    assert await repository.get_decoded(KEY, decode) is None
+    assert repository.local.get(KEY) is None
+
+
+async def test_delete_in_other_process_invalidates_local_copy(repository, redis_client):
+    other = make_repository(redis_client)
+    assert await other.get(KEY) == json.dumps({"url": "v1"})
+
+    await repository.delete(KEY)
+    # Сообщение, которое процесс repository опубликовал в канал
+    other.bus.handle(repository.bus.message(repository.local, [KEY]))
+    assert other.local.get(KEY) is None
+    assert await other.get(KEY) is None
+
+    # Свои сообщения процесс пропускает
+    await other.set(KEY, "v3")
+    other.bus.handle(other.bus.message(other.local, [KEY]))
+    assert other.local.get(KEY).raw == "v3"
+
+
+async def test_read_overlapping_delete_does_not_cache_deleted_value(repository, redis_client, monkeypatch):
+    repository.local.clear()
+    deleted = asyncio.Event()
+    redis_get = redis_client.get
+
+    async def slow_get(name):
+        value = await redis_get(name)
+        await deleted.wait()
+        return value
+
+    monkeypatch.setattr(redis_client, "get", slow_get)
+    read = asyncio.create_task(repository.get_decoded(KEY, json.loads))
+    await asyncio.sleep(0)
+    await repository.delete(KEY)
+    deleted.set()
+
+    # Чтение вернуло прочитанное до удаления, но в кэш его не сохранило
+    assert await read == {"url": "v1"}
+    assert repository.local.get(KEY) is None
+
+
+async def test_decoded_value_read_before_invalidation_is_dropped(repository):
+    repository.local.clear()
+    raw = json.dumps({"url": "v1"})
+
+    def decode(value: str) -> dict:
+        # Пока значение разбиралось, ключ удалили и записали заново ту же строку
+        repository.local.invalidate([KEY])
+        repository.local.set(KEY, raw)
+        return json.loads(value)
+
+    assert await repository.get_decoded(KEY, decode) == {"url": "v1"}
+    assert repository.local.get(KEY).decoded is None
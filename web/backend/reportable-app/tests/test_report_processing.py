@@ -0,0 +1,254 @@
+"""
+Подготовка отчётов перед LLM: поля по правилам и выборка для их проверки, шапка скважины, пакетные запросы,
+сжатие текстов, разбиение длинных отчётов на части и объединение ответов по частям.
+"""
+from reportable_app.apps.analyzer.services.rules import extract_fields
+from reportable_app.apps.analyzer.services.batching import REPORT_DATE_FIELD, split_batch_response
+from reportable_app.apps.analyzer.services.compaction import ReportCompactor
+from reportable_app.apps.analyzer.services.chunking import merge_partials, split_report
+from reportable_app.apps.analyzer.services.well_header import apply_header
+from reportable_app.apps.analyzer.services.tokens import estimate_tokens
+from .conftest import TEST_JSON_SCHEMA
+from .fakes import FakeLLMClient, make_analyzer, make_workbook
+
+
+RULES_REPORT = "Скважина 101, инв. номер 4512. Начало ремонта: 01.02.2024, бригада КРС-3 на месте."
+LEGEND = "Условные обозначения и подписи ответственных лиц бригады"
+
+
+def requested_fields(request: dict) -> set[str]:
+    return set(request["response_format"]["json_schema"]["schema"]["properties"])
+
+
+def llm_answer(messages: list[dict]) -> dict:
+    return {"Инвентарный номер": "4512", "Месторождение": "Южное", "Начало мероприятия": "", "Тип мероприятия": "КРС"}
+
+
+def test_rules_extract_fields_from_text():
+    assert extract_fields(RULES_REPORT) == {"Инвентарный номер": "4512", "Начало мероприятия": "2024-02-01"}
+    assert extract_fields("Переезд бригады, монтаж подъёмника") == {}
+
+
+async def test_fields_found_by_rules_are_not_requested():
+    client = FakeLLMClient(llm_answer)
+    analyzer = make_analyzer(client, rules_enabled=True, rules_verify_ratio=0.0)
+
+    result = await analyzer._process_single_report("01.02.2024", RULES_REPORT)
+
+    [request] = client.requests
+    assert requested_fields(request) == {"Месторождение", "Тип мероприятия"}
+    assert result["Инвентарный номер"] == "4512"
+    assert result["Начало мероприятия"] == "2024-02-01"
+    assert result["Месторождение"] == "Южное"
+    assert analyzer.rule_stats.stats()["reduced_reports"] == 1
+
+
+async def test_verified_report_gets_full_schema_and_agreement_is_counted():
+    client = FakeLLMClient(llm_answer)
+    analyzer = make_analyzer(client, rules_enabled=True, rules_verify_ratio=1.0)
+
+    result = await analyzer._process_single_report("01.02.2024", RULES_REPORT)
+
+    [request] = client.requests
+    assert requested_fields(request) == set(TEST_JSON_SCHEMA["schema"]["properties"])
+    # Правила дополняют пустое поле ответа модели
+    assert result["Начало мероприятия"] == "2024-02-01"
+    fields = {row["field"]: row for row in analyzer.rule_stats.stats()["fields"]}
+    assert fields["Инвентарный номер"]["agreed"] == 1
+    assert fields["Начало мероприятия"]["llm_empty"] == 1
+
+
+async def test_trivial_sheets_are_keyed_by_sheet_date_and_empty_ones_dropped():
+    client = FakeLLMClient(llm_answer)
+    analyzer = make_analyzer(client, rules_enabled=True)
+    content = make_workbook({
+        "01.02.2024": ["Инв. номер 4512"],
+        "02.02.2024": ["Простой"],
+        "03.02.2024": [RULES_REPORT.replace("Начало ремонта: 01.02.2024, ", ""), "Подъём УЭЦН, спуск нового насоса."],
+        "04.02.2024": ["Инв. номер 4513"],
+    })
+
+    result = await analyzer.analyze(content)
+
+    # Ни у одного листа нет даты начала: каждый остаётся под датой своего листа
+    assert list(result) == ["01.02.2024", "03.02.2024", "04.02.2024"]
+    assert result["01.02.2024"]["Инвентарный номер"] == "4512"
+    assert result["04.02.2024"]["Инвентарный номер"] == "4513"
+    assert result["03.02.2024"]["Месторождение"] == "Южное"
+    assert len(client.requests) == 1
+
+
+HEADER_FIELDS = {"Инвентарный номер", "Месторождение"}
+
+
+def test_apply_header_fills_only_empty_sheet_fields():
+    result = {"Тип мероприятия": "КРС", "Инвентарный номер": "4512", "Месторождение": "", "Начало мероприятия": None}
+    header = {"Инвентарный номер": "9999", "Месторождение": "Южное", "Начало мероприятия": ""}
+
+    merged = apply_header(TEST_JSON_SCHEMA, result, header)
+
+    # Значение листа важнее шапки, пустые значения шапки ничего не затирают, порядок полей — как в схеме
+    assert merged == {
+        "Инвентарный номер": "4512", "Месторождение": "Южное", "Начало мероприятия": None, "Тип мероприятия": "КРС",
+    }
+    assert list(merged) == list(TEST_JSON_SCHEMA["schema"]["properties"])
+
+
+async def test_header_is_requested_once_per_workbook():
+    def answer(messages: list[dict]) -> dict:
+        if "общие сведения о скважине" in messages[-1]["content"]:
+            return {"Инвентарный номер": "4512", "Месторождение": "Южное"}
+        return {"Начало мероприятия": "", "Тип мероприятия": "КРС"}
+
+    client = FakeLLMClient(answer)
+    analyzer = make_analyzer(client, header_enabled=True)
+    content = make_workbook({
+        "01.02.2024": ["Подъём УЭЦН, спуск нового насоса."],
+        "02.02.2024": ["Промывка скважины, опрессовка колонны."],
+    })
+
+    result = await analyzer.analyze(content)
+
+    header_requests = [request for request in client.requests if requested_fields(request) == HEADER_FIELDS]
+    sheet_requests = [request for request in client.requests if request not in header_requests]
+    assert len(header_requests) == 1 and len(sheet_requests) == 2
+    assert all(not requested_fields(request) & HEADER_FIELDS for request in sheet_requests)
+    assert [row["Месторождение"] for row in result.values()] == ["Южное", "Южное"]
+    assert [row["Тип мероприятия"] for row in result.values()] == ["КРС", "КРС"]
+
+
+def test_verify_sample_depends_only_on_report_text():
+    analyzer = make_analyzer(FakeLLMClient(llm_answer), rules_enabled=True, rules_verify_ratio=0.3)
+    texts = [f"{RULES_REPORT} Спуск НКТ, {i} шт." for i in range(2000)]
+
+    first = [analyzer._in_verify_sample(text) for text in texts]
+    again = make_analyzer(FakeLLMClient(llm_answer), rules_enabled=True, rules_verify_ratio=0.3)
+    assert [again._in_verify_sample(text) for text in texts] == first
+    assert 0.25 < sum(first) / len(texts) < 0.35
+
+
+async def test_repeated_report_hits_response_cache_key():
+    client = FakeLLMClient(llm_answer)
+    analyzer = make_analyzer(client, rules_enabled=True, rules_verify_ratio=0.5)
+
+    await analyzer._process_single_report("01.02.2024", RULES_REPORT)
+    await analyzer._process_single_report("01.02.2024", RULES_REPORT)
+
+    # Один и тот же отчёт — одна и та же схема, а значит один и тот же промпт и ключ кэша
+    first, second = client.requests
+    assert first["response_format"] == second["response_format"]
+
+
+def test_split_batch_response_maps_answers_by_report_date():
+    first = {REPORT_DATE_FIELD: " 01.02.2024 ", "Инвентарный номер": "4512"}
+    repeated = {REPORT_DATE_FIELD: "01.02.2024", "Инвентарный номер": "9999"}
+    second = {REPORT_DATE_FIELD: "02.02.2024", "Инвентарный номер": "4513"}
+    undated = {REPORT_DATE_FIELD: "", "Инвентарный номер": "4514"}
+
+    answers = split_batch_response({"reports": [first, "не объект", repeated, undated, second]})
+
+    # Дата снимается с ответа, при повторе даты остаётся первый ответ
+    assert answers == {"01.02.2024": {"Инвентарный номер": "4512"}, "02.02.2024": {"Инвентарный номер": "4513"}}
+    assert split_batch_response({}) == split_batch_response({"reports": None}) == {}
+
+
+async def test_reports_missing_from_batch_answer_are_requested_one_by_one():
+    def answer(messages: list[dict]) -> dict:
+        if "02.02.2024" in messages[-1]["content"] and "01.02.2024" in messages[-1]["content"]:
+            return {"reports": [{REPORT_DATE_FIELD: date, **llm_answer(messages)} for date in ("01.02.2024", "02.02.2024")]}
+        return {**llm_answer(messages), "Тип мероприятия": "ПРС"}
+
+    client = FakeLLMClient(answer)
+    analyzer = make_analyzer(client, batch_enabled=True)
+    group = [(f"0{day}.02.2024", f"Спуск насоса, день {day}.") for day in range(1, 4)]
+
+    results = await analyzer._process_batch(group)
+
+    batch_request, single_request = client.requests
+    assert batch_request["response_format"]["json_schema"]["name"].endswith("_batch")
+    assert "03.02.2024" in batch_request["messages"][-1]["content"]
+    assert "_batch" not in single_request["response_format"]["json_schema"]["name"]
+    assert [results[date]["Тип мероприятия"] for date, _ in group] == ["КРС", "КРС", "ПРС"]
+
+
+def test_compaction_drops_repeats_and_boilerplate_only():
+    reports = {
+        f"0{day}.02.2024": "\n".join([
+            LEGEND,
+            "Месторождение   Южное",
+            f"Спуск насоса на глубину {1000 + day} м",
+            f"Спуск насоса на глубину {1000 + day} м",
+            "",
+        ])
+        for day in range(1, 5)
+    }
+
+    compacted, tokens = ReportCompactor().compact(reports)
+
+    assert compacted["01.02.2024"] == "Месторождение Южное\nСпуск насоса на глубину 1001 м"
+    assert all(LEGEND not in text for text in compacted.values())
+    assert all(after < before for before, after in tokens.values())
+
+
+def test_compaction_keeps_boilerplate_of_small_workbook():
+    reports = {"01.02.2024": LEGEND, "02.02.2024": LEGEND}
+    compacted, _ = ReportCompactor().compact(reports)
+    assert compacted == reports
+
+
+def test_split_report_repeats_header_and_keeps_lines_whole():
+    header = [f"Шапка {i}" for i in range(5)]
+    body = [f"Операция {i}: спуск НКТ, промывка, опрессовка колонны" for i in range(40)]
+    text = "\n".join(header + body)
+
+    chunks = split_report(text, max_tokens=120)
+
+    assert len(chunks) > 1
+    assert all(chunk.split("\n")[:5] == header for chunk in chunks)
+    assert [line for chunk in chunks for line in chunk.split("\n")[5:]] == body
+    assert all(estimate_tokens(chunk) <= 120 for chunk in chunks)
+    assert split_report("Короткий отчёт", max_tokens=120) == ["Короткий отчёт"]
+
+
+def test_merge_partials_applies_field_rules():
+    schema = {"schema": {"properties": {
+        "Инвентарный номер": {},
+        "Начало мероприятия": {},
+        "Окончание мероприятия": {},
+        "Описание работ": {},
+    }}}
+    partials = [
+        {"Инвентарный номер": "", "Начало мероприятия": "2024-02-03", "Окончание мероприятия": "2024-02-03",
+         "Описание работ": "Подъём УЭЦН."},
+        {"Инвентарный номер": "4512", "Начало мероприятия": "2024-02-01", "Окончание мероприятия": "2024-02-05",
+         "Описание работ": "Спуск УЭЦН."},
+    ]
+
+    assert merge_partials(schema, partials) == {
+        "Инвентарный номер": "4512",
+        "Начало мероприятия": "2024-02-01",
+        "Окончание мероприятия": "2024-02-05",
+        "Описание работ": "Подъём УЭЦН. Спуск УЭЦН.",
+    }
+
+
+async def test_long_report_is_processed_by_parts():
+    def answer(messages: list[dict]) -> dict:
+        prompt = messages[-1]["content"]
+        first_part = "часть 1 из" in prompt
+        return {
+            "Инвентарный номер": "4512" if first_part else "",
+            "Месторождение": "",
+            "Начало мероприятия": "2024-02-03" if first_part else "2024-02-01",
+            "Тип мероприятия": "",
+        }
+
+    client = FakeLLMClient(answer)
+    analyzer = make_analyzer(client, chunking_enabled=True, chunk_max_tokens=120)
+    text = "\n".join([f"Операция {i}: спуск НКТ, промывка, опрессовка колонны" for i in range(40)])
+
+    result = await analyzer._process_single_report("01.02.2024", text)
+
+    assert len(client.requests) == len(split_report(text, 120)) > 1
+    assert result["Инвентарный номер"] == "4512"
+    assert result["Начало мероприятия"] == "2024-02-01"
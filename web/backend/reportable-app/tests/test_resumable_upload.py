@@ -0,0 +1,162 @@
+"""
+Загрузка по частям: части в любом порядке, завершение, повтор завершения после сбоя S3 или БД,
+отмена и очистка брошенных загрузок.
+"""
+import asyncio
+import pytest
+from reportable_app.core.utils.exceptions import ValidationError
+from reportable_app.apps.files.exceptions import FileUploadError, UploadSessionNotFound
+from reportable_app.apps.files.repositories.files_cache import FileRedisRepository
+from reportable_app.apps.files.repositories.uploads_cache import UploadSessionRedisRepository
+from reportable_app.apps.files.schemas import UploadSessionCreateSchema
+from reportable_app.apps.files.services.file_managment_service import FileManagmentService
+from reportable_app.apps.files.services.resumable_upload import ResumableUploadService, UploadSweeper
+from .fakes import InMemoryFileRepository, InMemoryStorage
+
+PART_SIZE = 4
+BODY = b"0123456789"
+
+
+@pytest.fixture
+def uploads(redis_client):
+    files = InMemoryFileRepository()
+    storage = InMemoryStorage()
+    sessions = UploadSessionRedisRepository(redis_client, idle_timeout=60)
+    managment = FileManagmentService(files, FileRedisRepository(redis_client), storage, "files", 60)
+    service = ResumableUploadService(sessions, storage, managment, part_size=PART_SIZE, idle_timeout=60)
+    return service, sessions, files, storage
+
+
+async def start_upload(service: ResumableUploadService, body: bytes = BODY):
+    session = await service.initiate(UploadSessionCreateSchema(filename="book.xlsx", size=len(body)))
+    parts = [body[i:i + PART_SIZE] for i in range(0, len(body), PART_SIZE)]
+    # Части приходят в обратном порядке, вторая — дважды
+    for number in reversed(range(1, len(parts) + 1)):
+        await service.upload_part(session.upload_id, number, parts[number - 1])
+    await service.upload_part(session.upload_id, 2, parts[1])
+    return session
+
+
+async def test_parts_in_any_order_complete_into_one_file(uploads):
+    service, sessions, files, storage = uploads
+    session = await start_upload(service)
+
+    status = await service.get_status(session.upload_id)
+    assert [part.part_number for part in status.received_parts] == [1, 2, 3]
+    assert status.received_bytes == len(BODY)
+
+    created = await service.complete(session.upload_id)
+    assert created.id == session.file_id
+    assert created.size == len(BODY)
+    assert storage.objects[files.rows[created.id].path][0] == BODY
+    assert await sessions.get_session(session.upload_id) is None
+    with pytest.raises(UploadSessionNotFound):
+        await service.complete(session.upload_id)
+
+
+async def test_complete_rejects_missing_parts(uploads):
+    service, sessions, files, storage = uploads
+    session = await service.initiate(UploadSessionCreateSchema(filename="book.xlsx", size=len(BODY)))
+    await service.upload_part(session.upload_id, 1, BODY[:PART_SIZE])
+    await service.upload_part(session.upload_id, 3, BODY[2 * PART_SIZE:])
+
+    with pytest.raises(ValidationError):
+        await service.complete(session.upload_id)
+    assert (await service.get_status(session.upload_id)).received_bytes == PART_SIZE + 2
+
+
+async def test_part_of_wrong_size_is_rejected(uploads):
+    service, sessions, files, storage = uploads
+    session = await service.initiate(UploadSessionCreateSchema(filename="book.xlsx", size=len(BODY)))
+
+    with pytest.raises(ValidationError):
+        await service.upload_part(session.upload_id, 1, BODY[:PART_SIZE - 1])
+    with pytest.raises(ValidationError):
+        await service.upload_part(session.upload_id, 4, BODY[:PART_SIZE])
+
+
+async def test_complete_is_retried_after_storage_failure(uploads):
+    service, sessions, files, storage = uploads
+    session = await start_upload(service)
+    storage.fail_completes = 1
+
+    with pytest.raises(FileUploadError):
+        await service.complete(session.upload_id)
+    assert not files.rows
+
+    created = await service.complete(session.upload_id)
+    assert storage.objects[files.rows[created.id].path][0] == BODY
+
+
+async def test_complete_is_retried_after_database_failure(uploads):
+    service, sessions, files, storage = uploads
+    session = await start_upload(service)
+    files.fail_creates = 1
+
+    # Объект уже собран в S3, запись File не создана
+    with pytest.raises(ConnectionError):
+        await service.complete(session.upload_id)
+    assert not files.rows
+    assert await sessions.get_last_activity(session.upload_id) is not None
+
+    # Повтор регистрирует уже собранный объект
+    created = await service.complete(session.upload_id)
+    assert created.id == session.file_id
+    assert storage.objects[files.rows[created.id].path][0] == BODY
+    assert await sessions.get_session(session.upload_id) is None
+
+
+async def test_concurrent_completes_create_one_file(uploads):
+    service, sessions, files, storage = uploads
+    session = await start_upload(service)
+
+    results = await asyncio.gather(
+        service.complete(session.upload_id), service.complete(session.upload_id), return_exceptions=True
+    )
+    created = [result for result in results if not isinstance(result, BaseException)]
+    assert len(created) == 1
+    assert any(isinstance(result, UploadSessionNotFound) for result in results)
+    assert list(files.rows) == [session.file_id]
+
+
+async def test_abort_after_database_failure_deletes_unregistered_object(uploads):
+    service, sessions, files, storage = uploads
+    session = await start_upload(service)
+    files.fail_creates = 1
+    with pytest.raises(ConnectionError):
+        await service.complete(session.upload_id)
+
+    await service.abort(session.upload_id)
+    assert not storage.objects
+    assert await sessions.get_session(session.upload_id) is None
+
+
+async def test_abort_keeps_registered_object(uploads):
+    service, sessions, files, storage = uploads
+    session = await start_upload(service)
+    stored = await sessions.get_session(session.upload_id)
+    created = await service.complete(session.upload_id)
+
+    # Загрузка, которую очистка видит уже собранной и зарегистрированной: объект не трогаем
+    await sessions.create_session(stored)
+    await service.abort(session.upload_id)
+    assert files.rows[created.id].path in storage.objects
+
+
+async def test_sweeper_aborts_idle_upload_and_cleans_unregistered_object(uploads):
+    service, sessions, files, storage = uploads
+    idle = await start_upload(service)
+    assembled = await start_upload(service)
+    files.fail_creates = 1
+    with pytest.raises(ConnectionError):
+        await service.complete(assembled.upload_id)
+
+    async def is_registered(file_id):
+        return file_id in files.rows
+
+    sweeper = UploadSweeper(sessions, storage, idle_timeout=-1, interval=0, is_registered=is_registered)
+    assert await sweeper.sweep() == 2
+    assert not storage.uploads
+    assert not storage.objects
+    assert await sessions.get_session(idle.upload_id) is None
+    assert await sessions.get_session(assembled.upload_id) is None
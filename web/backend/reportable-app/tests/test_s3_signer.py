@@ -0,0 +1,62 @@
+"""
+Локальная подпись presigned-ссылок S3: ссылки должны совпадать с теми, что строит botocore.
+"""
+import datetime
+import pytest
+import botocore.auth
+import botocore.session
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+from botocore.config import Config
+from reportable_app.core.clients.s3_signer import S3UrlSigner
+
+ENDPOINT = "http://localhost:9000"
+BUCKET = "reportable"
+# 2024-02-01 23:59:30 UTC: окно подписи около полуночи
+NOW = 1706831970
+
+
+@pytest.fixture
+def botocore_client(monkeypatch):
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.datetime.fromtimestamp(NOW, datetime.timezone.utc).replace(tzinfo=None)
+
+    monkeypatch.setattr(botocore.auth, "datetime", SimpleNamespace(datetime=FrozenDatetime))
+    return botocore.session.get_session().create_client(
+        "s3",
+        endpoint_url=ENDPOINT,
+        aws_access_key_id="minioadmin",
+        aws_secret_access_key="minio/secret+key",
+        region_name="us-east-1",
+        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+    )
+
+
+@pytest.mark.parametrize("key", [
+    "files/book.xlsx",
+    "files/analysis/Отчёт за 01.02.2024 (копия).xlsx",
+    "files/a+b=c&d~e!'()*.xlsx",
+])
+def test_local_signature_matches_botocore(botocore_client, key):
+    signer = S3UrlSigner(ENDPOINT, "minioadmin", "minio/secret+key")
+    expected = botocore_client.generate_presigned_url(
+        "get_object", Params={"Bucket": BUCKET, "Key": key}, ExpiresIn=1800
+    )
+
+    assert signer.sign(BUCKET, key, expires_in=1800, now=NOW) == expected
+
+
+def test_time_bucket_shares_url_within_window_and_extends_expiry():
+    signer = S3UrlSigner(ENDPOINT, "minioadmin", "minio/secret+key", time_bucket=600)
+
+    first, second = signer.sign_many(BUCKET, ["files/book.xlsx"] * 2, expires_in=1800, now=NOW)
+    later = signer.sign(BUCKET, "files/book.xlsx", expires_in=1800, now=NOW + 20)
+    next_window = signer.sign(BUCKET, "files/book.xlsx", expires_in=1800, now=NOW + 60)
+
+    assert first == second == later != next_window
+    query = parse_qs(urlsplit(first).query)
+    assert query["X-Amz-Date"] == ["20240201T235000Z"]
+    assert query["X-Amz-Expires"] == ["2400"]
+    assert parse_qs(urlsplit(next_window).query)["X-Amz-Date"] == ["20240202T000000Z"]
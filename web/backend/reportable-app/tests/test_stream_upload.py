@@ -0,0 +1,144 @@
+"""
+Потоковая загрузка файла: разбор multipart-тела без буферизации и отправка в S3 частями
+с ограниченным числом одновременно отправляемых частей.
+"""
+import asyncio
+import hashlib
+import pytest
+from starlette.requests import Request
+from reportable_app.apps.files.services.file_service import S3FileService
+from reportable_app.apps.files.services.upload_stream import DigestingStream, open_multipart_file
+
+PART_SIZE = 4
+BOUNDARY = "reportable-boundary"
+
+
+class MultipartStorage(S3FileService):
+    """S3FileService, у которого запросы multipart upload выполняются в памяти"""
+
+    def __init__(self, concurrency: int = 2, fail_part: int | None = None):
+        super().__init__(None, "files", "", "", multipart_part_size=PART_SIZE, multipart_concurrency=concurrency)
+        self.fail_part = fail_part
+        # Пока событие не установлено, отправка частей (кроме fail_part) не завершается
+        self.released = asyncio.Event()
+        self.parts: dict[int, bytes] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed: list[tuple[int, str]] | None = None
+        self.aborted = False
+
+    async def _ensure_bucket_exists(self) -> None:
+        pass
+
+    async def create_multipart_upload(self, path: str, content_type: str = "application/octet-stream") -> str:
+        return "upload-1"
+
+    async def upload_part(self, path: str, upload_id: str, part_number: int, body: bytes) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if part_number == self.fail_part:
+                raise ConnectionError("part upload failed")
+            await self.released.wait()
+            self.parts[part_number] = body
+            return f"etag-{part_number}"
+        finally:
+            self.in_flight -= 1
+
+    async def complete_multipart_upload(self, path: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        self.completed = parts
+
+    async def abort_multipart_upload(self, path: str, upload_id: str) -> None:
+        self.aborted = True
+
+
+class CountingChunks:
+    """Входной поток из count кусков по PART_SIZE байт; read — сколько байт уже прочитано"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.read = 0
+
+    async def __aiter__(self):
+        for i in range(self.count):
+            chunk = bytes([i % 256]) * PART_SIZE
+            self.read += len(chunk)
+            yield chunk
+
+
+def make_request(body: bytes, piece: int = 7, content_type: str = f"multipart/form-data; boundary={BOUNDARY}") -> Request:
+    """Запрос, тело которого приходит кусками по piece байт"""
+    pieces = [body[i:i + piece] for i in range(0, len(body), piece)]
+
+    async def receive():
+        return {"type": "http.request", "body": pieces.pop(0) if pieces else b"", "more_body": bool(pieces)}
+
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def multipart_body(*parts: tuple[str, dict[str, str], bytes]) -> bytes:
+    body = b""
+    for disposition, headers, content in parts:
+        body += f"--{BOUNDARY}\r\nContent-Disposition: form-data; {disposition}\r\n".encode()
+        body += "".join(f"{name}: {value}\r\n" for name, value in headers.items()).encode()
+        body += b"\r\n" + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def test_reading_pauses_while_all_part_slots_are_busy():
+    storage = MultipartStorage(concurrency=2)
+    chunks = CountingChunks(50)
+    upload = asyncio.create_task(storage.upload_stream("files/book.xlsx", chunks))
+    await asyncio.sleep(0.05)
+
+    # Две части отправляются, третья ждёт слота — дальше поток не читается
+    assert storage.in_flight == 2
+    assert chunks.read <= (storage.multipart_concurrency + 2) * PART_SIZE
+
+    storage.released.set()
+    assert await upload == 50 * PART_SIZE
+    assert storage.max_in_flight == 2
+    assert storage.completed == [(i, f"etag-{i}") for i in range(1, 51)]
+    assert storage.parts[50] == bytes([49]) * PART_SIZE
+
+
+async def test_part_failure_aborts_upload_without_leaking_tasks():
+    storage = MultipartStorage(concurrency=2, fail_part=2)
+    chunks = CountingChunks(50)
+    tasks_before = asyncio.all_tasks()
+
+    # Без отмены зависшей части загрузка ждала бы её бесконечно
+    with pytest.raises(ConnectionError):
+        await asyncio.wait_for(storage.upload_stream("files/book.xlsx", chunks), timeout=1)
+
+    assert storage.aborted and storage.completed is None
+    # Загрузка прервалась, не дочитав поток, и отменила часть, которая ещё отправлялась
+    assert chunks.read < 50 * PART_SIZE
+    assert storage.in_flight == 0
+    assert asyncio.all_tasks() == tasks_before
+
+
+async def test_file_field_after_other_form_fields_is_streamed():
+    content = b"PK\x03\x04" + bytes(range(256)) * 4
+    body = multipart_body(
+        ('name="comment"', {}, "Отчёт за февраль".encode()),
+        ('name="tags"', {}, b"krs"),
+        ('name="file"; filename="book.xlsx"', {"Content-Type": "application/vnd.ms-excel"}, content),
+    )
+
+    file = await open_multipart_file(make_request(body), "file")
+
+    assert file.filename == "book.xlsx"
+    assert file.content_type == "application/vnd.ms-excel"
+    stream = DigestingStream(file.chunks)
+    assert b"".join([chunk async for chunk in stream]) == content
+    assert stream.size == len(content)
+    assert stream.sha256 == hashlib.sha256(content).hexdigest()
+
+
+async def test_missing_file_field_and_other_content_types_are_ignored():
+    body = multipart_body(('name="comment"', {}, b"no file"))
+
+    assert await open_multipart_file(make_request(body), "file") is None
+    assert await open_multipart_file(make_request(b"{}", content_type="application/json"), "file") is None
@@ -5,6 +5,9 @@ import ResultTable from "../components/ResultTable";
 import { motion } from "framer-motion";
 import "../styles/index.pcss";
 
+const POLL_INTERVAL = 2000;
+const PENDING_STATUSES = ["queued", "running"];
+
 export default function ResultPage() {
   const { id } = useParams();
   const navigate = useNavigate();
@@ -15,18 +18,34 @@ export default function ResultPage() {
   const [fileLoading, setFileLoading] = useState(false);
 
   useEffect(() => {
+    let timer = null;
+    let cancelled = false;
+
     const loadData = async () => {
       try {
         const res = await analyzerApi.getResult(id);
-        if (res.error_type) setError(true);
-        else setData(res);
+        if (cancelled) return;
+        if (res.error_type) {
+          setError(true);
+        } else {
+          setData(res);
+          // Пока задача в очереди или выполняется — опрашиваем сервер
+          if (PENDING_STATUSES.includes(res.status)) {
+            timer = setTimeout(loadData, POLL_INTERVAL);
+          }
+        }
       } catch {
-        setError(true);
+        if (!cancelled) setError(true);
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
     loadData();
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [id]);
 
   const handleOpenFile = async () => {
@@ -95,6 +114,21 @@ export default function ResultPage() {
       </motion.div>
     );
 
+  if (PENDING_STATUSES.includes(data.status))
+    return (
+      <div className="center-message">
+        {data.status === "queued" ? "Файл в очереди на анализ..." : "Идёт анализ..."}
+        {data.total_reports ? ` Обработано ${data.processed_reports} из ${data.total_reports}` : ""}
+      </div>
+    );
+
+  if (data.status === "failed")
+    return (
+      <motion.div className="center-message error" initial={{ opacity: 0 }} animate={{ opacity: 1 }}>
+        ❌ Ошибка анализа{data.error ? `: ${data.error}` : ""}
+      </motion.div>
+    );
+
   return (
     <motion.div className="result-container" initial={{ opacity: 0 }} animate={{ opacity: 1 }}>
       <h2 className="result-title">Результат анализа</h2>
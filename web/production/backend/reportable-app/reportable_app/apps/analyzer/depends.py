@@ -1,11 +1,77 @@
+import redis.asyncio as redis
+from typing import Optional
+from openai import AsyncOpenAI
 from fastapi import Depends
+from ...core.redis import get_redis_client
+from ...core.clients.llm_client import get_llm_client
 from ...settings import Settings, get_settings
+from .repositories.llm_cache import LLMResponseRedisRepositoryProtocol, LLMResponseRedisRepository
 from .services.analyzer import AnalyzerServiceProtocol, AnalyzerService
+from .services.limiter import AdaptiveLLMLimiter, get_llm_limiter
+from .services.hedging import LLMRequestPolicy, get_llm_request_policy
+from .services.cascade import get_cascade_stats
+from .services.excel_parser import ExcelParserProtocol, get_excel_parser
+from .services.prompt_registry import PromptRegistry, get_prompt_registry
+from .services.rules import get_rule_stats
+from .services.compaction import ReportCompactor, get_compaction_stats
 
-def get_analyzer_service(settings: Settings = Depends(get_settings)) -> AnalyzerServiceProtocol:
+def get_llm_cache_repository(
+    redis_client: redis.Redis = Depends(get_redis_client),
+    settings: Settings = Depends(get_settings),
+) -> LLMResponseRedisRepositoryProtocol:
+    return LLMResponseRedisRepository(
+        redis_client=redis_client,
+        ttl=settings.llm.cache_ttl,
+        max_entries=settings.llm.cache_max_entries,
+    )
+
+def get_report_compactor(settings: Settings = Depends(get_settings)) -> Optional[ReportCompactor]:
+    if not settings.compaction.enabled:
+        return None
+    return ReportCompactor(
+        dedupe=settings.compaction.dedupe,
+        strip_boilerplate=settings.compaction.strip_boilerplate,
+        boilerplate_share=settings.compaction.boilerplate_share,
+        boilerplate_min_sheets=settings.compaction.boilerplate_min_sheets,
+        boilerplate_min_chars=settings.compaction.boilerplate_min_chars,
+    )
+
+def get_analyzer_service(
+    settings: Settings = Depends(get_settings),
+    response_cache: LLMResponseRedisRepositoryProtocol = Depends(get_llm_cache_repository),
+    limiter: AdaptiveLLMLimiter = Depends(get_llm_limiter),
+    request_policy: LLMRequestPolicy = Depends(get_llm_request_policy),
+    excel_parser: ExcelParserProtocol = Depends(get_excel_parser),
+    client: AsyncOpenAI = Depends(get_llm_client),
+    prompt_registry: PromptRegistry = Depends(get_prompt_registry),
+) -> AnalyzerServiceProtocol:
     return AnalyzerService(
-        api_key=settings.llm.api_key,
+        client=client,
         model_url=settings.llm.model_url,
-        prompts_path=settings.llm.prompts_path,
-        schema_path=settings.llm.schema_path   
+        prompt_config=prompt_registry.current(),
+        response_cache=response_cache if settings.llm.cache_enabled else None,
+        limiter=limiter,
+        excel_parser=excel_parser,
+        batch_enabled=settings.llm.batch_enabled,
+        batch_short_report_tokens=settings.llm.batch_short_report_tokens,
+        batch_token_budget=settings.llm.batch_token_budget,
+        batch_max_reports=settings.llm.batch_max_reports,
+        rules_enabled=settings.llm.rules_enabled,
+        rules_verify_ratio=settings.llm.rules_verify_ratio,
+        rules_min_tokens=settings.llm.rules_min_tokens,
+        rule_stats=get_rule_stats(),
+        compactor=get_report_compactor(settings),
+        compaction_stats=get_compaction_stats(),
+        tsv=settings.compaction.tsv,
+        longest_first=settings.llm.longest_first,
+        request_policy=request_policy,
+        models=settings.llm.models,
+        cascade_max_tokens=settings.llm.cascade_max_tokens,
+        cascade_stats=get_cascade_stats(),
+        chunking_enabled=settings.llm.chunking_enabled,
+        chunk_max_tokens=settings.llm.chunk_max_tokens,
+        header_enabled=settings.llm.header_enabled,
+        header_max_tokens=settings.llm.header_max_tokens,
+        answer_tokens_min=settings.llm.answer_tokens_min,
+        answer_tokens_max=settings.llm.answer_tokens_max,
     )
@@ -0,0 +1,29 @@
+from fastapi import status
+from typing import Any
+from shared.exceptions import CoreException
+
+class ExcelParserBusyError(CoreException):
+    """
+    Ошибка, если перед пулом разбора Excel-книг уже ждёт слишком много задач.
+    """
+    def __init__(
+        self,
+        max_waiting: int,
+        headers: dict[str, str] | None = None,
+        extras: dict[str, Any] | None = None
+    ) -> None:
+        detail = 'Excel parser is overloaded, try again later.'
+
+        # Подготовка дополнительных данных
+        extras_data = extras or {}
+        extras_data["max_waiting"] = max_waiting
+
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            error_code="EXCEL_PARSER_BUSY",
+            error_type="ExcelParserBusy",
+            extras=extras_data,
+            headers=headers or {"Retry-After": "30"}
+        )
+        self.max_waiting = max_waiting
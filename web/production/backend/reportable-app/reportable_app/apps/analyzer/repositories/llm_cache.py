@@ -0,0 +1,82 @@
+import time
+import redis.asyncio as redis
+from typing import Optional
+from typing_extensions import Self
+from ....core.repositories.base_redis_repository import BaseRedisRepository
+
+class LLMResponseRedisRepositoryProtocol(BaseRedisRepository[str]):
+    async def get_response(self: Self, key: str) -> Optional[str]:
+        ...
+
+    async def set_response(self: Self, key: str, response: str) -> None:
+        ...
+
+    async def stats(self: Self) -> dict:
+        ...
+
+class LLMResponseRedisRepository(LLMResponseRedisRepositoryProtocol):
+    """
+    Кэш ответов LLM по отдельным отчётам.
+    Записи живут ttl секунд, при превышении max_entries вытесняются самые давно использованные.
+    """
+
+    INDEX_KEY = "index"
+    HITS_KEY = "stats:hits"
+    MISSES_KEY = "stats:misses"
+
+    def __init__(self: Self, redis_client: redis.Redis, ttl: int, max_entries: int):
+        super().__init__(redis_client, prefix="llm_cache")
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    async def get_response(self: Self, key: str) -> Optional[str]:
+        """Возвращает закэшированный ответ и обновляет счётчики попаданий"""
+        response = await self.get(key)
+
+        pipe = self.redis_client.pipeline()
+        if response is None:
+            pipe.incr(self._make_key(self.MISSES_KEY))
+        else:
+            pipe.incr(self._make_key(self.HITS_KEY))
+            # Отмечаем использование для вытеснения по давности
+            pipe.zadd(self._make_key(self.INDEX_KEY), {key: time.time()})
+        await pipe.execute()
+
+        return response
+
+    async def set_response(self: Self, key: str, response: str) -> None:
+        """Сохраняет ответ и вытесняет лишние записи"""
+        now = time.time()
+        index_key = self._make_key(self.INDEX_KEY)
+
+        pipe = self.redis_client.pipeline()
+        pipe.setex(self._make_key(key), self.ttl, response)
+        pipe.zadd(index_key, {key: now})
+        # Записи, у которых истёк TTL, уже удалены Redis — убираем их из индекса
+        pipe.zremrangebyscore(index_key, "-inf", now - self.ttl)
+        pipe.zcard(index_key)
+        *_, size = await pipe.execute()
+
+        excess = size - self.max_entries
+        if excess > 0:
+            evicted = await self.redis_client.zpopmin(index_key, excess)
+            if evicted:
+                await self.redis_client.delete(*[self._make_key(self._deserialize(k)) for k, _ in evicted])
+
+    async def stats(self: Self) -> dict:
+        pipe = self.redis_client.pipeline()
+        pipe.get(self._make_key(self.HITS_KEY))
+        pipe.get(self._make_key(self.MISSES_KEY))
+        pipe.zcard(self._make_key(self.INDEX_KEY))
+        hits, misses, entries = await pipe.execute()
+
+        hits, misses = int(hits or 0), int(misses or 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
@@ -0,0 +1,53 @@
+from typing import Optional
+from typing_extensions import Self
+from .validation import ValidationIssue
+
+
+class CascadeStats:
+    """
+    Маршрутизация запросов по каскаду моделей: сколько ответов каждой модели принято,
+    сколько отправлено дальше по каскаду и по каким причинам (json, schema, sanity, error).
+    """
+
+    def __init__(self: Self):
+        self._models: dict[str, dict] = {}
+        self._routed_long = 0
+
+    def record_long(self: Self) -> None:
+        """Запрос длиннее порога отправлен сразу последней модели"""
+        self._routed_long += 1
+
+    def record(self: Self, model: str, outcome: str, issues: Optional[list[ValidationIssue]] = None) -> None:
+        counters = self._models.setdefault(
+            model, {"requests": 0, "accepted": 0, "escalated": 0, "invalid": 0, "failed": 0, "reasons": {}}
+        )
+        counters["requests"] += 1
+        counters[outcome] += 1
+        for kind in {issue.kind for issue in issues or []}:
+            counters["reasons"][kind] = counters["reasons"].get(kind, 0) + 1
+
+    def stats(self: Self) -> dict:
+        return {
+            "routed_long": self._routed_long,
+            "models": [
+                {
+                    "model": model,
+                    **counters,
+                    "acceptance": counters["accepted"] / counters["requests"] if counters["requests"] else None,
+                }
+                for model, counters in self._models.items()
+            ],
+        }
+
+
+# Глобальная статистика каскада (одна на процесс)
+_cascade_stats: Optional[CascadeStats] = None
+
+
+def get_cascade_stats() -> CascadeStats:
+    """Возвращает статистику маршрутизации по каскаду моделей"""
+    global _cascade_stats
+
+    if _cascade_stats is None:
+        _cascade_stats = CascadeStats()
+    return _cascade_stats
@@ -0,0 +1,154 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from typing_extensions import Self
+from ....settings import settings
+from .batching import make_batch_schema
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PromptConfig:
+    """Снимок промпта и схемы: один анализ целиком выполняется с одной версией"""
+    system_prompt: str
+    json_schema: dict
+    batch_json_schema: dict
+    prompt_version: str
+    schema_version: str
+
+
+def make_version(data: dict) -> str:
+    """Версия конфигурации — короткий хэш её канонического JSON-представления"""
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class PromptRegistry:
+    """
+    Реестр промпта и JSON Schema.
+
+    Файлы читаются один раз при создании и затем только при изменении (mtime/размер),
+    проверку выполняет фоновая задача раз в check_interval секунд.
+    Новая версия подменяет старую целиком; если файл битый, остаётся прежняя версия.
+    """
+
+    def __init__(self: Self, prompts_path: str, schema_path: str, check_interval: float = 5.0):
+        self.prompts_path = prompts_path
+        self.schema_path = schema_path
+        self.check_interval = check_interval
+
+        self._stamp = self._file_stamp()
+        self._failed_stamp: Optional[tuple] = None
+        self._config = self._load()
+        self._task: Optional[asyncio.Task] = None
+        self._reloads = 0
+
+    def current(self: Self) -> PromptConfig:
+        return self._config
+
+    def reload_if_changed(self: Self) -> bool:
+        stamp = self._file_stamp()
+        if stamp in (self._stamp, self._failed_stamp):
+            return False
+
+        try:
+            config = self._load()
+        except Exception as e:
+            # Повторно не читаем, пока файлы не изменятся ещё раз
+            self._failed_stamp = stamp
+            logger.error(f"Failed to reload prompts, keeping version {self._config.prompt_version}: {e}")
+            return False
+
+        self._stamp = stamp
+        if (config.prompt_version, config.schema_version) != (self._config.prompt_version, self._config.schema_version):
+            self._config = config
+            self._reloads += 1
+            logger.info(f"Prompts reloaded: prompt {config.prompt_version}, schema {config.schema_version}")
+        return True
+
+    async def start(self: Self) -> None:
+        if self._task is None and self.check_interval > 0:
+            self._task = asyncio.create_task(self._watch(), name="prompt-registry-watcher")
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self: Self) -> dict:
+        return {
+            "prompt_version": self._config.prompt_version,
+            "schema_version": self._config.schema_version,
+            "reloads": self._reloads,
+        }
+
+    async def _watch(self: Self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                logger.error(f"Prompt registry check failed: {e}")
+
+    def _file_stamp(self: Self) -> tuple:
+        stamp = []
+        for path in (self.prompts_path, self.schema_path):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _load(self: Self) -> PromptConfig:
+        with open(self.prompts_path, "r", encoding="utf-8") as f:
+            prompts = json.load(f)
+        with open(self.schema_path, "r", encoding="utf-8") as f:
+            json_schema = json.load(f)
+
+        return PromptConfig(
+            system_prompt=prompts["system_prompt"],
+            json_schema=json_schema,
+            batch_json_schema=make_batch_schema(json_schema),
+            prompt_version=make_version(prompts),
+            schema_version=make_version(json_schema),
+        )
+
+
+# Глобальный экземпляр реестра (один на процесс)
+_prompt_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Возвращает реестр промптов, при первом обращении загружает файлы"""
+    global _prompt_registry
+
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry(
+            prompts_path=settings.llm.prompts_path,
+            schema_path=settings.llm.schema_path,
+            check_interval=settings.llm.prompts_reload_interval,
+        )
+    return _prompt_registry
+
+
+async def start_prompt_registry() -> PromptRegistry:
+    """Загружает промпты и запускает отслеживание изменений файлов"""
+    registry = get_prompt_registry()
+    await registry.start()
+    return registry
+
+
+async def stop_prompt_registry() -> None:
+    """Останавливает отслеживание изменений файлов"""
+    global _prompt_registry
+    if _prompt_registry is not None:
+        await _prompt_registry.stop()
+        _prompt_registry = None
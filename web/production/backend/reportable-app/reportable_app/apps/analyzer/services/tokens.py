@@ -0,0 +1,15 @@
+import math
+import re
+
+
+# Грубая оценка для русского текста: около 3 символов на токен у BPE-токенизаторов,
+# плюс отдельный токен почти на каждый знак препинания и перевод строки
+_CHARS_PER_TOKEN = 3.0
+_PUNCTUATION = re.compile(r"[^\w\s]|\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценивает число токенов в тексте без обращения к токенизатору модели"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / _CHARS_PER_TOKEN + len(_PUNCTUATION.findall(text)) * 0.5)
@@ -0,0 +1,29 @@
+from fastapi import status
+from typing import Any
+from shared.exceptions import CoreException
+
+class AnalysisQueueFullError(CoreException):
+    """
+    Ошибка, если очередь задач анализа переполнена.
+    """
+    def __init__(
+        self,
+        max_queue_size: int,
+        headers: dict[str, str] | None = None,
+        extras: dict[str, Any] | None = None
+    ) -> None:
+        detail = 'Analysis queue is full, try again later.'
+
+        # Подготовка дополнительных данных
+        extras_data = extras or {}
+        extras_data["max_queue_size"] = max_queue_size
+
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            error_code="ANALYSIS_QUEUE_FULL",
+            error_type="AnalysisQueueFull",
+            extras=extras_data,
+            headers=headers or {"Retry-After": "30"}
+        )
+        self.max_queue_size = max_queue_size
@@ -1,3 +1,9 @@
+import uuid
+import sqlalchemy as sa
+from datetime import datetime
+from typing import Optional
+from typing_extensions import Self
+from ....core.enums import AnalysisStatus
 from ....core.repositories.base_repository import BaseRepositoryImpl
 from ..models import FileProcessingResult
 from ..schemas import FileProcessingResultCreateSchema, FileProcessingResultReadSchema, FileProcessingResultUpdateSchema
@@ -10,7 +16,114 @@ class FileProcessingRepositoryProtocol(
         FileProcessingResultUpdateSchema
     ]
     ):
-    pass
+    async def get_by_fingerprint(
+        self: Self,
+        content_hash: str,
+        model_url: str,
+        prompt_version: str,
+        schema_version: str,
+    ) -> Optional[FileProcessingResultReadSchema]:
+        ...
+
+    async def get_in_flight_by_fingerprint(
+        self: Self,
+        content_hash: str,
+        model_url: str,
+        prompt_version: str,
+        schema_version: str,
+        limit: int = 5,
+    ) -> list[FileProcessingResultReadSchema]:
+        ...
+
+    async def get_by_input_file_id(self: Self, input_file_id: uuid.UUID) -> Optional[FileProcessingResultReadSchema]:
+        ...
+
+    async def get_in_flight(self: Self, created_before: datetime, limit: int = 100) -> list[FileProcessingResultReadSchema]:
+        ...
 
 class FileProcessingRepository(FileProcessingRepositoryProtocol):
-    pass
\ No newline at end of file
+    async def get_by_fingerprint(
+        self: Self,
+        content_hash: str,
+        model_url: str,
+        prompt_version: str,
+        schema_version: str,
+    ) -> Optional[FileProcessingResultReadSchema]:
+        """Последний готовый результат анализа того же содержимого с той же моделью, промптом и схемой"""
+        async with self.session as s:
+            stmt = (
+                sa.select(self.model_type)
+                .where(
+                    *self._fingerprint(content_hash, model_url, prompt_version, schema_version),
+                    self.model_type.status == AnalysisStatus.DONE,
+                )
+                .order_by(self.model_type.created_at.desc())
+                .limit(1)
+            )
+            model = (await s.execute(stmt)).scalar_one_or_none()
+
+            if model is None:
+                return None
+
+            return self.read_schema_type.model_validate(model, from_attributes=True)
+
+    async def get_in_flight_by_fingerprint(
+        self: Self,
+        content_hash: str,
+        model_url: str,
+        prompt_version: str,
+        schema_version: str,
+        limit: int = 5,
+    ) -> list[FileProcessingResultReadSchema]:
+        """
+        Задачи queued/running для того же содержимого, новые первыми.
+        Выполняется ли задача на самом деле, знает только очередь (аренда задачи).
+        """
+        async with self.session as s:
+            stmt = (
+                sa.select(self.model_type)
+                .where(
+                    *self._fingerprint(content_hash, model_url, prompt_version, schema_version),
+                    self.model_type.status.in_([AnalysisStatus.QUEUED, AnalysisStatus.RUNNING]),
+                )
+                .order_by(self.model_type.created_at.desc())
+                .limit(limit)
+            )
+            models = (await s.execute(stmt)).scalars().all()
+
+            return [self.read_schema_type.model_validate(model, from_attributes=True) for model in models]
+
+    async def get_by_input_file_id(self: Self, input_file_id: uuid.UUID) -> Optional[FileProcessingResultReadSchema]:
+        """Задача анализа файла (у файла не больше одной задачи)"""
+        async with self.session as s:
+            stmt = sa.select(self.model_type).where(self.model_type.input_file_id == input_file_id)
+            model = (await s.execute(stmt)).scalar_one_or_none()
+
+            if model is None:
+                return None
+
+            return self.read_schema_type.model_validate(model, from_attributes=True)
+
+    async def get_in_flight(self: Self, created_before: datetime, limit: int = 100) -> list[FileProcessingResultReadSchema]:
+        """Задачи в статусах queued и running, созданные раньше created_before, — старые первыми"""
+        async with self.session as s:
+            stmt = (
+                sa.select(self.model_type)
+                .where(
+                    self.model_type.status.in_([AnalysisStatus.QUEUED, AnalysisStatus.RUNNING]),
+                    self.model_type.created_at < created_before,
+                )
+                .order_by(self.model_type.created_at)
+                .limit(limit)
+            )
+            models = (await s.execute(stmt)).scalars().all()
+
+            return [self.read_schema_type.model_validate(model, from_attributes=True) for model in models]
+
+    def _fingerprint(self: Self, content_hash: str, model_url: str, prompt_version: str, schema_version: str) -> list:
+        return [
+            self.model_type.content_hash == content_hash,
+            self.model_type.model_url == model_url,
+            self.model_type.prompt_version == prompt_version,
+            self.model_type.schema_version == schema_version,
+        ]
@@ -1,27 +1,69 @@
 import uuid
-from fastapi import APIRouter, Depends, Request, HTTPException, Path
-from .schemas import FileProcessingResultReadSchema
+from fastapi import APIRouter, Depends, Request, HTTPException, Path, Query
+from ...settings import Settings, get_settings
+from ..files.services.upload_stream import open_multipart_file
+from .schemas import FileProcessingResultReadSchema, AnalysisTelemetryPercentilesSchema
 from .use_case.create import CreateFileAnalysisUseCaseProtocol
+from .use_case.create_by_file import CreateFileAnalysisByFileUseCaseProtocol
+from .use_case.confirm_direct_upload import ConfirmDirectUploadAndAnalyzeUseCaseProtocol
 from .use_case.get import GetFileAnalysisUseCaseProtocol
+from .use_case.telemetry import GetTelemetryPercentilesUseCaseProtocol
 from .depends import (
     get_create_file_analysis_use_case,
-    get_get_file_analysis_use_case
+    get_create_file_analysis_by_file_use_case,
+    get_confirm_direct_upload_and_analyze_use_case,
+    get_get_file_analysis_use_case,
+    get_telemetry_percentiles_use_case,
 )
 router = APIRouter(prefix='/api/analyzer', tags=['Analyzer'])
 
 
-@router.post('/analyze/', response_model=FileProcessingResultReadSchema, status_code=201)
+@router.post('/analyze/', response_model=FileProcessingResultReadSchema, status_code=202)
 async def analyze_file(
     request: Request,
-    use_case: CreateFileAnalysisUseCaseProtocol = Depends(get_create_file_analysis_use_case)
+    force: bool = Query(False, description="Re-run the analysis even if the same file was already analyzed"),
+    use_case: CreateFileAnalysisUseCaseProtocol = Depends(get_create_file_analysis_use_case),
+    settings: Settings = Depends(get_settings),
 ) -> FileProcessingResultReadSchema:
-    form = await request.form()
-    file = form.get("file") 
+    if settings.minio.streaming_upload:
+        # Файл читается из тела запроса по частям и сразу уходит в S3
+        file = await open_multipart_file(request, "file")
+    else:
+        form = await request.form()
+        file = form.get("file")
 
     if not file:
         raise HTTPException(status_code=400, detail="File is required")
 
-    return await use_case(file)
+    # Анализ выполняется в фоне, статус и прогресс доступны по GET /api/analyzer/{task_id}
+    return await use_case(file, force=force)
+
+
+@router.post('/analyze/{file_id}', response_model=FileProcessingResultReadSchema, status_code=202)
+async def analyze_uploaded_file(
+    file_id: uuid.UUID = Path(..., description="ID of an already uploaded file"),
+    use_case: CreateFileAnalysisByFileUseCaseProtocol = Depends(get_create_file_analysis_by_file_use_case)
+) -> FileProcessingResultReadSchema:
+    # Файл загружен заранее, например по частям через /api/files/uploads/
+    return await use_case(file_id)
+
+
+@router.post('/direct-uploads/{file_id}/confirm', response_model=FileProcessingResultReadSchema, status_code=202)
+async def confirm_direct_upload_and_analyze(
+    file_id: uuid.UUID = Path(..., description="File ID issued by POST /api/files/direct-uploads/"),
+    use_case: ConfirmDirectUploadAndAnalyzeUseCaseProtocol = Depends(get_confirm_direct_upload_and_analyze_use_case)
+) -> FileProcessingResultReadSchema:
+    # Файл загружен браузером напрямую в хранилище: подтверждаем загрузку и ставим анализ в очередь
+    return await use_case(file_id)
+
+
+@router.get('/telemetry/percentiles', response_model=AnalysisTelemetryPercentilesSchema)
+async def get_telemetry_percentiles(
+    window_minutes: int = Query(60, ge=1, le=60 * 24 * 30, description="Time window in minutes"),
+    use_case: GetTelemetryPercentilesUseCaseProtocol = Depends(get_telemetry_percentiles_use_case)
+) -> AnalysisTelemetryPercentilesSchema:
+    # Длительности стадий анализа (секунды) за последние window_minutes минут
+    return await use_case(window_minutes)
 
 
 @router.get('/{task_id}', response_model=FileProcessingResultReadSchema)
@@ -0,0 +1,23 @@
+import uuid
+from typing_extensions import Self
+from ....core.use_cases import UseCaseProtocol
+from ...files.services.direct_upload import DirectUploadServiceProtocol
+from ..services.file_analizator import FileAnalizatorServiceProtocol
+from ..schemas import FileProcessingResultReadSchema
+
+
+class ConfirmDirectUploadAndAnalyzeUseCaseProtocol(UseCaseProtocol[FileProcessingResultReadSchema]):
+
+    async def __call__(self: Self, file_id: uuid.UUID) -> FileProcessingResultReadSchema:
+        ...
+
+
+class ConfirmDirectUploadAndAnalyzeUseCase(ConfirmDirectUploadAndAnalyzeUseCaseProtocol):
+
+    def __init__(self: Self, direct_upload_service: DirectUploadServiceProtocol, file_service: FileAnalizatorServiceProtocol):
+        self.direct_upload_service = direct_upload_service
+        self.file_service = file_service
+
+    async def __call__(self: Self, file_id: uuid.UUID) -> FileProcessingResultReadSchema:
+        created_file = await self.direct_upload_service.confirm(file_id)
+        return await self.file_service.analyze_file(created_file.id)
\ No newline at end of file
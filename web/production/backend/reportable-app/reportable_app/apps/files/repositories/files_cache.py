@@ -1,11 +1,105 @@
 import redis.asyncio as redis
+from typing import Any, Callable, Dict, List, Optional
+from typing_extensions import Self
+from ....core.metrics import record_cache_lookup
 from ....core.repositories.base_redis_repository import BaseRedisRepository
+from ....core.repositories.local_cache import LocalTTLCache, CacheInvalidationBus
 
 class FileRedisRepositoryProtocol(BaseRedisRepository[str]):
-    pass
+    async def get_decoded(self: Self, key: str, decode: Callable[[str], Any]) -> Optional[Any]:
+        ...
 
 class FileRedisRepository(FileRedisRepositoryProtocol):
-    """Репозиторий для работы с файлами"""
+    """
+    Репозиторий для работы с файлами.
 
-    def __init__(self, redis_client: redis.Redis):
-        super().__init__(redis_client, prefix="files")
\ No newline at end of file
+    С local (и bus) становится двухуровневым: чтения сначала идут в кэш процесса, Redis — только
+    при промахе. Удаление ключа в Redis в том же запросе публикуется в bus, и остальные процессы
+    выбрасывают его из своих локальных кэшей.
+    """
+
+    def __init__(self: Self, redis_client: redis.Redis,
+                 local: Optional[LocalTTLCache] = None,
+                 bus: Optional[CacheInvalidationBus] = None):
+        super().__init__(redis_client, prefix="files")
+        self.local = local
+        self.bus = bus
+
+    async def get(self: Self, key: str) -> Optional[str]:
+        if self.local is None:
+            return await super().get(key)
+
+        entry = self.local.get(key)
+        if entry is not None:
+            record_cache_lookup(self.local.name, hits=1, misses=0)
+            return entry.raw
+        record_cache_lookup(self.local.name, hits=0, misses=1)
+
+        generation = self.local.generation
+        value = await super().get(key)
+        if value is not None:
+            self.local.set(key, value, generation=generation)
+        return value
+
+    async def get_decoded(self: Self, key: str, decode: Callable[[str], Any]) -> Optional[Any]:
+        """
+        Значение, разобранное функцией decode. Разобранное значение тоже хранится в кэше процесса,
+        так что повторные чтения обходятся без JSON и валидации; изменять его нельзя.
+        """
+        generation = None
+        if self.local is not None:
+            entry = self.local.get(key)
+            if entry is not None and entry.decoded is not None:
+                record_cache_lookup(self.local.name, hits=1, misses=0)
+                return entry.decoded
+            generation = self.local.generation
+
+        value = await self.get(key)
+        if value is None:
+            return None
+        decoded = decode(value)
+        if self.local is not None:
+            self.local.set_decoded(key, value, decoded, generation=generation)
+        return decoded
+
+    async def get_many(self: Self, keys: List[str]) -> Dict[str, Optional[str]]:
+        if self.local is None:
+            return await super().get_many(keys)
+
+        result: Dict[str, Optional[str]] = {}
+        missing = []
+        for key in keys:
+            entry = self.local.get(key)
+            if entry is not None:
+                result[key] = entry.raw
+            else:
+                missing.append(key)
+        record_cache_lookup(self.local.name, hits=len(keys) - len(missing), misses=len(missing))
+
+        if missing:
+            generation = self.local.generation
+            for key, value in (await super().get_many(missing)).items():
+                result[key] = value
+                if value is not None:
+                    self.local.set(key, value, generation=generation)
+        return {key: result[key] for key in keys}
+
+    async def set(self: Self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        await super().set(key, value, ttl)
+        if self.local is not None:
+            self.local.set(key, value)
+
+    async def delete(self: Self, key: str) -> bool:
+        if self.local is None:
+            return await super().delete(key)
+
+        self.local.invalidate([key])
+        # Удаление и рассылка одним обращением к Redis
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.delete(self._make_key(key))
+        if self.bus is not None:
+            pipe.publish(self.bus.channel, self.bus.message(self.local, [key]))
+        results = await pipe.execute()
+        # Чтение, начатое уже после первой инвалидации, могло успеть сохранить старое значение
+        self.local.invalidate([key])
+        return bool(results[0])
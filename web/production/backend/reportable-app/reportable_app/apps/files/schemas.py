@@ -1,5 +1,7 @@
 import uuid
+from datetime import datetime
 from typing import Optional
+from pydantic import BaseModel, Field
 from shared.schemas.base import CreateBaseModel, UpdateBaseModel, TimestampMixin
 from shared.schemas.files import FileBaseSchema
 
@@ -28,3 +30,63 @@ class FileReadDBSchema(FileBaseSchema, TimestampMixin):
     content_type: str
     filename: str
 
+
+class UploadSessionCreateSchema(BaseModel):
+    filename: str = Field(..., description="Name of the file being uploaded")
+    content_type: str = Field("application/octet-stream", description="MIME type of the file")
+    size: Optional[int] = Field(None, ge=0, description="Expected file size in bytes, if known")
+    subdir: str = Field("default", description="Storage subdirectory")
+
+
+class UploadSessionDBSchema(BaseModel):
+    """Состояние загрузки по частям, хранится в Redis"""
+    upload_id: uuid.UUID
+    s3_upload_id: str
+    file_id: uuid.UUID
+    path: str
+    filename: str
+    content_type: str
+    size: Optional[int] = None
+    part_size: int
+    creator_user_id: Optional[uuid.UUID] = None
+    created_at: datetime
+
+
+class UploadPartReadSchema(BaseModel):
+    part_number: int = Field(..., description="1-based chunk number")
+    size: int = Field(..., description="Chunk size in bytes")
+
+
+class UploadSessionReadSchema(BaseModel):
+    upload_id: uuid.UUID = Field(..., description="Upload identifier to use in chunk, status and complete calls")
+    file_id: uuid.UUID = Field(..., description="ID the file will get once the upload is completed")
+    filename: str = Field(..., description="Name of the file being uploaded")
+    size: Optional[int] = Field(None, description="Expected file size in bytes, if known")
+    part_size: int = Field(..., description="Size of every chunk except the last one")
+    received_parts: list[UploadPartReadSchema] = Field(default_factory=list, description="Chunks already stored")
+    received_bytes: int = Field(0, description="Total size of the stored chunks")
+    expires_at: datetime = Field(..., description="The upload is aborted if no chunk arrives before this moment")
+
+
+class DirectUploadCreateSchema(BaseModel):
+    filename: str = Field(..., description="Name of the file being uploaded")
+    content_type: str = Field("application/octet-stream", description="MIME type the browser must send with the file")
+    subdir: str = Field("default", description="Storage subdirectory")
+
+
+class DirectUploadDBSchema(BaseModel):
+    """Выданная форма прямой загрузки, хранится в Redis до подтверждения"""
+    file_id: uuid.UUID
+    path: str
+    filename: str
+    content_type: str
+    max_size: int
+    creator_user_id: Optional[uuid.UUID] = None
+
+
+class DirectUploadReadSchema(BaseModel):
+    file_id: uuid.UUID = Field(..., description="ID the file will get once the upload is confirmed")
+    url: str = Field(..., description="Object storage URL to POST the multipart/form-data form to")
+    fields: dict[str, str] = Field(..., description="Form fields to send before the file field")
+    max_size: int = Field(..., description="Maximum accepted file size in bytes")
+    expires_at: datetime = Field(..., description="The form is rejected by the storage after this moment")
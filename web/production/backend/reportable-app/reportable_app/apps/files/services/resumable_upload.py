@@ -0,0 +1,334 @@
+import math
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Protocol
+from typing_extensions import Self
+from shared.schemas.files import FileReadSchema
+from ....core.utils.exceptions import ValidationError
+from ..exceptions import FileUploadError, UploadSessionNotFound
+from ..repositories.uploads_cache import UploadSessionRedisRepositoryProtocol
+from ..schemas import (
+    FileCreateDBSchema,
+    UploadSessionCreateSchema, UploadSessionDBSchema, UploadSessionReadSchema, UploadPartReadSchema,
+)
+from .file_service import FileServiceProtocol
+from .file_managment_service import FileManagmentServiceProtocol
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResumableUploadServiceProtocol(Protocol):
+    async def initiate(self: Self, data: UploadSessionCreateSchema, user_id: Optional[uuid.UUID] = None) -> UploadSessionReadSchema:
+        ...
+
+    async def upload_part(self: Self, upload_id: uuid.UUID, part_number: int, body: bytes) -> UploadPartReadSchema:
+        ...
+
+    async def get_status(self: Self, upload_id: uuid.UUID) -> UploadSessionReadSchema:
+        ...
+
+    async def complete(self: Self, upload_id: uuid.UUID) -> FileReadSchema:
+        ...
+
+    async def abort(self: Self, upload_id: uuid.UUID) -> None:
+        ...
+
+
+class ResumableUploadService(ResumableUploadServiceProtocol):
+    """
+    Загрузка файла по частям с докачкой поверх S3 multipart upload.
+
+    Клиент начинает загрузку, отправляет части фиксированного размера part_size (последняя — короче)
+    в любом порядке и с повторами, по статусу узнаёт, какие части уже получены, и завершает загрузку —
+    тогда объект собирается в S3 и создаётся запись File. Состояние загрузки хранится в Redis,
+    поэтому части может принимать любой воркер.
+    """
+
+    def __init__(self: Self,
+                 sessions: UploadSessionRedisRepositoryProtocol,
+                 file_service: FileServiceProtocol,
+                 file_managment_service: FileManagmentServiceProtocol,
+                 part_size: int,
+                 idle_timeout: int,
+                 max_parts: int = 10000):
+        self.sessions = sessions
+        self.file_service = file_service
+        self.file_managment_service = file_managment_service
+        self.part_size = part_size
+        self.idle_timeout = idle_timeout
+        self.max_parts = max_parts
+
+    async def initiate(self: Self, data: UploadSessionCreateSchema, user_id: Optional[uuid.UUID] = None) -> UploadSessionReadSchema:
+        if data.size is not None and math.ceil(data.size / self.part_size) > self.max_parts:
+            raise ValidationError("size", f"file is larger than {self.max_parts} parts of {self.part_size} bytes")
+
+        file_id = uuid.uuid4()
+        path = self.file_managment_service.make_path(file_id, data.subdir, data.filename)
+        s3_upload_id = await self.file_service.create_multipart_upload(path, data.content_type)
+
+        session = UploadSessionDBSchema(
+            upload_id=uuid.uuid4(),
+            s3_upload_id=s3_upload_id,
+            file_id=file_id,
+            path=path,
+            filename=data.filename,
+            content_type=data.content_type,
+            size=data.size,
+            part_size=self.part_size,
+            creator_user_id=user_id,
+            created_at=datetime.now(timezone.utc),
+        )
+        await self.sessions.create_session(session)
+        logger.info(f"Upload {session.upload_id} started: {path}")
+        return self._to_read_schema(session, {}, datetime.now(timezone.utc).timestamp())
+
+    async def upload_part(self: Self, upload_id: uuid.UUID, part_number: int, body: bytes) -> UploadPartReadSchema:
+        session = await self._get_session(upload_id)
+        self._validate_part(session, part_number, len(body))
+
+        try:
+            etag = await self.file_service.upload_part(session.path, session.s3_upload_id, part_number, body)
+        except Exception as e:
+            logger.error(f"Failed to upload part {part_number} of upload {upload_id}: {e}")
+            raise FileUploadError(session.filename)
+        await self.sessions.add_part(upload_id, part_number, etag, len(body))
+        return UploadPartReadSchema(part_number=part_number, size=len(body))
+
+    async def get_status(self: Self, upload_id: uuid.UUID) -> UploadSessionReadSchema:
+        session = await self._get_session(upload_id)
+        parts = await self.sessions.get_parts(upload_id)
+        last_activity = await self.sessions.get_last_activity(upload_id)
+        if last_activity is None:
+            # Загрузку уже завершают или отменяют
+            raise UploadSessionNotFound(str(upload_id))
+        return self._to_read_schema(session, parts, last_activity)
+
+    async def complete(self: Self, upload_id: uuid.UUID) -> FileReadSchema:
+        session = await self._get_session(upload_id)
+        parts = await self.sessions.get_parts(upload_id)
+        size = self._validate_complete(session, parts)
+
+        if not await self.sessions.claim(upload_id):
+            raise UploadSessionNotFound(str(upload_id))
+
+        try:
+            await self._complete_in_storage(session, parts)
+            created_file = await self.file_managment_service.register(FileCreateDBSchema(
+                id=session.file_id,
+                filename=session.filename,
+                content_type=session.content_type,
+                size=size,
+                path=session.path,
+                creator_user_id=session.creator_user_id,
+            ))
+        except BaseException:
+            # Клиент может повторить завершение, иначе загрузку отменит очистка
+            await self.sessions.release(upload_id)
+            raise
+        await self.sessions.delete_session(upload_id)
+        logger.info(f"Upload {upload_id} completed: {session.path} ({size} bytes, {len(parts)} parts)")
+        return created_file
+
+    async def abort(self: Self, upload_id: uuid.UUID) -> None:
+        session = await self._get_session(upload_id)
+        if not await self.sessions.claim(upload_id):
+            raise UploadSessionNotFound(str(upload_id))
+        await abort_upload(self.sessions, self.file_service, session, self.file_managment_service.exists)
+
+    async def _complete_in_storage(self: Self, session: UploadSessionDBSchema, parts: dict[int, tuple[str, int]]) -> None:
+        """
+        Собирает объект из частей. Если S3 уже собрал его при прошлой попытке (а сбой случился
+        на следующем шаге), UploadId больше не существует — тогда достаточно того, что объект на месте.
+        """
+        try:
+            await self.file_service.complete_multipart_upload(
+                session.path, session.s3_upload_id, [(number, etag) for number, (etag, _) in parts.items()]
+            )
+        except Exception as e:
+            if await self.file_service.head(session.path) is not None:
+                logger.info(f"Upload {session.upload_id} is already assembled in storage: {session.path}")
+                return
+            logger.error(f"Failed to complete upload {session.upload_id}: {e}")
+            raise FileUploadError(session.filename)
+
+    async def _get_session(self: Self, upload_id: uuid.UUID) -> UploadSessionDBSchema:
+        session = await self.sessions.get_session(upload_id)
+        if session is None:
+            raise UploadSessionNotFound(str(upload_id))
+        return session
+
+    def _validate_part(self: Self, session: UploadSessionDBSchema, part_number: int, size: int) -> None:
+        if not 1 <= part_number <= self.max_parts:
+            raise ValidationError("part_number", f"must be between 1 and {self.max_parts}")
+        if size == 0 or size > session.part_size:
+            raise ValidationError("body", f"chunk must be 1..{session.part_size} bytes, got {size}")
+
+        if session.size is not None:
+            total_parts = max(1, math.ceil(session.size / session.part_size))
+            if part_number > total_parts:
+                raise ValidationError("part_number", f"file of {session.size} bytes has {total_parts} parts")
+            expected = session.size - (total_parts - 1) * session.part_size if part_number == total_parts else session.part_size
+            if size != expected:
+                raise ValidationError("body", f"part {part_number} must be {expected} bytes, got {size}")
+
+    def _validate_complete(self: Self, session: UploadSessionDBSchema, parts: dict[int, tuple[str, int]]) -> int:
+        """Проверяет, что получены все части, и возвращает размер файла"""
+        if not parts:
+            raise ValidationError("parts", "no parts uploaded")
+
+        last = max(parts)
+        missing = [number for number in range(1, last + 1) if number not in parts]
+        if missing:
+            raise ValidationError("parts", f"missing parts: {missing[:20]}")
+
+        # Все части, кроме последней, полного размера: иначе в файле была бы дыра
+        short = [number for number, (_, size) in parts.items() if number != last and size != session.part_size]
+        if short:
+            raise ValidationError("parts", f"parts shorter than {session.part_size} bytes: {short[:20]}")
+
+        size = sum(size for _, size in parts.values())
+        if session.size is not None and size != session.size:
+            raise ValidationError("parts", f"received {size} bytes, expected {session.size}")
+        return size
+
+    def _to_read_schema(self: Self, session: UploadSessionDBSchema, parts: dict[int, tuple[str, int]], last_activity: float) -> UploadSessionReadSchema:
+        return UploadSessionReadSchema(
+            upload_id=session.upload_id,
+            file_id=session.file_id,
+            filename=session.filename,
+            size=session.size,
+            part_size=session.part_size,
+            received_parts=[
+                UploadPartReadSchema(part_number=number, size=size) for number, (_, size) in sorted(parts.items())
+            ],
+            received_bytes=sum(size for _, size in parts.values()),
+            expires_at=datetime.fromtimestamp(last_activity, timezone.utc) + timedelta(seconds=self.idle_timeout),
+        )
+
+
+FileRegisteredCheck = Callable[[uuid.UUID], Awaitable[bool]]
+
+
+async def abort_upload(
+    sessions: UploadSessionRedisRepositoryProtocol,
+    file_service: FileServiceProtocol,
+    session: UploadSessionDBSchema,
+    is_registered: Optional[FileRegisteredCheck] = None,
+) -> None:
+    """
+    Отменяет загрузку в S3 и удаляет её состояние; загрузка должна быть забрана через claim.
+
+    Если объект уже собран (завершение упало на создании записи File), UploadId не существует,
+    а объект остаётся в S3: он удаляется, если запись File так и не появилась.
+    """
+    try:
+        await file_service.abort_multipart_upload(session.path, session.s3_upload_id)
+    except Exception as e:
+        # Незавершённые части удалит lifecycle-правило bucket'а, если оно настроено
+        logger.warning(f"Failed to abort S3 upload of {session.upload_id}: {e}")
+        await _delete_unregistered_object(file_service, session, is_registered)
+    await sessions.delete_session(session.upload_id)
+    logger.info(f"Upload {session.upload_id} aborted: {session.path}")
+
+
+async def _delete_unregistered_object(
+    file_service: FileServiceProtocol,
+    session: UploadSessionDBSchema,
+    is_registered: Optional[FileRegisteredCheck],
+) -> None:
+    if is_registered is None:
+        return
+    try:
+        if await file_service.head(session.path) is None or await is_registered(session.file_id):
+            return
+        await file_service.delete(session.path)
+        logger.info(f"Deleted unregistered object of upload {session.upload_id}: {session.path}")
+    except Exception as e:
+        logger.warning(f"Failed to clean up object of upload {session.upload_id}: {e}")
+
+
+class UploadSweeper:
+    """
+    Фоновая очистка брошенных загрузок: раз в interval секунд отменяет загрузки,
+    в которые не приходили части дольше idle_timeout секунд.
+    Работает в каждом процессе; одну загрузку отменяет только один из них (claim).
+    """
+
+    def __init__(self: Self,
+                 sessions: UploadSessionRedisRepositoryProtocol,
+                 file_service: FileServiceProtocol,
+                 idle_timeout: int,
+                 interval: float,
+                 is_registered: Optional[FileRegisteredCheck] = None):
+        self.sessions = sessions
+        self.file_service = file_service
+        self.is_registered = is_registered
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self: Self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._watch(), name="upload-sweeper")
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sweep(self: Self) -> int:
+        """Отменяет брошенные загрузки, возвращает их число"""
+        aborted = 0
+        for upload_id in await self.sessions.get_idle(self.idle_timeout):
+            if not await self.sessions.claim(upload_id):
+                continue
+            session = await self.sessions.get_session(upload_id)
+            if session is None:
+                # Состояние уже истекло в Redis: UploadId неизвестен, отменить загрузку в S3 нельзя
+                await self.sessions.delete_session(upload_id)
+                continue
+            await abort_upload(self.sessions, self.file_service, session, self.is_registered)
+            aborted += 1
+        return aborted
+
+    async def _watch(self: Self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                aborted = await self.sweep()
+                if aborted:
+                    logger.info(f"Upload sweeper aborted {aborted} idle uploads")
+            except Exception as e:
+                logger.error(f"Upload sweep failed: {e}")
+
+
+# Глобальный экземпляр очистки (один на процесс)
+_upload_sweeper: Optional[UploadSweeper] = None
+
+
+async def start_upload_sweeper(
+    sessions: UploadSessionRedisRepositoryProtocol,
+    file_service: FileServiceProtocol,
+    idle_timeout: int,
+    interval: float,
+    is_registered: Optional[FileRegisteredCheck] = None,
+) -> UploadSweeper:
+    """Запускает фоновую очистку брошенных загрузок"""
+    global _upload_sweeper
+
+    if _upload_sweeper is None:
+        _upload_sweeper = UploadSweeper(sessions, file_service, idle_timeout, interval, is_registered)
+        await _upload_sweeper.start()
+    return _upload_sweeper
+
+
+async def stop_upload_sweeper() -> None:
+    """Останавливает фоновую очистку брошенных загрузок"""
+    global _upload_sweeper
+    if _upload_sweeper is not None:
+        await _upload_sweeper.stop()
+        _upload_sweeper = None
@@ -0,0 +1,19 @@
+from typing_extensions import Self
+from ..schemas import UploadSessionCreateSchema, UploadSessionReadSchema
+from ....core.use_cases import UseCaseProtocol
+from ..services.resumable_upload import ResumableUploadServiceProtocol
+
+
+class InitiateUploadUseCaseProtocol(UseCaseProtocol[UploadSessionReadSchema]):
+
+    async def __call__(self: Self, data: UploadSessionCreateSchema) -> UploadSessionReadSchema:
+        ...
+
+
+class InitiateUploadUseCase(InitiateUploadUseCaseProtocol):
+
+    def __init__(self: Self, resumable_upload_service: ResumableUploadServiceProtocol):
+        self.resumable_upload_service = resumable_upload_service
+
+    async def __call__(self: Self, data: UploadSessionCreateSchema) -> UploadSessionReadSchema:
+        return await self.resumable_upload_service.initiate(data)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import uuid
+from typing_extensions import Self
+from ..schemas import UploadPartReadSchema
+from ....core.use_cases import UseCaseProtocol
+from ..services.resumable_upload import ResumableUploadServiceProtocol
+
+
+class UploadPartUseCaseProtocol(UseCaseProtocol[UploadPartReadSchema]):
+
+    async def __call__(self: Self, upload_id: uuid.UUID, part_number: int, body: bytes) -> UploadPartReadSchema:
+        ...
+
+
+class UploadPartUseCase(UploadPartUseCaseProtocol):
+
+    def __init__(self: Self, resumable_upload_service: ResumableUploadServiceProtocol):
+        self.resumable_upload_service = resumable_upload_service
+
+    async def __call__(self: Self, upload_id: uuid.UUID, part_number: int, body: bytes) -> UploadPartReadSchema:
+        return await self.resumable_upload_service.upload_part(upload_id, part_number, body)
\ No newline at end of file
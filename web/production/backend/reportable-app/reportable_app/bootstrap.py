@@ -1,6 +1,19 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .core.loggers import set_logging
+from .settings import settings
+from .apps.file_analysis.depends import get_analysis_job_lease_repository, process_analysis_job, recover_analysis_jobs
+from .apps.file_analysis.services.job_queue import (
+    start_analysis_worker_pool, stop_analysis_worker_pool, start_analysis_job_recovery, stop_analysis_job_recovery
+)
+from .apps.analyzer.services.excel_parser import start_excel_parser, stop_excel_parser
+from .apps.analyzer.services.prompt_registry import start_prompt_registry, stop_prompt_registry
+from .core.clients.llm_client import get_llm_client, close_llm_client
+from .core.clients.s3_client import start_s3_client, close_s3_client
+from .core.redis import get_redis_client
+from .core.repositories.local_cache import start_cache_invalidation, stop_cache_invalidation
+from .apps.files.depends import get_file_service, get_s3_client, get_upload_session_repository, is_file_registered
+from .apps.files.services.resumable_upload import start_upload_sweeper, stop_upload_sweeper
 from .middleware import apply_middleware
 from .exceptions import apply_exceptions_handlers
 from .router import apply_routes
@@ -14,14 +27,60 @@ async def lifespan(app: FastAPI):
     - устанавливаем настройки логгирования
     - устанавливаем настройки кеширования
     - устанавливаем настройки стриминга
+    - создаём общий клиент LLM и загружаем промпты (с отслеживанием изменений)
+    - создаём общий клиент S3 с пулом соединений
+    - подписываемся на инвалидации локального кэша файлов от других процессов
+    - запускаем пул для разбора Excel-книг вне event loop
+    - запускаем пул воркеров для фонового анализа файлов и возвращаем в очередь задачи,
+      потерянные при перезапуске или падении процесса
+    - запускаем очистку брошенных загрузок по частям
     """
     set_logging()
 
+    get_llm_client()
+    await start_prompt_registry()
+    await start_s3_client()
+    await start_cache_invalidation(get_redis_client())
+
+    start_excel_parser(
+        executor=settings.excel.executor,
+        workers=settings.excel.workers,
+        max_pending=settings.excel.max_pending,
+        parallel_sheets_min=settings.excel.parallel_sheets_min,
+        sheets_per_chunk=settings.excel.sheets_per_chunk,
+        max_waiting=settings.excel.max_waiting,
+    )
+
+    await start_analysis_worker_pool(
+        process_analysis_job,
+        get_analysis_job_lease_repository(redis_client=get_redis_client()),
+        workers=settings.analysis.workers,
+        max_queue_size=settings.analysis.max_queue_size,
+        lease_ttl=settings.analysis.lease_ttl,
+    )
+    await start_analysis_job_recovery(recover_analysis_jobs, interval=settings.analysis.recovery_interval)
+
+    await start_upload_sweeper(
+        get_upload_session_repository(redis_client=get_redis_client(), settings=settings),
+        get_file_service(client=get_s3_client(), settings=settings),
+        idle_timeout=settings.uploads.idle_timeout,
+        interval=settings.uploads.sweep_interval,
+        is_registered=is_file_registered,
+    )
+
     # stream_repository = await get_streaming_repository_type()
     # await stream_repository.start(settings.kafka)
 
     yield
 
+    await stop_upload_sweeper()
+    await stop_analysis_job_recovery()
+    await stop_analysis_worker_pool()
+    stop_excel_parser()
+    await stop_prompt_registry()
+    await close_llm_client()
+    await close_s3_client()
+    await stop_cache_invalidation()
     # await stream_repository.stop()
 
 
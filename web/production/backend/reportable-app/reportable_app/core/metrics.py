@@ -0,0 +1,102 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+
+# Метрики процесса. При нескольких воркерах granian каждый процесс пишет значения
+# в каталог PROMETHEUS_MULTIPROC_DIR (переменная задаётся до запуска, см. run.sh),
+# а /metrics в любом воркере собирает сумму по всем процессам.
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_LLM_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "reportable_http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    "reportable_llm_request_duration_seconds",
+    "Время запроса к LLM вместе с ожиданием лимита и повторами",
+    ["model", "outcome"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "reportable_llm_tokens",
+    "Токены по данным поля usage ответа LLM",
+    ["model", "kind"],
+)
+LLM_ERRORS = Counter(
+    "reportable_llm_errors",
+    "Запросы к LLM, завершившиеся ошибкой",
+    ["model", "error"],
+)
+LLM_HEDGES = Counter(
+    "reportable_llm_hedges",
+    "Продублированные медленные запросы к LLM и чей ответ пришёл первым (доля: / число запросов)",
+    ["model", "winner"],
+)
+LLM_HEDGE_SAVED_SECONDS = Counter(
+    "reportable_llm_hedge_saved_seconds",
+    "Оценка сэкономленного времени ожидания ответа LLM за счёт дублей",
+    ["model"],
+)
+
+S3_OPERATION_DURATION = Histogram(
+    "reportable_s3_operation_duration_seconds",
+    "Время операции с S3",
+    ["operation", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter(
+    "reportable_cache_requests",
+    "Обращения к кэшам в Redis (доля попаданий: hit / все)",
+    ["cache", "result"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "reportable_db_pool_checkout_seconds",
+    "Ожидание соединения из пула SQLAlchemy",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+@contextmanager
+def observe_duration(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Замер длительности блока; outcome=error, если блок завершился исключением"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - started)
+
+
+def record_cache_lookup(cache: str, hits: int, misses: int) -> None:
+    if hits:
+        CACHE_REQUESTS.labels(cache=cache, result="hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache=cache, result="miss").inc(misses)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Метрики в текстовом формате Prometheus: из всех процессов или только из текущего"""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
@@ -0,0 +1,234 @@
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import redis.asyncio as redis
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+from typing_extensions import Self
+from ...settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class LocalCacheEntry:
+    raw: str
+    # Разобранное значение (например, pydantic-модель) — общее для всех читателей, менять его нельзя
+    decoded: Any
+    expires_at: float
+    size: int
+
+
+class LocalTTLCache:
+    """
+    Кэш в памяти процесса перед Redis: LRU с ограничением по числу записей и по объёму
+    и с временем жизни записей.
+
+    Объём считается приблизительно: размер ключа и строки значения, а для разобранного
+    значения — ещё decoded_factor размеров строки.
+
+    Поколение (generation) меняется при каждой инвалидации. Значение, прочитанное из Redis
+    до инвалидации, но сохраняемое после неё, отбрасывается: иначе в кэше остался бы
+    только что удалённый из Redis ответ.
+    """
+
+    def __init__(self: Self, name: str, ttl: float, max_entries: int, max_bytes: int, decoded_factor: float = 2.0):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.decoded_factor = decoded_factor
+        self.generation = 0
+        self.size = 0
+        self._entries: OrderedDict[str, LocalCacheEntry] = OrderedDict()
+
+    def __len__(self: Self) -> int:
+        return len(self._entries)
+
+    def get(self: Self, key: str) -> Optional[LocalCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self: Self, key: str, raw: str, decoded: Any = None, generation: Optional[int] = None) -> None:
+        """Сохраняет значение; generation — поколение на момент начала чтения из Redis"""
+        if generation is not None and generation != self.generation:
+            return
+        self._remove(key)
+        size = sys.getsizeof(key) + sys.getsizeof(raw)
+        if decoded is not None:
+            size += int(sys.getsizeof(raw) * self.decoded_factor)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = LocalCacheEntry(raw, decoded, time.monotonic() + self.ttl, size)
+        self.size += size
+        self._evict()
+
+    def set_decoded(self: Self, key: str, raw: str, decoded: Any, generation: Optional[int] = None) -> None:
+        """
+        Добавляет разобранное значение к записи, если в ней всё ещё та же строка;
+        generation — поколение на момент начала чтения
+        """
+        if generation is not None and generation != self.generation:
+            return
+        entry = self._entries.get(key)
+        if entry is None or entry.raw != raw or entry.decoded is not None:
+            return
+        extra = int(sys.getsizeof(raw) * self.decoded_factor)
+        entry.decoded = decoded
+        entry.size += extra
+        self.size += extra
+        self._evict()
+
+    def invalidate(self: Self, keys: Iterable[str]) -> None:
+        self.generation += 1
+        for key in keys:
+            self._remove(key)
+
+    def clear(self: Self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self: Self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def _evict(self: Self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self.size > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+
+
+class CacheInvalidationBus:
+    """
+    Рассылка инвалидаций локальных кэшей между процессами через Redis pub/sub.
+
+    Процесс, удаливший ключи из Redis, публикует их в канал; остальные процессы удаляют
+    их из своих локальных кэшей. Свои сообщения процесс пропускает — локально ключи уже удалены.
+    Пока подписка не работает (обрыв соединения), сообщения теряются, поэтому при каждой
+    (пере)подписке локальные кэши очищаются целиком.
+    """
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self: Self, redis_client: redis.Redis, channel: str):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.sender = uuid.uuid4().hex
+        self._caches: dict[str, LocalTTLCache] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self: Self, cache: LocalTTLCache) -> None:
+        self._caches[cache.name] = cache
+
+    def message(self: Self, cache: LocalTTLCache, keys: list[str]) -> str:
+        return json.dumps({"sender": self.sender, "cache": cache.name, "keys": keys})
+
+    async def publish(self: Self, cache: LocalTTLCache, keys: list[str]) -> None:
+        await self.redis_client.publish(self.channel, self.message(cache, keys))
+
+    async def start(self: Self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(), name="cache-invalidation")
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def handle(self: Self, data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Malformed cache invalidation message: {data!r}")
+            return
+        if message.get("sender") == self.sender:
+            return
+        cache = self._caches.get(message.get("cache"))
+        if cache is not None:
+            cache.invalidate(message.get("keys", []))
+
+    def _clear_all(self: Self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    async def _listen(self: Self) -> None:
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._clear_all()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscription lost: {e}")
+                self._clear_all()
+                await asyncio.sleep(self.RECONNECT_DELAY)
+            finally:
+                await pubsub.aclose()
+
+
+# Глобальные локальные кэши (по имени) и шина инвалидаций (одна на процесс)
+_local_caches: dict[str, LocalTTLCache] = {}
+_invalidation_bus: Optional[CacheInvalidationBus] = None
+
+
+def get_local_cache(name: str) -> Optional[LocalTTLCache]:
+    """
+    Возвращает локальный кэш процесса с заданным именем или None, если локальный кэш выключен.
+    Без запущенной шины инвалидаций другие процессы не узнают об удалении ключей,
+    поэтому кэш включается только вместе с ней.
+    """
+    if not settings.local_cache.enabled or _invalidation_bus is None:
+        return None
+    cache = _local_caches.get(name)
+    if cache is None:
+        cache = LocalTTLCache(
+            name,
+            ttl=settings.local_cache.ttl,
+            max_entries=settings.local_cache.max_entries,
+            max_bytes=settings.local_cache.max_bytes,
+        )
+        _local_caches[name] = cache
+        _invalidation_bus.register(cache)
+    return cache
+
+
+def get_cache_invalidation_bus() -> Optional[CacheInvalidationBus]:
+    return _invalidation_bus
+
+
+async def start_cache_invalidation(redis_client: redis.Redis) -> Optional[CacheInvalidationBus]:
+    """Подписывается на инвалидации локальных кэшей от других процессов"""
+    global _invalidation_bus
+
+    if _invalidation_bus is None and settings.local_cache.enabled:
+        _invalidation_bus = CacheInvalidationBus(redis_client, settings.local_cache.channel)
+        await _invalidation_bus.start()
+    return _invalidation_bus
+
+
+async def stop_cache_invalidation() -> None:
+    """Останавливает подписку и сбрасывает локальные кэши"""
+    global _invalidation_bus
+    if _invalidation_bus is not None:
+        await _invalidation_bus.stop()
+        _invalidation_bus = None
+    _local_caches.clear()
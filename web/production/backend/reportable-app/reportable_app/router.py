@@ -2,10 +2,12 @@
 Основной модуль для роутов приложения.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 from .apps.files.router import router as files_router
-from .apps.file_analysis.router import router as analyzer_router
+from .apps.file_analysis.router import router as file_analysis_router
+from .apps.analyzer.router import router as analyzer_router
+from .core.metrics import render_metrics
 
 
 def apply_routes(app: FastAPI) -> FastAPI:
@@ -15,4 +17,14 @@ def apply_routes(app: FastAPI) -> FastAPI:
 
     app.include_router(files_router)
     app.include_router(analyzer_router)
-    return app
\ No newline at end of file
+    app.include_router(file_analysis_router)
+    app.add_api_route('/metrics', metrics, methods=['GET'], include_in_schema=False)
+    return app
+
+
+async def metrics() -> Response:
+    """
+    Метрики для Prometheus.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
\ No newline at end of file
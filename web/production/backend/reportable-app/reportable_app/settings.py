@@ -1,5 +1,5 @@
 import os
-from typing import Annotated, List
+from typing import Annotated, List, Literal
 
 from fastapi import Depends
 from pydantic import BaseModel, field_validator
@@ -43,8 +43,106 @@ class LLM(BaseModel):
     """Настройка взаимодействия с llm-моделью"""
     api_key: str
     model_url: str
+    # Каскад моделей от дешёвой к крупной через запятую; пусто — только model_url
+    models: Annotated[List[str], NoDecode] = []
+    # Отчёты длиннее (оценка в токенах на отчёт) сразу идут последней модели каскада
+    cascade_max_tokens: int = 4000
+    # OpenAI-совместимый endpoint; для нагрузочных тестов — локальный mock (benchmarks/mock_llm_server.py)
+    base_url: str = "https://llm.api.cloud.yandex.net/v1"
     prompts_path: str
     schema_path: str
+    cache_enabled: bool = True
+    cache_ttl: int = 7 * 24 * 60 * 60
+    cache_max_entries: int = 50_000
+    # Адаптивный лимит параллельных запросов (общий на процесс)
+    initial_concurrency: int = 8
+    min_concurrency: int = 1
+    max_concurrency: int = 32
+    latency_target: float = 60.0
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    # Пул HTTP-соединений общего клиента
+    max_connections: int = 64
+    max_keepalive_connections: int = 32
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    request_timeout: float = 300.0
+    # Как часто проверять изменения файлов промпта и схемы, 0 — не проверять
+    prompts_reload_interval: float = 5.0
+    # Пакетная обработка коротких отчётов (оценка в токенах)
+    batch_enabled: bool = False
+    batch_short_report_tokens: int = 1500
+    batch_token_budget: int = 6000
+    batch_max_reports: int = 6
+    # Поля, найденные правилами, не запрашиваются у модели; доля отчётов с полной схемой для проверки правил
+    rules_enabled: bool = False
+    rules_verify_ratio: float = 0.1
+    # Листы короче (в токенах) заполняются без LLM
+    rules_min_tokens: int = 30
+    # Запросы к LLM запускаются от самых длинных к коротким (LPT), при очереди — тоже
+    longest_first: bool = False
+    # Таймаут попытки по размеру запроса и истории задержек (верхняя граница — request_timeout)
+    timeout_min: float = 30.0
+    timeout_per_1k_tokens: float = 15.0
+    timeout_history_factor: float = 3.0
+    # Дублирование попыток, не уложившихся в hedge_quantile задержек запросов того же размера
+    hedging_enabled: bool = False
+    hedge_quantile: float = 0.9
+    hedge_min_samples: int = 20
+    hedge_max_ratio: float = 0.1
+    # Отчёты длиннее (оценка в токенах) делятся по строкам на части, разбираемые параллельно
+    chunking_enabled: bool = False
+    chunk_max_tokens: int = 8000
+    # Общие поля скважины (инвентарный номер, месторождение, ...) — одним запросом на книгу
+    header_enabled: bool = False
+    header_max_tokens: int = 3000
+    # Лимит токенов ответа: по размеру запроса, но не меньше answer_tokens_min и не больше answer_tokens_max
+    answer_tokens_min: int = 1024
+    answer_tokens_max: int = 16384
+
+    @field_validator('models', mode='before')
+    @classmethod
+    def decode_models(cls, v: str | List[str]) -> List[str]:
+        if isinstance(v, str):
+            return [model.strip() for model in v.split(',') if model.strip()]
+        return v
+
+class AnalysisJobs(BaseModel):
+    """Настройки фоновой обработки задач анализа"""
+    workers: int = 4
+    max_queue_size: int = 100
+    progress_interval: float = 1.0
+    # Аренда задачи в Redis: пока процесс жив, он продлевает аренды своих задач.
+    # Задачи queued/running без аренды возвращаются в очередь при старте и раз в recovery_interval секунд
+    lease_ttl: int = 60
+    recovery_interval: float = 60.0
+    # Задача, потерянная большее число раз, помечается failed
+    max_recoveries: int = 3
+
+class ExcelParsing(BaseModel):
+    """Настройки разбора Excel-книг вне event loop"""
+    executor: Literal['process', 'thread'] = 'process'
+    workers: int = 2
+    max_pending: int = 8
+    # Сколько задач может ждать свободного слота; сверх этого новые книги отклоняются (503)
+    max_waiting: int = 32
+    # Книги с таким числом листов отчётов и больше разбираются частями параллельно
+    parallel_sheets_min: int = 20
+    sheets_per_chunk: int = 10
+
+class Compaction(BaseModel):
+    """Сжатие текстов отчётов перед отправкой в LLM"""
+    enabled: bool = False
+    # Приёмы сжатия, действуют только при enabled
+    dedupe: bool = True
+    strip_boilerplate: bool = True
+    # Строка считается шаблонной, если встречается в такой доле листов книги
+    boilerplate_share: float = 0.8
+    boilerplate_min_sheets: int = 3
+    boilerplate_min_chars: int = 40
+    # Строки листа целиком (ячейки через табуляцию) вместо отдельной строки на каждую ячейку
+    tsv: bool = False
 
 class Minio(BaseModel):
     """
@@ -58,6 +156,44 @@ class Minio(BaseModel):
     real_url: str
     url_to_change: str
     standart_path: str
+    region: str = 'us-east-1'
+    # Presigned-ссылки на скачивание подписываются локально (SigV4) без обращения к клиенту S3.
+    # Время подписи округляется до url_time_bucket секунд — в пределах окна ссылка не меняется
+    local_signing: bool = False
+    url_expires_in: int = 30 * 60
+    url_time_bucket: int = 5 * 60
+    # Пул соединений общего клиента S3
+    max_pool_connections: int = 50
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    # Потоковая загрузка файлов на анализ: тело запроса сразу уходит в S3 multipart upload.
+    # Часть не меньше 5 МБ (ограничение S3 для всех частей, кроме последней)
+    streaming_upload: bool = False
+    multipart_part_size: int = 8 * 1024 * 1024
+    multipart_concurrency: int = 4
+
+class ResumableUploads(BaseModel):
+    """Загрузки по частям с докачкой (размер части — minio.multipart_part_size) и прямые загрузки в хранилище"""
+    # Загрузка без новых частей дольше idle_timeout секунд считается брошенной и отменяется
+    idle_timeout: int = 24 * 60 * 60
+    sweep_interval: float = 10 * 60
+    # Ограничение S3 на число частей одной загрузки
+    max_parts: int = 10000
+    # Прямая загрузка в хранилище по presigned POST: срок действия формы и максимальный размер файла
+    direct_expires_in: int = 60 * 60
+    direct_max_size: int = 1024 * 1024 * 1024
+
+class LocalCache(BaseModel):
+    """
+    Кэш в памяти процесса перед Redis (метаданные и ссылки файлов).
+    Удаление ключей рассылается остальным процессам через Redis pub/sub;
+    ttl ограничивает устаревание, если сообщение инвалидации потерялось
+    """
+    enabled: bool = True
+    ttl: float = 30.0
+    max_entries: int = 10_000
+    max_bytes: int = 32 * 1024 * 1024
+    channel: str = 'cache:invalidate'
 
 class RedisSettings(BaseModel):
     """
@@ -113,8 +249,17 @@ class Settings(BaseSettings):
 
     redis_ttl: int = 5 * 60 
 
+    local_cache: LocalCache = LocalCache()
+
     llm: LLM
 
+    analysis: AnalysisJobs = AnalysisJobs()
+
+    uploads: ResumableUploads = ResumableUploads()
+
+    excel: ExcelParsing = ExcelParsing()
+
+    compaction: Compaction = Compaction()
 
     model_config = SettingsConfigDict(
         env_file='.env',
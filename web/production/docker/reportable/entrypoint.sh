@@ -6,4 +6,7 @@ echo "Run Alembic migrations..."
 uv run alembic upgrade head
 
 echo "Starting FastAPI application..."
+# Каталог метрик Prometheus, общий для всех воркеров granian
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/reportable-metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
 uv run granian reportable_app.main:app --interface asgi --host 0.0.0.0 --port 8080
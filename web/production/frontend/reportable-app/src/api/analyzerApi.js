@@ -9,7 +9,7 @@ export const analyzerApi = {
       formData, 
       {
         headers: { "Content-Type": "multipart/form-data" },
-        timeout: 300000, // 5 минут (300000 мс)
+        timeout: 60000, // анализ идёт в фоне, сервер сразу возвращает id задачи
       }
     );
     return data;